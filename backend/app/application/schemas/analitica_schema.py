@@ -0,0 +1,24 @@
+"""
+Schemas para analítica de producción OPU
+"""
+from typing import Optional
+from pydantic import BaseModel
+
+
+class RendimientoProduccion(BaseModel):
+    """Rendimiento de ovocitos agregado por una dimensión"""
+    clave: Optional[str] = None
+    etiqueta: Optional[str] = None
+    extracciones: int = 0
+    grado_1: int = 0
+    grado_2: int = 0
+    grado_3: int = 0
+    desnudos: int = 0
+    irregular: int = 0
+    total_ovocitos: int = 0
+    promedio_ovocitos: float = 0.0
+
+
+class ReconstruccionResumen(BaseModel):
+    """Resultado de reconstruir el resumen de producción"""
+    filas: int
@@ -0,0 +1,37 @@
+"""
+Schemas para el resumen del Dashboard
+"""
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+from .opu_schema import SesionOPUResumen
+
+
+class ContadoresDashboard(BaseModel):
+    total_donadoras: int
+    sesiones_opu_mes: int
+    total_chequeos: int
+    total_prenadas: int
+    tasa_prenez: int  # porcentaje redondeado
+
+
+class GFEPendiente(BaseModel):
+    """Transferencia que aún no tiene chequeo GFE"""
+    id: int
+    fecha: Optional[date] = None
+    receptora: Optional[str] = None
+    cliente: Optional[str] = None
+    donadora_id: Optional[int] = None
+    toro: Optional[str] = None
+
+
+class GFEPendientes(BaseModel):
+    total: int
+    items: List[GFEPendiente]
+
+
+class DashboardSummary(BaseModel):
+    contadores: ContadoresDashboard
+    sesiones_recientes: List[SesionOPUResumen]
+    gfe_pendientes: GFEPendientes
@@ -2,7 +2,7 @@
 Schemas Pydantic para Donadora
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -48,3 +48,15 @@ class DonadoraResponse(DonadoraBase):
 
     class Config:
         from_attributes = True
+
+
+class DonadoraListResponse(BaseModel):
+    """Schema de respuesta del listado paginado de donadoras"""
+    donadoras: List[DonadoraResponse]
+    total: int
+    page: int
+    limit: int
+    total_pages: int
+
+    class Config:
+        from_attributes = True
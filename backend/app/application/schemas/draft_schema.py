@@ -2,7 +2,7 @@
 Schemas Pydantic para Draft (autosave)
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -19,6 +19,18 @@ class DraftUpdate(BaseModel):
     datos_json: Dict[str, Any]
 
 
+class DraftPatchRequest(BaseModel):
+    """JSON Patch (RFC 6902) calculado sobre una versión del draft"""
+    version_base: int = Field(..., ge=1)
+    operaciones: List[Dict[str, Any]] = Field(..., max_length=500)
+
+
+class DraftPatchResponse(BaseModel):
+    """Versión resultante tras aplicar un patch"""
+    id: int
+    version: int
+
+
 class DraftResponse(BaseModel):
     """Schema de respuesta de draft"""
     id: int
@@ -28,6 +40,7 @@ class DraftResponse(BaseModel):
     registro_id: Optional[int] = None
     datos_json: Dict[str, Any]
     estado: str
+    version: int
     fecha_creacion: datetime
     fecha_actualizacion: Optional[datetime] = None
 
@@ -42,3 +42,12 @@ class GFEResponse(GFBase):
 
     class Config:
         from_attributes = True
+
+
+class TasaPrenez(BaseModel):
+    """Tasa de preñez agregada por una dimensión"""
+    clave: Optional[str] = None
+    chequeos: int
+    prenadas: int
+    vacias: int
+    tasa_prenez: float
@@ -43,6 +43,7 @@ class ExtraccionCreate(ExtraccionBase):
 
 
 class ExtraccionUpdate(ExtraccionBase):
+    id: Optional[int] = None  # Extracción existente; sin id se crea una nueva
     nueva_donadora: Optional[NuevaDonadora] = None
 
 
@@ -97,3 +98,37 @@ class SesionOPUResponse(SesionOPUBase):
 
     class Config:
         from_attributes = True
+
+
+class SesionOPUResumen(BaseModel):
+    """Cabecera de sesión con totales agregados (sin extracciones)"""
+    id: int
+    fecha: date
+    tecnico_opu: str
+    tecnico_busqueda: str
+    cliente: str
+    hacienda: Optional[str] = None
+    lote: Optional[str] = None
+    hora_inicio: Optional[str] = None
+    hora_final: Optional[str] = None
+    finalidad: str
+    fecha_creacion: datetime
+    total_donadoras: int = 0
+    grado_1: int = 0
+    grado_2: int = 0
+    grado_3: int = 0
+    desnudos: int = 0
+    irregular: int = 0
+    total_ovocitos: int = 0
+
+
+class ExtraccionCambio(BaseModel):
+    """Cambio aplicado a una extracción al sincronizar la sesión"""
+    id: Optional[int] = None
+    numero_secuencial: int
+    accion: str  # creada | actualizada | eliminada | sin_cambios
+    campos: List[str] = Field(default_factory=list)
+
+
+class SesionOPUUpdateResponse(SesionOPUResponse):
+    cambios: List[ExtraccionCambio] = Field(default_factory=list)
@@ -0,0 +1,38 @@
+"""
+Schemas para reportes de linaje embrionario
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class TasasConversion(BaseModel):
+    """Tasas porcentuales entre etapas (None si no hay base)"""
+    tasa_fecundacion: Optional[float] = None  # ovocitos que pasaron a fecundación
+    transferencias_por_ovocito_fecundado: Optional[float] = None
+    transferencias_por_ovocito: Optional[float] = None
+    tasa_chequeo: Optional[float] = None
+    tasa_prenez: Optional[float] = None
+    prenadas_por_ovocito: Optional[float] = None
+
+
+class EtapasLinaje(BaseModel):
+    sesiones: int = 0
+    extracciones: int = 0
+    ovocitos: int = 0
+    ovocitos_fecundados: int = 0
+    fecundaciones: int = 0
+    transferencias: int = 0
+    chequeadas: int = 0
+    prenadas: int = 0
+    tasas: TasasConversion
+
+
+class LinajeDonadora(EtapasLinaje):
+    donadora_id: int
+    nombre: Optional[str] = None
+    numero_registro: Optional[str] = None
+
+
+class ReporteLinaje(BaseModel):
+    donadoras: List[LinajeDonadora]
+    totales: EtapasLinaje
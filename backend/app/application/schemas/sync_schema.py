@@ -0,0 +1,47 @@
+"""
+Schemas para sincronización de clientes offline (/sync)
+"""
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class CambiosTabla(BaseModel):
+    """Cambios de una tabla desde el cursor"""
+    upsert: List[Dict[str, Any]] = Field(default_factory=list)  # filas completas (schema de respuesta)
+    delete: List[int] = Field(default_factory=list)  # lápidas
+    reset: bool = False  # escritura masiva: recargar la tabla completa
+
+
+class SyncResponse(BaseModel):
+    cursor: int  # enviar como `since` en la siguiente llamada
+    mas: bool = False  # quedan cambios: volver a pedir con el nuevo cursor
+    reset: bool = False  # cursor vencido o inicial: recargar todo y seguir desde `cursor`
+    cambios: Dict[str, CambiosTabla] = Field(default_factory=dict)
+
+
+class MutacionOffline(BaseModel):
+    """Escritura encolada por el cliente sin conexión"""
+    id: str = Field(..., min_length=1, max_length=64, description="Id único generado por el cliente (UUID)")
+    entidad: str
+    operacion: Literal["crear", "actualizar", "eliminar"]
+    fila_id: Optional[int] = None
+    # Id de una mutación anterior ("crear") cuyo resultado es la fila destino
+    ref: Optional[str] = Field(None, max_length=64)
+    datos: Dict[str, Any] = Field(default_factory=dict)
+
+
+class SyncPushRequest(BaseModel):
+    mutaciones: List[MutacionOffline]
+
+
+class ResultadoMutacion(BaseModel):
+    id: str
+    estado: Literal["aplicada", "rechazada", "error"]
+    fila_id: Optional[int] = None
+    error: Optional[str] = None
+    repetida: bool = False  # ya se había procesado: resultado guardado
+
+
+class SyncPushResponse(BaseModel):
+    resultados: List[ResultadoMutacion]
+    cursor: int  # cursor tras aplicar el lote
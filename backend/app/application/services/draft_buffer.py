@@ -0,0 +1,153 @@
+"""
+Buffer de coalescencia para el autosave de drafts
+
+useAutosave envía un JSON Patch cada pocos segundos por formulario abierto.
+Con el buffer activo (DRAFT_FLUSH_SEGUNDOS > 0), PATCH /drafts/{id} aplica
+el patch sobre el documento en memoria y responde la nueva versión sin
+escribir; una tarea periódica guarda la última versión de cada draft como
+snapshot completo, todos en una sola transacción. Una ráfaga de N patches
+produce así una escritura por draft e intervalo en lugar de N.
+
+Cada entrada recuerda la versión que tenía el draft en la base al cargarla:
+la escritura solo procede si sigue siendo esa (un guardado completo u otro
+worker la cambiaron si no), y en ese caso la versión en memoria se descarta
+y el cliente recibe 409 en su próximo patch y reenvía el documento completo.
+
+El buffer es del proceso: con varios workers, un patch que llega a otro
+worker ve la versión de la base, responde 409 y el cliente hace un
+guardado completo. Lo pendiente se escribe al detener la aplicación; si el
+proceso muere se pierden a lo sumo los últimos DRAFT_FLUSH_SEGUNDOS.
+
+El vaciado desde un request (completar un draft) usa la sesión de
+escritura del propio request: con SQLite hay una única conexión de
+escritura y abrir otra sesión dentro del request la esperaría a sí misma.
+"""
+import asyncio
+import dataclasses
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.database import connection
+from app.infrastructure.repositories.draft_repository import DraftRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class DraftPendiente:
+    """Última versión en memoria de un draft"""
+    usuario_id: int
+    version_bd: int  # versión en la base cuando se cargó (condición de la escritura)
+    version: int
+    documento: Dict[str, Any]
+
+
+class BufferDrafts:
+    """Última versión pendiente por draft, escrita por lotes"""
+
+    def __init__(self, intervalo_segundos: Optional[float] = None, session_factory=None):
+        self.intervalo = settings.DRAFT_FLUSH_SEGUNDOS if intervalo_segundos is None else intervalo_segundos
+        self._session_factory = session_factory
+        self._pendientes: Dict[int, DraftPendiente] = {}
+        self._tarea: Optional[asyncio.Task] = None
+        self.recibidos = 0
+        self.escritos = 0
+
+    @property
+    def activo(self) -> bool:
+        """False: cada patch se escribe al momento (DRAFT_FLUSH_SEGUNDOS = 0)"""
+        return self.intervalo > 0
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._pendientes)
+
+    def obtener(self, draft_id: int) -> Optional[DraftPendiente]:
+        return self._pendientes.get(draft_id)
+
+    def encolar(self, draft_id: int, pendiente: DraftPendiente):
+        """Guardar la versión más reciente (reemplaza la pendiente del mismo draft)"""
+        self.recibidos += 1
+        self._pendientes[draft_id] = pendiente
+
+    def descartar(self, draft_id: int):
+        """Olvidar la versión pendiente (draft eliminado o reescrito completo)"""
+        self._pendientes.pop(draft_id, None)
+
+    async def flush(self, draft_ids: Optional[Iterable[int]] = None, db: Optional[AsyncSession] = None) -> int:
+        """
+        Escribir las versiones pendientes (todas o las de draft_ids)
+
+        Args:
+            db: sesión de escritura del request (get_db); sin ella se abre
+                una propia (tarea periódica y cierre)
+
+        Returns:
+            Número de drafts escritos
+        """
+        ids = None if draft_ids is None else set(draft_ids)
+        lote = {i: p for i, p in self._pendientes.items() if ids is None or i in ids}
+        if not lote:
+            return 0
+
+        if db is not None:
+            return await self._escribir(db, lote)
+        factory = self._session_factory or connection.AsyncSessionLocal
+        async with factory() as propia:
+            return await self._escribir(propia, lote)
+
+    async def _escribir(self, db: AsyncSession, lote: Dict[int, DraftPendiente]) -> int:
+        repo = DraftRepository(db)
+        guardados = set()
+        for draft_id, pendiente in lote.items():
+            if await repo.guardar_version(draft_id, pendiente.version_bd, pendiente.version, pendiente.documento):
+                guardados.add(draft_id)
+        await db.commit()
+
+        # Mientras se escribía pudieron llegar patches nuevos: se conservan
+        # tomando como base la versión recién escrita
+        for draft_id, escrito in lote.items():
+            actual = self._pendientes.get(draft_id)
+            if actual is escrito:
+                del self._pendientes[draft_id]
+                if draft_id not in guardados:
+                    logger.info("El draft %s cambió en la base; se descarta su versión en memoria", draft_id)
+            elif actual is not None and draft_id in guardados:
+                self._pendientes[draft_id] = dataclasses.replace(actual, version_bd=escrito.version)
+
+        self.escritos += len(guardados)
+        return len(guardados)
+
+    async def _bucle(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Error al escribir drafts pendientes")
+
+    def iniciar(self):
+        """Arrancar la tarea periódica (lifespan de la aplicación)"""
+        if self._tarea is None and self.activo:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self):
+        """Detener la tarea y escribir lo pendiente"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("No se pudieron escribir los drafts pendientes al detener")
+
+
+draft_buffer = BufferDrafts()
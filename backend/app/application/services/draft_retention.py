@@ -0,0 +1,79 @@
+"""
+Retención de drafts
+
+Tarea periódica que elimina los drafts completados (tras
+DRAFT_RETENCION_COMPLETADOS_HORAS) y los abandonados (sin cambios durante
+DRAFT_TTL_DIAS o el TTL de su módulo en DRAFT_TTL_DIAS_POR_MODULO), para
+que la tabla no crezca sin límite. En la misma pasada purga el registro de
+cambios y las mutaciones de /sync más viejos que SYNC_RETENCION_DIAS y las
+claves de idempotencia vencidas.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.infrastructure.database import connection
+from app.infrastructure.repositories.draft_repository import DraftRepository
+from app.infrastructure.repositories.idempotencia_repository import IdempotenciaRepository
+from app.infrastructure.repositories.sync_repository import SyncRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class PurgadorDrafts:
+    """Purga periódica de drafts vencidos"""
+
+    def __init__(self, intervalo_segundos: Optional[float] = None, session_factory=None):
+        self.intervalo = (
+            settings.DRAFT_PURGA_INTERVALO_SEGUNDOS if intervalo_segundos is None else intervalo_segundos
+        )
+        self._session_factory = session_factory
+        self._tarea: Optional[asyncio.Task] = None
+        self.eliminados = 0
+
+    async def purgar(self) -> int:
+        """Ejecutar una pasada; devuelve los drafts eliminados"""
+        factory = self._session_factory or connection.AsyncSessionLocal
+        async with factory() as db:
+            eliminados = await DraftRepository(db).purgar(
+                settings.DRAFT_TTL_DIAS,
+                settings.DRAFT_TTL_DIAS_POR_MODULO,
+                settings.DRAFT_RETENCION_COMPLETADOS_HORAS,
+            )
+            registro_sync = await SyncRepository(db).purgar(settings.SYNC_RETENCION_DIAS)
+            claves = await IdempotenciaRepository(db).purgar()
+        self.eliminados += eliminados
+        if eliminados:
+            logger.info("Drafts purgados: %s", eliminados)
+        if registro_sync:
+            logger.info("Registro de sync purgado: %s filas", registro_sync)
+        if claves:
+            logger.info("Claves de idempotencia vencidas purgadas: %s", claves)
+        return eliminados
+
+    async def _bucle(self):
+        while True:
+            try:
+                await self.purgar()
+            except Exception:
+                logger.exception("Error al purgar drafts")
+            await asyncio.sleep(self.intervalo)
+
+    def iniciar(self):
+        """Arrancar la tarea periódica (lifespan de la aplicación)"""
+        if self._tarea is None and self.intervalo > 0:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+
+purgador_drafts = PurgadorDrafts()
@@ -0,0 +1,92 @@
+"""
+Servicio de reporte de linaje embrionario
+
+Combina las etapas OPU → fecundación → transferencia → GFE por donadora y
+calcula las tasas de conversión en el servidor.
+"""
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.repositories.linaje_repository import LinajeRepository
+
+
+ETAPAS = ("ovocitos", "ovocitos_fecundados", "fecundaciones", "transferencias", "chequeadas", "prenadas")
+
+
+def _tasa(numerador: int, denominador: int) -> Optional[float]:
+    """Porcentaje con dos decimales; None si no hay base"""
+    if not denominador:
+        return None
+    return round(numerador * 100 / denominador, 2)
+
+
+def calcular_tasas(etapas: Dict[str, int]) -> Dict[str, Optional[float]]:
+    """Tasas de conversión entre etapas del linaje"""
+    return {
+        "tasa_fecundacion": _tasa(etapas["ovocitos_fecundados"], etapas["ovocitos"]),
+        "transferencias_por_ovocito_fecundado": _tasa(etapas["transferencias"], etapas["ovocitos_fecundados"]),
+        "transferencias_por_ovocito": _tasa(etapas["transferencias"], etapas["ovocitos"]),
+        "tasa_chequeo": _tasa(etapas["chequeadas"], etapas["transferencias"]),
+        "tasa_prenez": _tasa(etapas["prenadas"], etapas["chequeadas"]),
+        "prenadas_por_ovocito": _tasa(etapas["prenadas"], etapas["ovocitos"]),
+    }
+
+
+class LinajeService:
+    """Reporte de linaje por donadora, sesión OPU o rango de fechas"""
+
+    def __init__(self, db: AsyncSession):
+        self.repo = LinajeRepository(db)
+
+    async def reporte(
+        self,
+        donadora_id: Optional[int] = None,
+        sesion_opu_id: Optional[int] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        Construir el reporte de linaje
+
+        Returns:
+            {"donadoras": [...], "totales": {...}} con conteos por etapa y tasas
+        """
+        filtros = dict(donadora_id=donadora_id, sesion_opu_id=sesion_opu_id, desde=desde, hasta=hasta)
+        extracciones = await self.repo.extracciones_por_donadora(**filtros)
+        fecundaciones = await self.repo.fecundaciones_por_donadora(**filtros)
+        transferencias = await self.repo.transferencias_por_donadora(**filtros)
+
+        ids = set(extracciones) | set(fecundaciones) | set(transferencias)
+        nombres = await self.repo.nombres_donadoras(ids - set(extracciones))
+
+        filas = []
+        totales = {etapa: 0 for etapa in ETAPAS}
+        totales.update(sesiones=0, extracciones=0)
+        for donadora in sorted(ids):
+            ext = extracciones.get(donadora, {})
+            trf = transferencias.get(donadora, {})
+            etapas = {
+                "ovocitos": ext.get("ovocitos", 0),
+                "ovocitos_fecundados": ext.get("ovocitos_fecundados", 0),
+                "fecundaciones": fecundaciones.get(donadora, 0),
+                "transferencias": trf.get("transferencias", 0),
+                "chequeadas": trf.get("chequeadas", 0),
+                "prenadas": trf.get("prenadas", 0),
+            }
+            info = nombres.get(donadora, ext)
+            filas.append({
+                "donadora_id": donadora,
+                "nombre": info.get("nombre"),
+                "numero_registro": info.get("numero_registro"),
+                "sesiones": ext.get("sesiones", 0),
+                "extracciones": ext.get("extracciones", 0),
+                **etapas,
+                "tasas": calcular_tasas(etapas),
+            })
+            for campo in (*ETAPAS, "sesiones", "extracciones"):
+                totales[campo] += filas[-1][campo]
+
+        totales["tasas"] = calcular_tasas(totales)
+        return {"donadoras": filas, "totales": totales}
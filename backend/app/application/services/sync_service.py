@@ -0,0 +1,314 @@
+"""
+Sincronización de clientes offline
+
+Lectura (GET /sync?since=): a partir del registro_cambios arma, por tabla,
+las filas cambiadas desde el cursor (con el mismo schema que los listados),
+las lápidas de las eliminadas y las tablas a recargar completas. Varios
+cambios de una misma fila en la página se reducen al último.
+
+Escritura (POST /sync/push): aplica en orden las mutaciones encoladas por
+el cliente, cada una en su propia transacción junto con su registro en
+mutaciones_sync. Reenviar una mutación ya procesada devuelve el resultado
+guardado sin volver a aplicarla.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.application.schemas.donadora_schema import DonadoraCreate, DonadoraResponse, DonadoraUpdate
+from app.application.schemas.fecundacion_schema import FecundacionCreate, FecundacionResponse, FecundacionUpdate
+from app.application.schemas.gfe_schema import GFECreate, GFEResponse, GFEUpdate
+from app.application.schemas.opu_schema import SesionOPUCreate, SesionOPUResponse, SesionOPUUpdate
+from app.application.schemas.sesion_transferencia_schema import (
+    SesionTransferenciaCreate,
+    SesionTransferenciaResponse,
+    SesionTransferenciaUpdate,
+)
+from app.application.schemas.sync_schema import (
+    CambiosTabla,
+    MutacionOffline,
+    ResultadoMutacion,
+    SyncResponse,
+)
+from app.application.schemas.transferencia_schema import (
+    TransferenciaCreate,
+    TransferenciaResponse,
+    TransferenciaUpdate,
+)
+from app.infrastructure.database.models import (
+    ChequeoGFE,
+    Donadora,
+    Fecundacion,
+    MutacionSync,
+    SesionOPU,
+    SesionTransferencia,
+    TransferenciaRealizada,
+)
+from app.infrastructure.repositories.base_repository import BaseRepository
+from app.infrastructure.repositories.opu_repository import OPURepository
+from app.infrastructure.repositories.sync_repository import SyncRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class MutacionRechazada(ValueError):
+    """La mutación no se puede aplicar (datos inválidos, fila inexistente...)"""
+
+
+@dataclass(frozen=True)
+class EntidadSync:
+    """Tabla sincronizable: cómo se lee y cómo se escribe"""
+    modelo: Any
+    respuesta: Type[BaseModel]
+    crear: Type[BaseModel]
+    actualizar: Type[BaseModel]
+    colecciones: tuple = ()  # relaciones embebidas en la respuesta (selectinload)
+    eliminar_logico: bool = False  # True: eliminar = activo False
+
+
+ENTIDADES: Dict[str, EntidadSync] = {
+    "donadoras": EntidadSync(
+        Donadora, DonadoraResponse, DonadoraCreate, DonadoraUpdate, eliminar_logico=True
+    ),
+    "sesiones_opu": EntidadSync(
+        SesionOPU, SesionOPUResponse, SesionOPUCreate, SesionOPUUpdate, colecciones=("extracciones_donadoras",)
+    ),
+    "sesiones_transferencia": EntidadSync(
+        SesionTransferencia, SesionTransferenciaResponse, SesionTransferenciaCreate, SesionTransferenciaUpdate,
+        colecciones=("transferencias_realizadas",),
+    ),
+    "transferencias_realizadas": EntidadSync(
+        TransferenciaRealizada, TransferenciaResponse, TransferenciaCreate, TransferenciaUpdate
+    ),
+    "chequeos_gfe": EntidadSync(ChequeoGFE, GFEResponse, GFECreate, GFEUpdate),
+    "fecundaciones": EntidadSync(Fecundacion, FecundacionResponse, FecundacionCreate, FecundacionUpdate),
+}
+
+
+class SyncService:
+    def __init__(self, db: AsyncSession, usuario_id: int):
+        self.db = db
+        self.usuario_id = usuario_id
+        self.repo = SyncRepository(db)
+
+    # ---------- Lectura ----------
+
+    async def cambios(self, desde: int, limite: int, tablas: Optional[Iterable[str]] = None) -> SyncResponse:
+        """Cambios posteriores al cursor `desde` (a lo sumo `limite` filas del registro)"""
+        minimo, maximo = await self.repo.limites_cursor()
+        # Cursor inicial, vencido (purgado) o de otra base: el cliente recarga todo
+        if desde <= 0 or desde > maximo or (minimo is not None and desde < minimo - 1):
+            return SyncResponse(cursor=maximo, reset=True)
+
+        filas = await self.repo.cambios_desde(desde, limite + 1, tablas)
+        mas = len(filas) > limite
+        filas = filas[:limite]
+        # Sin más páginas el cliente queda al día hasta el máximo leído. Con
+        # `tablas` el cursor solo vale para ese conjunto: el cliente guarda uno
+        # por filtro (syncService.js) y no lo usa para las demás tablas
+        cursor = filas[-1].id if mas else max(maximo, filas[-1].id if filas else 0)
+
+        ultimos: Dict[str, Dict[Optional[int], str]] = {}
+        for cambio in filas:
+            ultimos.setdefault(cambio.tabla, {})[cambio.fila_id] = cambio.operacion
+
+        cambios = {}
+        for tabla, operaciones in ultimos.items():
+            entidad = ENTIDADES.get(tabla)
+            if entidad is None:
+                continue
+            resultado = CambiosTabla(reset=None in operaciones)
+            upserts = sorted(i for i, op in operaciones.items() if i is not None and op == "upsert")
+            resultado.delete = sorted(i for i, op in operaciones.items() if i is not None and op == "delete")
+            if upserts and not resultado.reset:
+                encontradas = await self._cargar(entidad, upserts)
+                resultado.upsert = [
+                    entidad.respuesta.model_validate(fila).model_dump(mode="json") for fila in encontradas
+                ]
+                # Borradas después (en una página posterior): se envían como lápida
+                vistas = {fila.id for fila in encontradas}
+                resultado.delete.extend(i for i in upserts if i not in vistas)
+            cambios[tabla] = resultado
+
+        return SyncResponse(cursor=cursor, mas=mas, cambios=cambios)
+
+    async def _cargar(self, entidad: EntidadSync, ids: List[int]) -> list:
+        modelo = entidad.modelo
+        result = await self.db.execute(
+            select(modelo)
+            .options(*(selectinload(getattr(modelo, relacion)) for relacion in entidad.colecciones))
+            .where(modelo.id.in_(ids))
+        )
+        return result.scalars().all()
+
+    # ---------- Escritura ----------
+
+    async def aplicar(self, mutaciones: List[MutacionOffline]) -> List[ResultadoMutacion]:
+        """Aplicar mutaciones en orden; cada una se confirma (o rechaza) por separado"""
+        return [await self._aplicar_una(mutacion) for mutacion in mutaciones]
+
+    async def _aplicar_una(self, mutacion: MutacionOffline) -> ResultadoMutacion:
+        previa = await self.repo.get_mutacion(self.usuario_id, mutacion.id)
+        if previa is not None:
+            return _resultado(previa, repetida=True)
+
+        registro = MutacionSync(
+            usuario_id=self.usuario_id,
+            mutacion_id=mutacion.id,
+            entidad=mutacion.entidad,
+            operacion=mutacion.operacion,
+            estado="aplicada",
+        )
+        # Se confirma en el mismo commit que la escritura de la entidad
+        self.db.add(registro)
+        try:
+            registro.fila_id = await self._ejecutar(mutacion)
+            await self.db.commit()
+            return _resultado(registro)
+        except ValueError as exc:
+            # MutacionRechazada, ValidationError de pydantic o datos inválidos del repositorio
+            await self.db.rollback()
+            return await self._rechazar(mutacion, str(exc))
+        except IntegrityError as exc:
+            await self.db.rollback()
+            # Otra request aplicó la misma mutación en paralelo
+            previa = await self.repo.get_mutacion(self.usuario_id, mutacion.id)
+            if previa is not None:
+                return _resultado(previa, repetida=True)
+            return await self._rechazar(mutacion, f"Violación de integridad: {exc.orig}")
+        except Exception:
+            await self.db.rollback()
+            logger.exception("Error aplicando mutación %s", mutacion.id)
+            # No se guarda: el cliente la reintenta en la próxima sincronización
+            return ResultadoMutacion(id=mutacion.id, estado="error", error="Error interno")
+
+    async def _rechazar(self, mutacion: MutacionOffline, error: str) -> ResultadoMutacion:
+        """Guardar el rechazo para que el reenvío reciba la misma respuesta"""
+        registro = MutacionSync(
+            usuario_id=self.usuario_id,
+            mutacion_id=mutacion.id,
+            entidad=mutacion.entidad,
+            operacion=mutacion.operacion,
+            estado="rechazada",
+            error=error,
+        )
+        self.db.add(registro)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            previa = await self.repo.get_mutacion(self.usuario_id, mutacion.id)
+            return _resultado(previa, repetida=True)
+        return _resultado(registro)
+
+    async def _fila_destino(self, mutacion: MutacionOffline) -> int:
+        if mutacion.fila_id is not None:
+            return mutacion.fila_id
+        if mutacion.ref:
+            origen = await self.repo.get_mutacion(self.usuario_id, mutacion.ref)
+            if origen is not None and origen.fila_id is not None:
+                return origen.fila_id
+            raise MutacionRechazada(f"La mutación referida {mutacion.ref} no creó ninguna fila")
+        raise MutacionRechazada("Se requiere fila_id o ref")
+
+    async def _ejecutar(self, mutacion: MutacionOffline) -> Optional[int]:
+        """Escribir la entidad sin confirmar; devuelve el id de la fila afectada"""
+        entidad = ENTIDADES.get(mutacion.entidad)
+        if entidad is None:
+            raise MutacionRechazada(f"Entidad no sincronizable: {mutacion.entidad}")
+        manejador: Callable[..., Awaitable[Optional[int]]] = getattr(self, f"_{mutacion.operacion}")
+        return await manejador(entidad, mutacion)
+
+    async def _crear(self, entidad: EntidadSync, mutacion: MutacionOffline) -> int:
+        payload = entidad.crear.model_validate(mutacion.datos).model_dump()
+        if entidad.modelo is SesionOPU:
+            extracciones = payload.pop("extracciones", [])
+            sesion = SesionOPU(**payload, usuario_creacion_id=self.usuario_id)
+            return (await _opu_sin_commit(self.db).create_with_extracciones(sesion, extracciones)).id
+
+        if hasattr(entidad.modelo, "usuario_creacion_id"):
+            payload["usuario_creacion_id"] = self.usuario_id
+        fila = entidad.modelo(**payload)
+        self.db.add(fila)
+        await self.db.flush()
+        return fila.id
+
+    async def _actualizar(self, entidad: EntidadSync, mutacion: MutacionOffline) -> int:
+        fila_id = await self._fila_destino(mutacion)
+        payload = entidad.actualizar.model_validate(mutacion.datos).model_dump(exclude_unset=True)
+        fila = await self._obtener(entidad, fila_id)
+
+        if entidad.modelo is SesionOPU:
+            extracciones = payload.pop("extracciones", None)
+            await _opu_sin_commit(self.db).update(fila, payload, extracciones)
+            return fila_id
+
+        for campo, valor in payload.items():
+            setattr(fila, campo, valor)
+        await self.db.flush()
+        return fila_id
+
+    async def _eliminar(self, entidad: EntidadSync, mutacion: MutacionOffline) -> int:
+        fila_id = await self._fila_destino(mutacion)
+        # Con las colecciones cargadas el cascade del ORM registra también las lápidas de los hijos
+        encontradas = await self._cargar(entidad, [fila_id])
+        if not encontradas:
+            # Ya eliminada (p. ej. desde otro dispositivo): el resultado es el mismo
+            return fila_id
+        fila = encontradas[0]
+        if entidad.eliminar_logico:
+            fila.activo = False
+        elif entidad.modelo is SesionOPU:
+            await _opu_sin_commit(self.db).delete(fila)
+        else:
+            await self.db.delete(fila)
+        await self.db.flush()
+        return fila_id
+
+    async def _obtener(self, entidad: EntidadSync, fila_id: int):
+        if entidad.modelo is SesionOPU:
+            fila = await OPURepository(self.db).get_by_id(fila_id)
+        else:
+            fila = await BaseRepository(self.db, entidad.modelo).get_by_id(fila_id)
+        if fila is None:
+            raise MutacionRechazada(f"{entidad.modelo.__name__} {fila_id} no encontrada")
+        return fila
+
+
+class _SesionSinCommit:
+    """
+    Vista de la AsyncSession que convierte commit() en flush()
+
+    Los métodos de OPURepository confirman al final; dentro de /sync/push la
+    mutación y su registro deben confirmarse juntos en un único commit.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def commit(self):
+        await self._db.flush()
+
+    def __getattr__(self, nombre):
+        return getattr(self._db, nombre)
+
+
+def _opu_sin_commit(db: AsyncSession) -> OPURepository:
+    return OPURepository(_SesionSinCommit(db))
+
+
+def _resultado(registro: MutacionSync, repetida: bool = False) -> ResultadoMutacion:
+    return ResultadoMutacion(
+        id=registro.mutacion_id,
+        estado=registro.estado,
+        fila_id=registro.fila_id,
+        error=registro.error,
+        repetida=repetida,
+    )
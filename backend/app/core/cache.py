@@ -0,0 +1,439 @@
+"""
+Caché de respuestas con invalidación por etiquetas
+
+Las entradas se guardan por espacio (ruta) y parámetros como el cuerpo
+JSON ya serializado (bytes), de modo que un acierto no valida ni
+serializa nada, junto con etiquetas que indican de qué datos dependen:
+
+- "donadoras:*"  depende de toda la tabla (listados, estadísticas)
+- "donadoras:5"  depende solo de esa fila (detalle)
+
+Tras cada commit, la sesión informa las tablas y filas escritas (ver
+database/events.py) y se invalidan "tabla:*" más "tabla:<id>" de cada fila
+(o todas las "tabla:..." si la escritura fue un DML sin ids conocidos).
+
+Las respuestas con ETag (core/etag.py) incluyen el ETag en la clave: una
+entrada solo se sirve con el mismo snapshot de versiones_entidad con que
+se calculó, aunque la invalidación de otro worker no haya llegado.
+
+Backends intercambiables (CACHE_BACKEND):
+- memoria: LRU del proceso; con varios workers cada uno tiene su copia y
+  solo ve las invalidaciones de sus propias escrituras (el TTL acota el
+  desfase de las respuestas sin ETag).
+- sqlite: archivo local compartido por los workers de la máquina, con
+  invalidaciones visibles para todos. Sus operaciones bloquean (esperan el
+  lock del archivo), así que se ejecutan en el pool de hilos.
+
+La invalidación tras cada commit se registra al iniciar la aplicación
+(registrar_invalidacion).
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.infrastructure.database.events import al_confirmar_filas
+
+from . import metrics
+from .config import settings
+from .serializacion import serializar_json
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackendCache(ABC):
+    """Interfaz de almacenamiento de la caché"""
+
+    # True si las operaciones pueden bloquear (E/S): se ejecutan fuera del event loop
+    bloqueante = False
+
+    @abstractmethod
+    def get(self, clave: str) -> Tuple[bool, Any]:
+        """(encontrado, valor) de una entrada vigente"""
+
+    @abstractmethod
+    def set(self, clave: str, valor: Any, ttl: float, etiquetas: Iterable[str], generacion: int):
+        """Guardar si no hubo invalidaciones desde 'generacion'"""
+
+    @abstractmethod
+    def invalidar(self, etiquetas: Iterable[str] = (), prefijos: Iterable[str] = ()) -> int:
+        """Eliminar entradas con alguna etiqueta exacta o con prefijo; devuelve cuántas"""
+
+    @abstractmethod
+    def generacion(self) -> int:
+        """Contador que cambia con cada invalidación"""
+
+    @abstractmethod
+    def vaciar(self):
+        """Eliminar todas las entradas"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Entradas guardadas"""
+
+
+class CacheMemoria(BackendCache):
+    """LRU en memoria del proceso con TTL por entrada"""
+
+    def __init__(self, max_entradas: int = 1024):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._por_etiqueta: Dict[str, Set[str]] = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    def _quitar(self, clave: str):
+        entrada = self._datos.pop(clave, None)
+        if entrada is None:
+            return
+        for etiqueta in entrada[2]:
+            claves = self._por_etiqueta.get(etiqueta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_etiqueta[etiqueta]
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return False, None
+            if entrada[0] < time.monotonic():
+                self._quitar(clave)
+                return False, None
+            self._datos.move_to_end(clave)
+            return True, entrada[1]
+
+    def set(self, clave, valor, ttl, etiquetas, generacion):
+        if ttl <= 0:
+            return
+        etiquetas = tuple(etiquetas)
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._quitar(clave)
+            self._datos[clave] = (time.monotonic() + ttl, valor, etiquetas)
+            for etiqueta in etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(clave)
+            while len(self._datos) > self.max_entradas:
+                self._quitar(next(iter(self._datos)))
+
+    def invalidar(self, etiquetas=(), prefijos=()):
+        prefijos = tuple(prefijos)
+        with self._lock:
+            self._generacion += 1
+            afectadas = set()
+            for etiqueta in etiquetas:
+                afectadas |= self._por_etiqueta.get(etiqueta, set())
+            if prefijos:
+                for etiqueta, claves in self._por_etiqueta.items():
+                    if etiqueta.startswith(prefijos):
+                        afectadas |= claves
+            for clave in afectadas:
+                self._quitar(clave)
+            return len(afectadas)
+
+    def generacion(self):
+        return self._generacion
+
+    def vaciar(self):
+        with self._lock:
+            self._generacion += 1
+            self._datos.clear()
+            self._por_etiqueta.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CacheSQLite(BackendCache):
+    """
+    Caché en un archivo SQLite local (compartida entre procesos); guarda bytes
+
+    Operaciones por clave primaria sobre un archivo local en WAL, sin pasar
+    por el engine de la aplicación. Son síncronas y pueden esperar el lock
+    del archivo (timeout=5): CacheRespuestas las ejecuta en hilos, cada uno
+    con su conexión.
+    """
+
+    bloqueante = True
+
+    def __init__(self, ruta: str, max_entradas: int = 1024):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        with self._conexion() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entradas (
+                    clave TEXT PRIMARY KEY, valor BLOB NOT NULL, expira REAL NOT NULL, usado REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_entradas_usado ON entradas (usado);
+                CREATE TABLE IF NOT EXISTS etiquetas (
+                    etiqueta TEXT NOT NULL, clave TEXT NOT NULL, PRIMARY KEY (etiqueta, clave)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ix_etiquetas_clave ON etiquetas (clave);
+                CREATE TABLE IF NOT EXISTS meta (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+                INSERT OR IGNORE INTO meta VALUES ('generacion', 0);
+                """
+            )
+
+    def _conexion(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _borrar(self, conn, condicion: str, parametros=()) -> int:
+        claves = [fila[0] for fila in conn.execute(f"SELECT clave FROM entradas WHERE {condicion}", parametros)]
+        for clave in claves:
+            conn.execute("DELETE FROM entradas WHERE clave = ?", (clave,))
+            conn.execute("DELETE FROM etiquetas WHERE clave = ?", (clave,))
+        return len(claves)
+
+    def get(self, clave):
+        conn = self._conexion()
+        fila = conn.execute("SELECT valor, expira, usado FROM entradas WHERE clave = ?", (clave,)).fetchone()
+        if fila is None:
+            return False, None
+        ahora = time.time()
+        if fila[1] < ahora:
+            return False, None
+        # LRU aproximado: no escribir en cada acierto
+        if ahora - fila[2] > 60:
+            conn.execute("UPDATE entradas SET usado = ? WHERE clave = ?", (ahora, clave))
+        return True, fila[0]
+
+    def set(self, clave, valor, ttl, etiquetas, generacion):
+        if ttl <= 0:
+            return
+        conn = self._conexion()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT valor FROM meta WHERE nombre = 'generacion'").fetchone()[0] != generacion:
+                conn.execute("ROLLBACK")
+                return
+            ahora = time.time()
+            conn.execute("DELETE FROM etiquetas WHERE clave = ?", (clave,))
+            conn.execute(
+                "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?)",
+                (clave, valor, ahora + ttl, ahora),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO etiquetas VALUES (?, ?)", [(e, clave) for e in etiquetas]
+            )
+            sobrantes = conn.execute("SELECT COUNT(*) FROM entradas").fetchone()[0] - self.max_entradas
+            if sobrantes > 0:
+                self._borrar(
+                    conn,
+                    "clave IN (SELECT clave FROM entradas ORDER BY expira < ? DESC, usado LIMIT ?)",
+                    (ahora, sobrantes),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidar(self, etiquetas=(), prefijos=()):
+        conn = self._conexion()
+        condiciones, parametros = [], []
+        etiquetas = list(etiquetas)
+        if etiquetas:
+            condiciones.append(f"etiqueta IN ({', '.join('?' * len(etiquetas))})")
+            parametros.extend(etiquetas)
+        for prefijo in prefijos:
+            condiciones.append("substr(etiqueta, 1, ?) = ?")
+            parametros.extend((len(prefijo), prefijo))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE meta SET valor = valor + 1 WHERE nombre = 'generacion'")
+            eliminadas = 0
+            if condiciones:
+                eliminadas = self._borrar(
+                    conn,
+                    f"clave IN (SELECT clave FROM etiquetas WHERE {' OR '.join(condiciones)})",
+                    parametros,
+                )
+            conn.execute("COMMIT")
+            return eliminadas
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def generacion(self):
+        return self._conexion().execute("SELECT valor FROM meta WHERE nombre = 'generacion'").fetchone()[0]
+
+    def vaciar(self):
+        conn = self._conexion()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM entradas")
+        conn.execute("DELETE FROM etiquetas")
+        conn.execute("UPDATE meta SET valor = valor + 1 WHERE nombre = 'generacion'")
+        conn.execute("COMMIT")
+
+    def __len__(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM entradas").fetchone()[0]
+
+
+class CacheNula(BackendCache):
+    """Caché desactivada"""
+
+    def get(self, clave):
+        return False, None
+
+    def set(self, clave, valor, ttl, etiquetas, generacion):
+        pass
+
+    def invalidar(self, etiquetas=(), prefijos=()):
+        return 0
+
+    def generacion(self):
+        return 0
+
+    def vaciar(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+def crear_backend(config=settings) -> BackendCache:
+    """Backend según CACHE_BACKEND (memoria | sqlite | ninguno)"""
+    if config.CACHE_BACKEND == "sqlite":
+        return CacheSQLite(config.CACHE_SQLITE_RUTA, config.CACHE_MAX_ENTRADAS)
+    if config.CACHE_BACKEND == "memoria":
+        return CacheMemoria(config.CACHE_MAX_ENTRADAS)
+    return CacheNula()
+
+
+def clave_cache(
+    espacio: str, parametros: Optional[Dict[str, Any]] = None, validador: Optional[str] = None
+) -> str:
+    """'espacio?a=1&b=2' con los parámetros ordenados (None se omite) y '#<ETag>' si lo hay"""
+    clave = espacio
+    if parametros:
+        partes = [f"{k}={v}" for k, v in sorted(parametros.items()) if v is not None]
+        clave = f"{espacio}?{'&'.join(partes)}"
+    return f"{clave}#{validador}" if validador else clave
+
+
+class CacheRespuestas:
+    """Fachada usada por los endpoints: obtener o calcular, con métricas"""
+
+    def __init__(self, backend: BackendCache, ttl_segundos: float):
+        self.backend = backend
+        self.ttl = ttl_segundos
+
+    async def _ejecutar(self, operacion: Callable[..., Any], *args) -> Any:
+        if self.backend.bloqueante:
+            return await asyncio.to_thread(operacion, *args)
+        return operacion(*args)
+
+    async def obtener_o_calcular(
+        self,
+        espacio: str,
+        parametros: Optional[Dict[str, Any]],
+        etiquetas: Iterable[str],
+        calcular: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        validador: Optional[str] = None,
+    ) -> bytes:
+        """
+        Cuerpo JSON cacheado o el de calcular() serializado
+
+        calcular() puede devolver bytes ya serializados (lista_json) o un
+        valor que se serializa con serializar_json. Si entre el inicio del
+        cálculo y el guardado hubo una invalidación, el resultado se
+        devuelve pero no se guarda.
+
+        validador: ETag de la respuesta (el que puso condicional()); forma
+        parte de la clave para no servir un cuerpo de otras versiones
+        """
+        clave = clave_cache(espacio, parametros, validador)
+        encontrado, cuerpo = await self._ejecutar(self.backend.get, clave)
+        if encontrado:
+            metrics.cache_requests_total.inc(espacio, "hit")
+            return cuerpo
+
+        metrics.cache_requests_total.inc(espacio, "miss")
+        generacion = await self._ejecutar(self.backend.generacion)
+        cuerpo = serializar_json(await calcular())
+        await self._ejecutar(
+            self.backend.set, clave, cuerpo, self.ttl if ttl is None else ttl, list(etiquetas), generacion
+        )
+        return cuerpo
+
+    def invalidar(self, etiquetas: Iterable[str] = (), prefijos: Iterable[str] = ()) -> int:
+        eliminadas = self.backend.invalidar(etiquetas, prefijos)
+        if eliminadas:
+            metrics.cache_invalidaciones_total.inc(valor=eliminadas)
+        return eliminadas
+
+    def invalidar_filas(self, filas: Dict[str, Optional[Set[Any]]]) -> int:
+        """
+        Invalidar según lo escrito en un commit
+
+        filas: tabla -> ids escritos, o None si no se conocen (DML masivo)
+        """
+        etiquetas, prefijos = [], []
+        for tabla, ids in filas.items():
+            if ids is None:
+                prefijos.append(f"{tabla}:")
+            else:
+                etiquetas.append(f"{tabla}:*")
+                etiquetas.extend(f"{tabla}:{id_}" for id_ in ids)
+        return self.invalidar(etiquetas, prefijos)
+
+    def al_confirmar(self, filas: Dict[str, Optional[Set[Any]]]):
+        """
+        Callback de after_commit: invalidar sin afectar a la request
+
+        El commit ya se hizo; un error de la caché se registra en el log en
+        lugar de convertirse en un 500. Con un backend bloqueante la
+        invalidación se hace en un hilo sin esperarla (las respuestas con
+        ETag no dependen de ella: su clave cambia con las versiones).
+        """
+        def invalidar():
+            try:
+                self.invalidar_filas(filas)
+            except Exception:
+                logger.exception("No se pudo invalidar la caché de respuestas (%s)", ", ".join(sorted(filas)))
+
+        if self.backend.bloqueante:
+            try:
+                asyncio.get_running_loop().run_in_executor(None, invalidar)
+                return
+            except RuntimeError:
+                # Sin event loop (scripts, sesiones síncronas)
+                pass
+        invalidar()
+
+    def vaciar(self):
+        self.backend.vaciar()
+
+
+cache_respuestas = CacheRespuestas(crear_backend(), settings.CACHE_TTL_SEGUNDOS)
+
+metrics.registro.gauge(
+    "cache_entradas", "Entradas en la caché de respuestas", funcion=lambda: len(cache_respuestas.backend)
+)
+
+
+_invalidacion_registrada = False
+
+
+def registrar_invalidacion():
+    """Invalidar la caché al confirmar escrituras en cualquier sesión (una vez, al iniciar)"""
+    global _invalidacion_registrada
+    if not _invalidacion_registrada:
+        al_confirmar_filas(cache_respuestas.al_confirmar)
+        _invalidacion_registrada = True
@@ -1,24 +1,32 @@
 """
 Servicio para upload de imágenes a Cloudinary
+
+El SDK se importa y configura en el primer uso: importarlo al arrancar
+(requests/urllib3/certifi) alarga el cold start aunque no se suba nada.
 """
-# Updated to use cloudinary.utils
-import cloudinary
-import cloudinary.uploader
-import cloudinary.utils
+from functools import lru_cache
 from fastapi import UploadFile, HTTPException, status
 from typing import Optional
 import uuid
 
 from app.core.config import settings
+from app.core.metrics import upload_duration_seconds, upload_size_bytes
+
 
+@lru_cache(maxsize=1)
+def _cloudinary():
+    """Módulo cloudinary importado y configurado (una sola vez)"""
+    import cloudinary
+    import cloudinary.uploader
+    import cloudinary.utils
 
-# Configurar Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True
-)
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET,
+        secure=True
+    )
+    return cloudinary
 
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
@@ -60,18 +68,20 @@ async def upload_image(
         public_id = f"{folder}/{uuid.uuid4().hex}"
 
         # Subir a Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            content,
-            public_id=public_id,
-            folder=folder,
-            resource_type="image",
-            transformation=[
-                {"quality": "auto", "fetch_format": "auto"}
-            ]
-        )
+        upload_size_bytes.observe(folder, valor=len(content))
+        with upload_duration_seconds.time(folder):
+            upload_result = _cloudinary().uploader.upload(
+                content,
+                public_id=public_id,
+                folder=folder,
+                resource_type="image",
+                transformation=[
+                    {"quality": "auto", "fetch_format": "auto"}
+                ]
+            )
 
         # Generar URL optimizada para thumbnail (300x300)
-        thumbnail_url, _ = cloudinary.utils.cloudinary_url(
+        thumbnail_url, _ = _cloudinary().utils.cloudinary_url(
             upload_result['public_id'],
             width=300,
             height=300,
@@ -104,7 +114,7 @@ async def delete_image(public_id: str) -> bool:
         True si se eliminó correctamente
     """
     try:
-        result = cloudinary.uploader.destroy(public_id)
+        result = _cloudinary().uploader.destroy(public_id)
         return result.get('result') == 'ok'
     except Exception as e:
         print(f"Error al eliminar imagen de Cloudinary: {e}")
@@ -129,7 +139,7 @@ def get_optimized_url(
     Returns:
         URL optimizada de la imagen
     """
-    url, _ = cloudinary.utils.cloudinary_url(
+    url, _ = _cloudinary().utils.cloudinary_url(
         public_id,
         width=width,
         height=height,
@@ -2,7 +2,7 @@
 Configuración de la aplicación usando Pydantic Settings
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,28 @@ class Settings(BaseSettings):
     # Base de datos
     DATABASE_URL: str = "sqlite+aiosqlite:///./embriones.db"
 
+    # Réplica de lectura opcional para GETs
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_STICKY_SECONDS: float = 5  # tras escribir, el cliente lee del primario este tiempo
+
+    # Pool de conexiones y driver (None = valor del perfil de ENVIRONMENT)
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_RECYCLE: int | None = None  # segundos antes de reciclar una conexión
+    DB_POOL_TIMEOUT: int | None = None  # segundos esperando una conexión libre
+    DB_POOL_PRE_PING: bool | None = None  # ping en cada checkout (un round trip extra)
+    DB_STATEMENT_TIMEOUT_MS: int | None = None  # 0 = sin límite
+    DB_PREPARE_THRESHOLD: int | None = 5  # psycopg: ejecuciones antes de preparar en servidor
+    DB_PGBOUNCER: bool = False  # modo transaction pooling: sin prepared statements en servidor
+
+    # SQLite (instalaciones locales): WAL, pragmas y un único escritor
+    SQLITE_TUNING: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    SQLITE_CACHE_SIZE_KB: int = 20000
+    SQLITE_READ_POOL_SIZE: int = 4  # conexiones de solo lectura para GETs
+    SQLITE_WRITE_TIMEOUT: int = 30  # segundos esperando turno de escritura
+
     # Seguridad
     SECRET_KEY: str = "tu-secret-key-super-segura-cambiar-en-produccion"
     ALGORITHM: str = "HS256"
@@ -56,6 +78,60 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 5242880  # 5MB
 
+    # Instrumentación SQL
+    SQL_LENTAS_TOP: int = 3  # sentencias más lentas reportadas por request
+    SQL_NPLUS1_UMBRAL: int = 10  # repeticiones de una misma sentencia; 0 desactiva
+    SQL_NPLUS1_ERROR: bool = False  # True: lanzar error en vez de warning (dev/test)
+    SQL_SLOW_MS: float = 200  # umbral del log de sentencias lentas; 0 desactiva
+    SQL_SLOW_EXPLAIN: bool = False  # adjuntar plan (EXPLAIN) a las sentencias lentas
+    SQL_SLOW_EXPLAIN_ANALYZE: bool = False  # PostgreSQL: EXPLAIN ANALYZE (vuelve a ejecutar la sentencia)
+
+    # Métricas Prometheus (/metrics)
+    METRICS_ENABLED: bool = True
+
+    # Drafts (autosave)
+    # Intervalo del buffer de autosave: los PATCH se aplican en memoria y se escriben
+    # cada tanto (a 3 s por autosave, 30 s ≈ una escritura cada 10); 0 escribe cada patch
+    DRAFT_FLUSH_SEGUNDOS: float = 30
+    DRAFT_SNAPSHOT_CADA: int = 20  # patches acumulados antes de compactar datos_json
+    DRAFT_COMPRIMIR_DESDE_BYTES: int = 8192  # datos_json más grandes se guardan con zlib; 0 desactiva
+    # Retención: drafts sin tocar durante el TTL y completados tras la retención se eliminan
+    DRAFT_TTL_DIAS: int = 30
+    DRAFT_TTL_DIAS_POR_MODULO: Dict[str, int] = {}  # p. ej. {"opu": 7}; JSON en la variable de entorno
+    DRAFT_RETENCION_COMPLETADOS_HORAS: int = 24
+    DRAFT_PURGA_INTERVALO_SEGUNDOS: int = 3600  # 0 desactiva la purga periódica
+
+    # Caché de respuestas (invalidada por etiquetas al confirmar escrituras)
+    CACHE_BACKEND: str = "memoria"  # memoria | sqlite | ninguno
+    CACHE_SQLITE_RUTA: str = "./cache_respuestas.db"
+    CACHE_MAX_ENTRADAS: int = 1024
+    CACHE_TTL_SEGUNDOS: int = 300
+
+    # Sincronización offline (/sync)
+    SYNC_LIMITE_CAMBIOS: int = 500  # filas de registro_cambios por página de GET /sync
+    SYNC_MAX_MUTACIONES: int = 200  # mutaciones por lote de POST /sync/push
+    SYNC_RETENCION_DIAS: int = 30  # registro y mutaciones más viejos se purgan (cursor vencido = reset)
+
+    # Idempotency-Key en escrituras (POST/PUT/PATCH/DELETE de la API)
+    IDEMPOTENCIA_HABILITADA: bool = True
+    IDEMPOTENCIA_TTL_HORAS: int = 24  # tiempo que se guarda la respuesta para reintentos
+    IDEMPOTENCIA_EN_CURSO_SEGUNDOS: int = 120  # reserva huérfana (proceso caído): se puede reintentar
+    IDEMPOTENCIA_MAX_BYTES: int = 1_048_576  # respuestas más grandes no se guardan
+
+    # Compresión de respuestas (gzip; brotli si está instalado)
+    COMPRESION_HABILITADA: bool = True
+    COMPRESION_MIN_BYTES: int = 1024  # cuerpos más chicos se envían sin comprimir
+    # Nivel por clase de ruta: api (JSON interactivo), exportacion (CSV/export), archivos (/uploads)
+    COMPRESION_NIVELES: Dict[str, int] = {"api": 5, "exportacion": 9, "archivos": 6}
+    COMPRESION_TIPOS_EXCLUIDOS: List[str] = [
+        "image/", "video/", "audio/", "font/woff",
+        "application/zip", "application/gzip", "application/x-gzip",
+        "application/pdf", "application/octet-stream",
+    ]
+
+    # Dashboard
+    DASHBOARD_CACHE_TTL: int = 30  # segundos; 0 desactiva la caché
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -2,11 +2,12 @@
 Dependency Injection para FastAPI
 """
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..infrastructure.database.connection import AsyncSessionLocal
+from ..infrastructure.database import connection
+from ..infrastructure.database.replica import clave_cliente
 from ..infrastructure.repositories.usuario_repository import UsuarioRepository
 from .security import decode_access_token
 
@@ -15,7 +16,14 @@ from .security import decode_access_token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_db() -> Generator[AsyncSession, None, None]:
+def _clave_request(request: Request) -> str:
+    return clave_cliente(
+        request.headers.get("authorization"),
+        request.client.host if request.client else None,
+    )
+
+
+async def get_db(request: Request) -> Generator[AsyncSession, None, None]:
     """
     Dependency para obtener sesión de base de datos
 
@@ -24,7 +32,26 @@ async def get_db() -> Generator[AsyncSession, None, None]:
         async def get_items(db: AsyncSession = Depends(get_db)):
             ...
     """
-    async with AsyncSessionLocal() as session:
+    enrutador = connection.enrutador_lecturas
+    async with enrutador.primaria() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+            if session.info.pop("escritura_confirmada", False):
+                enrutador.registrar_escritura(_clave_request(request))
+
+
+async def get_read_db(request: Request) -> Generator[AsyncSession, None, None]:
+    """
+    Dependency para endpoints de solo lectura (GET)
+
+    Usa la réplica si está configurada (o el primario durante unos segundos
+    tras una escritura del mismo cliente); en SQLite, conexiones query_only
+    que no esperan al escritor; en el resto de casos equivale a get_db.
+    """
+    factory = connection.enrutador_lecturas.factory_lectura(_clave_request(request))
+    async with factory() as session:
         try:
             yield session
         finally:
@@ -33,7 +60,7 @@ async def get_db() -> Generator[AsyncSession, None, None]:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Dependency para obtener usuario actual autenticado
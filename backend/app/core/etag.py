@@ -0,0 +1,84 @@
+"""
+GET condicionales (ETag / Last-Modified)
+
+El validador de una respuesta se calcula con los contadores de
+versiones_entidad de las tablas que la componen (una consulta por clave
+primaria), más la ruta y los parámetros. Si coincide con If-None-Match se
+responde 304 antes de ejecutar la consulta del endpoint y de serializar.
+
+Uso:
+    @router.get("/", dependencies=[Depends(condicional("donadoras"))])
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.models import VersionEntidad
+from .config import settings
+from .dependencies import get_current_user, get_read_db
+
+
+def calcular_etag(ruta: str, consulta: str, versiones: Dict[str, int]) -> str:
+    """ETag débil: la representación depende de la ruta, los parámetros y las versiones"""
+    partes = [settings.APP_VERSION, ruta, consulta]
+    partes.extend(f"{tabla}={version}" for tabla, version in sorted(versiones.items()))
+    return 'W/"' + hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil (RFC 9110) contra la lista de If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaco = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == opaco for candidato in if_none_match.split(","))
+
+
+async def obtener_versiones(db: AsyncSession, tablas: Iterable[str]):
+    """(versiones por tabla, última modificación) de versiones_entidad"""
+    tablas = list(tablas)
+    result = await db.execute(
+        select(VersionEntidad.tabla, VersionEntidad.version, VersionEntidad.fecha_actualizacion)
+        .where(VersionEntidad.tabla.in_(tablas))
+    )
+    versiones = dict.fromkeys(tablas, 0)
+    ultima: Optional[datetime] = None
+    for tabla, version, fecha in result:
+        versiones[tabla] = version
+        if fecha is not None:
+            fecha = fecha if fecha.tzinfo else fecha.replace(tzinfo=timezone.utc)
+            ultima = fecha if ultima is None else max(ultima, fecha)
+    return versiones, ultima
+
+
+def condicional(*tablas: str):
+    """
+    Dependencia que añade ETag/Last-Modified y responde 304 si no hubo cambios
+
+    Solo se valida If-None-Match: Last-Modified tiene resolución de segundos
+    y dos escrituras en el mismo segundo darían un 304 incorrecto.
+    """
+    async def verificar(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
+        current_user = Depends(get_current_user),
+    ):
+        versiones, ultima = await obtener_versiones(db, tablas)
+        etag = calcular_etag(request.url.path, request.url.query, versiones)
+
+        cabeceras = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if ultima is not None:
+            cabeceras["Last-Modified"] = format_datetime(ultima.astimezone(timezone.utc), usegmt=True)
+
+        if coincide_etag(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+        response.headers.update(cabeceras)
+
+    return verificar
@@ -0,0 +1,140 @@
+"""
+JSON Patch (RFC 6902) y JSON Pointer (RFC 6901)
+
+Implementación mínima para los drafts: el cliente envía los cambios del
+formulario como operaciones add/remove/replace/move/copy/test y el servidor
+las aplica sobre la última versión conocida del documento.
+"""
+import copy
+from typing import Any, Dict, List, Tuple
+
+
+OPERACIONES = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """Patch mal formado o no aplicable al documento"""
+
+
+def parsear_puntero(puntero: str) -> List[str]:
+    """'/a/b~1c' -> ['a', 'b/c']"""
+    if puntero == "":
+        return []
+    if not puntero.startswith("/"):
+        raise JsonPatchError(f"Puntero JSON inválido: {puntero!r}")
+    return [parte.replace("~1", "/").replace("~0", "~") for parte in puntero[1:].split("/")]
+
+
+def _indice(lista: list, token: str, para_insertar: bool = False) -> int:
+    if para_insertar and token == "-":
+        return len(lista)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Índice de lista inválido: {token!r}")
+    indice = int(token)
+    limite = len(lista) if para_insertar else len(lista) - 1
+    if indice > limite:
+        raise JsonPatchError(f"Índice fuera de rango: {indice}")
+    return indice
+
+
+def _resolver(documento: Any, tokens: List[str]) -> Any:
+    actual = documento
+    for token in tokens:
+        if isinstance(actual, dict):
+            if token not in actual:
+                raise JsonPatchError(f"Ruta inexistente: {token!r}")
+            actual = actual[token]
+        elif isinstance(actual, list):
+            actual = actual[_indice(actual, token)]
+        else:
+            raise JsonPatchError(f"No se puede navegar dentro de un valor escalar: {token!r}")
+    return actual
+
+
+def _padre(documento: Any, puntero: str) -> Tuple[Any, str]:
+    tokens = parsear_puntero(puntero)
+    if not tokens:
+        raise JsonPatchError("La operación requiere una ruta distinta de la raíz")
+    contenedor = _resolver(documento, tokens[:-1])
+    if not isinstance(contenedor, (dict, list)):
+        raise JsonPatchError(f"El padre de {puntero!r} no es un objeto ni una lista")
+    return contenedor, tokens[-1]
+
+
+def _obtener(documento: Any, puntero: str) -> Any:
+    return _resolver(documento, parsear_puntero(puntero))
+
+
+def _agregar(documento: Any, puntero: str, valor: Any) -> Any:
+    if puntero == "":
+        return valor
+    contenedor, token = _padre(documento, puntero)
+    if isinstance(contenedor, list):
+        contenedor.insert(_indice(contenedor, token, para_insertar=True), valor)
+    else:
+        contenedor[token] = valor
+    return documento
+
+
+def _quitar(documento: Any, puntero: str) -> Any:
+    contenedor, token = _padre(documento, puntero)
+    if isinstance(contenedor, list):
+        return contenedor.pop(_indice(contenedor, token))
+    if token not in contenedor:
+        raise JsonPatchError(f"Ruta inexistente: {puntero!r}")
+    return contenedor.pop(token)
+
+
+def _campo(operacion: Dict[str, Any], nombre: str) -> Any:
+    if nombre not in operacion:
+        raise JsonPatchError(f"Falta '{nombre}' en la operación {operacion.get('op')!r}")
+    return operacion[nombre]
+
+
+def aplicar_patch(documento: Any, operaciones: List[Dict[str, Any]]) -> Any:
+    """
+    Aplicar una lista de operaciones y devolver el documento resultante
+
+    El documento original no se modifica; si una operación falla no se
+    aplica ninguna (se lanza JsonPatchError).
+    """
+    if not isinstance(operaciones, list):
+        raise JsonPatchError("El patch debe ser una lista de operaciones")
+
+    resultado = copy.deepcopy(documento)
+    for operacion in operaciones:
+        if not isinstance(operacion, dict):
+            raise JsonPatchError("Cada operación debe ser un objeto")
+        op = operacion.get("op")
+        if op not in OPERACIONES:
+            raise JsonPatchError(f"Operación no soportada: {op!r}")
+        ruta = _campo(operacion, "path")
+
+        if op == "add":
+            resultado = _agregar(resultado, ruta, copy.deepcopy(_campo(operacion, "value")))
+        elif op == "remove":
+            _quitar(resultado, ruta)
+        elif op == "replace":
+            valor = copy.deepcopy(_campo(operacion, "value"))
+            if ruta == "":
+                resultado = valor
+            else:
+                _obtener(resultado, ruta)  # debe existir
+                contenedor, token = _padre(resultado, ruta)
+                if isinstance(contenedor, list):
+                    contenedor[_indice(contenedor, token)] = valor
+                else:
+                    contenedor[token] = valor
+        elif op == "move":
+            origen = _campo(operacion, "from")
+            if ruta != origen and ruta.startswith(origen + "/"):
+                raise JsonPatchError("No se puede mover un valor dentro de sí mismo")
+            resultado = _agregar(resultado, ruta, _quitar(resultado, origen))
+        elif op == "copy":
+            valor = copy.deepcopy(_obtener(resultado, _campo(operacion, "from")))
+            resultado = _agregar(resultado, ruta, valor)
+        elif op == "test":
+            if _obtener(resultado, ruta) != _campo(operacion, "value"):
+                raise JsonPatchError(f"Falló la prueba en {ruta!r}")
+
+    return resultado
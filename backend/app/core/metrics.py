@@ -0,0 +1,245 @@
+"""
+Métricas de la API en formato de texto Prometheus
+
+Registro mínimo en memoria del proceso (contadores, gauges e histogramas
+con etiquetas) sin dependencias externas. Las métricas se exponen en
+/metrics y se pueden raspar con Prometheus o cualquier agente compatible.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# Buckets por defecto (segundos), similares a los de prometheus_client
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets de tamaño para uploads (bytes): 64KB .. 5MB
+BUCKETS_TAMANO = (65_536, 262_144, 524_288, 1_048_576, 2_097_152, 5_242_880)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(nombres: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = ()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, valores: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera etiquetas {self.etiquetas}")
+        return tuple(str(v) for v in valores)
+
+    def cabecera(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Counter(_Metrica):
+    """Contador monótono"""
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *etiquetas, valor: float = 1.0):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + valor
+
+    def exponer(self) -> List[str]:
+        lineas = self.cabecera()
+        for clave, valor in sorted(self._valores.items()):
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}")
+        return lineas
+
+
+class Gauge(_Metrica):
+    """Valor instantáneo; admite una función que lo calcula al exponer"""
+    tipo = "gauge"
+
+    def __init__(self, *args, funcion: Callable[[], float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self.funcion = funcion
+
+    def set(self, *etiquetas, valor: float):
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+    def inc(self, *etiquetas, valor: float = 1.0):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + valor
+
+    def dec(self, *etiquetas, valor: float = 1.0):
+        self.inc(*etiquetas, valor=-valor)
+
+    def exponer(self) -> List[str]:
+        lineas = self.cabecera()
+        if self.funcion is not None:
+            try:
+                lineas.append(f"{self.nombre} {_formatear_numero(self.funcion())}")
+            except Exception:
+                # Una fuente no disponible (p. ej. pool sin crear) no rompe /metrics
+                pass
+            return lineas
+        for clave, valor in sorted(self._valores.items()):
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}")
+        return lineas
+
+
+class Histogram(_Metrica):
+    """Histograma acumulativo con buckets fijos"""
+    tipo = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = BUCKETS_LATENCIA, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # clave -> [conteos por bucket (no acumulados) + overflow, suma, total]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, *etiquetas, valor: float):
+        clave = self._clave(etiquetas)
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def time(self, *etiquetas):
+        """Medir la duración de un bloque en segundos"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*etiquetas, valor=time.perf_counter() - inicio)
+
+    def exponer(self) -> List[str]:
+        lineas = self.cabecera()
+        for clave, (conteos, suma, total) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, conteo in zip((*self.buckets, float("inf")), conteos):
+                acumulado += conteo
+                le = f'le="{_formatear_numero(limite)}"'
+                lineas.append(
+                    f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, clave, le)} {acumulado}"
+                )
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            lineas.append(f"{self.nombre}_sum{etiquetas} {_formatear_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {total}")
+        return lineas
+
+
+class Registro:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nombre in self._metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nombre}")
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def counter(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = ()) -> Counter:
+        return self.registrar(Counter(nombre, descripcion, etiquetas))
+
+    def gauge(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = (), funcion=None) -> Gauge:
+        return self.registrar(Gauge(nombre, descripcion, etiquetas, funcion=funcion))
+
+    def histogram(
+        self, nombre: str, descripcion: str, etiquetas: Iterable[str] = (), buckets=BUCKETS_LATENCIA
+    ) -> Histogram:
+        return self.registrar(Histogram(nombre, descripcion, etiquetas, buckets=buckets))
+
+    def exponer(self) -> str:
+        """Texto en formato de exposición Prometheus 0.0.4"""
+        lineas = []
+        for metrica in self._metricas.values():
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registro = Registro()
+
+# HTTP
+http_requests_total = registro.counter(
+    "http_requests_total", "Requests HTTP atendidos", ("metodo", "ruta", "status")
+)
+http_request_duration_seconds = registro.histogram(
+    "http_request_duration_seconds", "Latencia de requests HTTP", ("metodo", "ruta")
+)
+http_requests_in_flight = registro.gauge(
+    "http_requests_in_flight", "Requests HTTP en curso"
+)
+
+# Uploads de imágenes
+upload_duration_seconds = registro.histogram(
+    "upload_duration_seconds", "Duración de subidas de imágenes", ("destino",)
+)
+upload_size_bytes = registro.histogram(
+    "upload_size_bytes", "Tamaño de imágenes subidas", ("destino",), buckets=BUCKETS_TAMANO
+)
+
+# Caché de respuestas (tasa de aciertos = hit / (hit + miss) por espacio)
+cache_requests_total = registro.counter(
+    "cache_requests_total", "Consultas a la caché de respuestas", ("espacio", "resultado")
+)
+cache_invalidaciones_total = registro.counter(
+    "cache_invalidaciones_total", "Entradas de la caché invalidadas por escrituras"
+)
+
+# Hashing de passwords
+bcrypt_duration_seconds = registro.histogram(
+    "bcrypt_duration_seconds",
+    "Duración de operaciones bcrypt",
+    ("operacion",),
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+
+
+def registrar_pool(engine):
+    """
+    Gauges de conexiones del pool del engine (evaluados al exponer)
+
+    Solo reportan valores con pools de cola (PostgreSQL); con NullPool
+    (SQLite de archivo) quedan sin muestras.
+    """
+    pool = getattr(engine, "sync_engine", engine).pool
+    registro.gauge(
+        "db_pool_checked_out", "Conexiones del pool en uso", funcion=lambda: pool.checkedout()
+    )
+    registro.gauge(
+        "db_pool_overflow", "Conexiones de overflow abiertas", funcion=lambda: max(pool.overflow(), 0)
+    )
+    registro.gauge("db_pool_size", "Tamaño configurado del pool", funcion=lambda: pool.size())
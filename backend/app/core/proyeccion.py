@@ -0,0 +1,165 @@
+"""
+Proyecciones de lectura (fields= / include=)
+
+Permite pedir solo parte de un schema de respuesta:
+
+    GET /opu/?fields=id,fecha,cliente                 cabecera sin extracciones
+    GET /opu/?fields=id,fecha&include=extracciones    cabecera reducida + colección
+    GET /opu/?include=                                todos los campos, sin colecciones
+
+Sin parámetros la respuesta es la completa de siempre. Con `fields` las
+colecciones anidadas solo se devuelven si se nombran en `fields` o en
+`include`; `id` se agrega siempre.
+
+La misma Proyeccion sirve a las dos capas:
+- schemas: `proyeccion.esquema` es un subconjunto del schema generado con
+  create_model (cacheado por combinación de campos)
+- repositorios: `opciones_carga()` arma load_only con las columnas pedidas
+  y aplica selectinload solo a las colecciones incluidas
+
+Uso:
+    proyeccion_opu = proyeccion(SesionOPUResponse, "extracciones")
+
+    @router.get("/")
+    async def listar(proyeccion: Proyeccion = Depends(proyeccion_opu)): ...
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, raiseload, selectinload
+
+
+@dataclass(frozen=True)
+class Proyeccion:
+    """Campos de `schema` a devolver y colecciones anidadas a cargar"""
+    schema: Type[BaseModel]
+    campos: FrozenSet[str]
+    colecciones: FrozenSet[str]
+
+    @property
+    def completa(self) -> bool:
+        return self.campos == frozenset(self.schema.model_fields)
+
+    @property
+    def esquema(self) -> Type[BaseModel]:
+        """Schema de respuesta (el original si la proyección es completa)"""
+        return self.schema if self.completa else esquema_parcial(self.schema, self.campos)
+
+    def parametros(self) -> dict:
+        """Parte de la clave de caché que depende de la proyección"""
+        return {"fields": sorted(self.campos)}
+
+
+@lru_cache(maxsize=256)
+def esquema_parcial(schema: Type[BaseModel], campos: FrozenSet[str]) -> Type[BaseModel]:
+    """Subconjunto de `schema` con solo `campos` (misma anotación y default)"""
+    definiciones = {
+        nombre: (info.annotation, info)
+        for nombre, info in schema.model_fields.items()
+        if nombre in campos
+    }
+    return create_model(
+        f"{schema.__name__}Parcial",
+        __config__=ConfigDict(from_attributes=True),
+        **definiciones,
+    )
+
+
+def _lista(valor: Optional[str]) -> List[str]:
+    return [parte.strip() for parte in (valor or "").split(",") if parte.strip()]
+
+
+def resolver_proyeccion(
+    schema: Type[BaseModel],
+    colecciones_schema: Iterable[str],
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+) -> Proyeccion:
+    """Validar fields/include contra el schema (400 si hay campos desconocidos)"""
+    todos = frozenset(schema.model_fields)
+    colecciones_schema = frozenset(colecciones_schema)
+    escalares = todos - colecciones_schema
+
+    pedidos = _lista(fields)
+    incluidos = _lista(include)
+    desconocidos = sorted(
+        {c for c in pedidos if c not in todos} | {c for c in incluidos if c not in colecciones_schema}
+    )
+    if desconocidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "mensaje": f"Campos desconocidos: {', '.join(desconocidos)}",
+                "campos": sorted(escalares),
+                "colecciones": sorted(colecciones_schema),
+            },
+        )
+
+    if fields is None:
+        campos = set(escalares)
+        colecciones = set(colecciones_schema) if include is None else set(incluidos)
+    else:
+        campos = {c for c in pedidos if c in escalares}
+        if "id" in escalares:
+            campos.add("id")
+        colecciones = {c for c in pedidos if c in colecciones_schema} | set(incluidos)
+
+    return Proyeccion(
+        schema=schema,
+        campos=frozenset(campos | colecciones),
+        colecciones=frozenset(colecciones),
+    )
+
+
+def proyeccion(schema: Type[BaseModel], *colecciones: str):
+    """
+    Dependencia que lee fields/include de la query
+
+    Args:
+        colecciones: campos del schema que son colecciones anidadas
+    """
+    async def dependencia(
+        fields: Optional[str] = Query(
+            None, description="Campos a devolver, separados por coma (id siempre incluido)"
+        ),
+        include: Optional[str] = Query(
+            None, description=f"Colecciones anidadas a incluir: {', '.join(colecciones) or '-'}"
+        ),
+    ) -> Proyeccion:
+        return resolver_proyeccion(schema, colecciones, fields, include)
+
+    return dependencia
+
+
+def opciones_carga(modelo, proyeccion: Optional[Proyeccion], relaciones: Dict[str, str]) -> list:
+    """
+    Opciones de loader para un select(modelo) según la proyección
+
+    Sin proyección (o completa) se cargan todas las columnas y se hace
+    selectinload de todas las `relaciones`. Si no, load_only con las
+    columnas pedidas más la clave primaria (el resto queda en raiseload
+    para que un acceso inesperado falle en vez de hacer lazy load) y
+    selectinload solo de las colecciones incluidas.
+
+    Args:
+        relaciones: campo del schema -> relación del modelo ORM
+    """
+    if proyeccion is None or proyeccion.completa:
+        return [selectinload(getattr(modelo, relacion)) for relacion in relaciones.values()]
+
+    mapper = inspect(modelo)
+    columnas = {atributo.key for atributo in mapper.column_attrs}
+    pedidas = proyeccion.campos - set(relaciones)
+    opciones = []
+    # Campos calculados (propiedades): se necesita la fila completa
+    if pedidas <= columnas:
+        claves = {columna.key for columna in mapper.primary_key}
+        opciones.append(load_only(*(getattr(modelo, c) for c in sorted(pedidas | claves)), raiseload=True))
+    for campo, relacion in relaciones.items():
+        atributo = getattr(modelo, relacion)
+        opciones.append(selectinload(atributo) if campo in proyeccion.colecciones else raiseload(atributo))
+    return opciones
@@ -6,20 +6,23 @@ from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from .config import settings
+from .metrics import bcrypt_duration_seconds
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar password contra hash"""
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    with bcrypt_duration_seconds.time("verificar"):
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
 
 
 def get_password_hash(password: str) -> str:
     """Generar hash de password"""
     salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    with bcrypt_duration_seconds.time("hashear"):
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
@@ -0,0 +1,68 @@
+"""
+Serialización JSON rápida para respuestas grandes
+
+- Listas de filas ORM: una sola validación (TypeAdapter con
+  from_attributes) y volcado directo a bytes en pydantic-core, sin pasar
+  por jsonable_encoder ni json de la librería estándar.
+- Otros valores (dicts, modelos sueltos): orjson.
+
+Los endpoints que devuelven bytes ya serializados responden con
+respuesta_json(), que conserva las cabeceras puestas por dependencias
+(ETag, Cache-Control) en el Response compartido.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+
+MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=512)  # acotado: los schemas parciales (proyeccion.py) son dinámicos
+def adaptador_lista(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter de List[schema] (construirlo es caro: se reutiliza)"""
+    return TypeAdapter(List[schema])
+
+
+def lista_json(schema: Type[BaseModel], filas: Iterable[Any]) -> bytes:
+    """Validar filas (ORM o dicts) contra el schema y volcarlas a JSON en una pasada"""
+    adaptador = adaptador_lista(schema)
+    return adaptador.dump_json(adaptador.validate_python(list(filas), from_attributes=True))
+
+
+def _por_defecto(valor: Any) -> Any:
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json")
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return jsonable_encoder(valor)
+
+
+def serializar_json(valor: Any) -> bytes:
+    """Bytes JSON de un valor (los bytes se asumen ya serializados)"""
+    if isinstance(valor, bytes):
+        return valor
+    if isinstance(valor, BaseModel):
+        return valor.__pydantic_serializer__.to_json(valor)
+    return orjson.dumps(valor, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+
+
+def respuesta_json(cuerpo: bytes, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """
+    Response con JSON ya serializado
+
+    Args:
+        response: Response de la request (parámetro del endpoint); se
+            copian sus cabeceras, que FastAPI no aplica cuando el endpoint
+            devuelve su propio Response
+    """
+    respuesta = Response(content=cuerpo, media_type=MEDIA_TYPE, status_code=status_code)
+    if response is not None:
+        for nombre, valor in response.headers.items():
+            respuesta.headers.setdefault(nombre, valor)
+    return respuesta
@@ -9,16 +9,15 @@ from sqlalchemy.orm import declarative_base
 from sqlalchemy.engine.url import make_url
 
 from ...core.config import settings
+from .replica import EnrutadorLecturas
+from .sqlite_tuning import configurar_sqlite, es_sqlite_archivo, pool_kwargs as sqlite_pool_kwargs
 
 
 # Base para los modelos
 Base = declarative_base()
 
-# Preparar connect_args (SSL para PostgreSQL en produccion)
-connect_args = {}
-url = make_url(settings.DATABASE_URL)
-
 # En Windows + psycopg se debe usar el event loop selector para conexiones async
+url = make_url(settings.DATABASE_URL)
 if platform.system() == "Windows" and url.drivername.startswith("postgresql+psycopg"):
     try:
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -26,23 +25,144 @@ if platform.system() == "Windows" and url.drivername.startswith("postgresql+psyc
         # No interrumpir el arranque si ya existe una politica activa
         pass
 
-if url.drivername.startswith("postgresql+psycopg"):
-    if url.host and url.host not in {"localhost", "127.0.0.1"}:
-        # psycopg usa sslmode para obligar TLS en conexiones remotas
-        connect_args["sslmode"] = "require"
-elif url.drivername.startswith("postgresql+asyncpg"):
-    if url.host and url.host not in {"localhost", "127.0.0.1"}:
-        # Forzar SSL con certificados del sistema cuando es host remoto
-        connect_args["ssl"] = ssl.create_default_context()
-
-# Motor async de SQLAlchemy
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True if settings.ENVIRONMENT == "development" else False,
-    future=True,
-    pool_pre_ping=True,  # Verificar conexion antes de usar
-    connect_args=connect_args,
-)
+
+# Valores del pool por entorno; cada uno se puede sobrescribir con DB_* en Settings.
+# En produccion (Postgres gestionado remoto) se evita pool_pre_ping, que suma
+# un round trip por checkout, y se reciclan conexiones antes del corte por inactividad.
+PERFILES_POOL = {
+    "development": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_recycle": 1800,
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 0,
+    },
+    "production": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_recycle": 300,
+        "pool_timeout": 10,
+        "pool_pre_ping": False,
+        "statement_timeout_ms": 30000,
+    },
+    "test": {
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_recycle": -1,
+        "pool_timeout": 5,
+        "pool_pre_ping": False,
+        "statement_timeout_ms": 10000,
+    },
+}
+
+
+def resolver_pool(config=settings) -> dict:
+    """Parametros del pool: perfil de ENVIRONMENT con los DB_* definidos encima"""
+    perfil = dict(PERFILES_POOL.get(config.ENVIRONMENT, PERFILES_POOL["production"]))
+    sobrescritos = {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "statement_timeout_ms": config.DB_STATEMENT_TIMEOUT_MS,
+    }
+    perfil.update({clave: valor for clave, valor in sobrescritos.items() if valor is not None})
+    return perfil
+
+
+def build_engine_kwargs(database_url: str, config=settings, solo_lectura: bool = False) -> dict:
+    """
+    Argumentos de create_async_engine segun driver y configuracion
+
+    - SQLite en archivo con SQLITE_TUNING: un unico escritor (o el grupo de
+      lectores si solo_lectura); en memoria o sin tuning, el pool por defecto.
+    - psycopg: SSL remoto, statement_timeout via options y prepare_threshold
+      (None en modo pgbouncer para no usar prepared statements de servidor).
+    - asyncpg: SSL remoto, statement_timeout via server_settings y cache de
+      sentencias desactivada en modo pgbouncer.
+    """
+    url = make_url(database_url)
+    pool = resolver_pool(config)
+    remoto = bool(url.host) and url.host not in {"localhost", "127.0.0.1"}
+    connect_args = {}
+
+    kwargs = {
+        "echo": config.ENVIRONMENT == "development",
+        "future": True,
+        "connect_args": connect_args,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        if config.SQLITE_TUNING and es_sqlite_archivo(database_url):
+            kwargs.update(sqlite_pool_kwargs(solo_lectura, config))
+        return kwargs
+
+    kwargs.update({
+        "pool_size": pool["pool_size"],
+        "max_overflow": pool["max_overflow"],
+        "pool_recycle": pool["pool_recycle"],
+        "pool_timeout": pool["pool_timeout"],
+        "pool_pre_ping": pool["pool_pre_ping"],
+    })
+    timeout_ms = pool["statement_timeout_ms"]
+
+    if url.drivername.startswith("postgresql+psycopg"):
+        if remoto:
+            # psycopg usa sslmode para obligar TLS en conexiones remotas
+            connect_args["sslmode"] = "require"
+        if timeout_ms:
+            connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+        connect_args["prepare_threshold"] = None if config.DB_PGBOUNCER else config.DB_PREPARE_THRESHOLD
+    elif url.drivername.startswith("postgresql+asyncpg"):
+        if remoto:
+            # Forzar SSL con certificados del sistema cuando es host remoto
+            connect_args["ssl"] = ssl.create_default_context()
+        if timeout_ms:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+        if config.DB_PGBOUNCER:
+            connect_args["statement_cache_size"] = 0
+
+    return kwargs
+
+
+def pool_stats(engine) -> dict:
+    """Estado actual del pool (conexiones en uso, libres y overflow)"""
+    pool = engine.sync_engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    for nombre in ("size", "checkedin", "checkedout", "overflow"):
+        metodo = getattr(pool, nombre, None)
+        if callable(metodo):
+            stats[nombre] = metodo()
+    return stats
+
+
+def crear_engines(database_url: str, config=settings, replica_url: str | None = None):
+    """
+    Engine principal (escrituras) y engine de lectura
+
+    - Con replica_url el de lectura apunta a la replica.
+    - Sin replica y con SQLite en archivo es un pool aparte con query_only.
+    - En el resto de casos ambos son el mismo engine.
+    """
+    sqlite_tuning = config.SQLITE_TUNING and es_sqlite_archivo(database_url)
+    principal = create_async_engine(database_url, **build_engine_kwargs(database_url, config))
+    if sqlite_tuning:
+        configurar_sqlite(principal, config=config)
+
+    url_lectura = replica_url or (database_url if sqlite_tuning else None)
+    if url_lectura is None:
+        return principal, principal
+
+    lectura = create_async_engine(url_lectura, **build_engine_kwargs(url_lectura, config, solo_lectura=True))
+    if config.SQLITE_TUNING and es_sqlite_archivo(url_lectura):
+        configurar_sqlite(lectura, solo_lectura=True, config=config)
+    return principal, lectura
+
+
+# Motores async de SQLAlchemy
+engine, read_engine = crear_engines(settings.DATABASE_URL, replica_url=settings.DATABASE_REPLICA_URL)
 
 # Factory para crear sesiones async
 AsyncSessionLocal = async_sessionmaker(
@@ -53,13 +173,48 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
 )
 
+# Sesiones de solo lectura (GETs): replica si existe, lectores query_only en SQLite
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+)
+
+# Lecturas a la replica salvo para clientes que acaban de escribir
+enrutador_lecturas = EnrutadorLecturas(
+    AsyncSessionLocal,
+    AsyncReadSessionLocal,
+    settings.REPLICA_STICKY_SECONDS,
+    con_replica=bool(settings.DATABASE_REPLICA_URL),
+)
+
 
 async def init_db():
-    """Inicializar base de datos (crear todas las tablas)."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    Inicializar base de datos aplicando las migraciones pendientes.
+
+    El esquema completo (create_all) solo se crea en una BD nueva; con la
+    BD al día el arranque solo consulta schema_migrations.
+    """
+    from .migrations import migrar
+
+    await migrar(engine, Base.metadata)
 
 
 async def close_db():
     """Cerrar conexiones de la base de datos."""
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+# Registrar eventos de sesión (detección de escrituras para invalidar cachés)
+from . import events  # noqa: E402,F401
+
+# Métricas por request, detector N+1 y log de sentencias lentas
+from .instrumentation import instrumentar_engine  # noqa: E402
+
+instrumentar_engine(engine)
+instrumentar_engine(read_engine)
@@ -0,0 +1,224 @@
+"""
+Eventos de sesión para detectar escrituras confirmadas
+
+Registra qué tablas modificó cada sesión (flush ORM y sentencias
+INSERT/UPDATE/DELETE ejecutadas con session.execute) y, tras el commit,
+notifica a los callbacks registrados. Se usa para invalidar cachés.
+También registra los ids de las filas escritas por el ORM (None si la
+escritura fue un DML sin ids conocidos) para invalidaciones por fila.
+
+Antes del commit incrementa además el contador de esas tablas en
+versiones_entidad, dentro de la misma transacción, para los ETag, y anota
+en registro_cambios cada fila escrita de las tablas sincronizables
+(upsert / delete, o reset si fue un DML sin ids) para GET /sync.
+"""
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+
+# Tablas por usuario o internas: no se sirven con ETag y cambian en cada autosave
+TABLAS_SIN_VERSION = {
+    "drafts", "draft_patches", "versiones_entidad", "registro_cambios", "mutaciones_sync", "claves_idempotencia",
+}
+
+# Tablas expuestas por /sync
+TABLAS_SYNC = {
+    "donadoras",
+    "sesiones_opu",
+    "sesiones_transferencia",
+    "transferencias_realizadas",
+    "chequeos_gfe",
+    "fecundaciones",
+}
+# Tablas hijas que el cliente recibe embebidas: su cambio es un upsert de la cabecera
+PADRES_SYNC = {
+    "extraccion_donadoras": ("sesiones_opu", "sesion_opu_id"),
+    "transferencias_realizadas": ("sesiones_transferencia", "sesion_transferencia_id"),
+}
+
+# Serializa en PostgreSQL la escritura del registro hasta el commit, para que el
+# orden de los ids coincida con el de confirmación y ningún cursor salte un cambio
+CLAVE_LOCK_REGISTRO = 730_049
+
+
+_callbacks: List[Callable[[Set[str]], None]] = []
+_callbacks_filas: List[Callable[[Dict[str, Optional[Set[Any]]]], None]] = []
+
+
+def al_confirmar_escritura(callback: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """
+    Registrar un callback que recibe las tablas escritas en cada commit
+
+    Puede usarse como decorador.
+    """
+    _callbacks.append(callback)
+    return callback
+
+
+def al_confirmar_filas(
+    callback: Callable[[Dict[str, Optional[Set[Any]]]], None]
+) -> Callable[[Dict[str, Optional[Set[Any]]]], None]:
+    """
+    Registrar un callback que recibe {tabla: ids escritos | None} en cada commit
+
+    Puede usarse como decorador.
+    """
+    _callbacks_filas.append(callback)
+    return callback
+
+
+def _tablas(session: Session) -> Set[str]:
+    return session.info.setdefault("tablas_modificadas", set())
+
+
+def _filas(session: Session) -> Dict[str, Optional[Set[Any]]]:
+    return session.info.setdefault("filas_modificadas", {})
+
+
+def _cambios(session: Session) -> Dict[tuple, str]:
+    return session.info.setdefault("cambios_sync", {})
+
+
+def registrar_cambio(session, tabla: str, fila_id: Optional[int], operacion: str = "upsert"):
+    """
+    Anotar el cambio de una fila para /sync (tablas de TABLAS_SYNC)
+
+    Los eventos lo hacen solos para el ORM y los DML por id; los
+    repositorios lo usan cuando escriben hijos con DML y la cabecera que
+    los embebe no se toca (acepta Session o AsyncSession).
+    """
+    session = getattr(session, "sync_session", session)
+    if tabla not in TABLAS_SYNC:
+        return
+    cambios = _cambios(session)
+    if fila_id is None:
+        cambios[(tabla, None)] = "reset"
+    elif operacion == "delete" or (tabla, fila_id) not in cambios:
+        # Dentro de un commit el delete gana: no se reenvía una fila borrada
+        cambios[(tabla, fila_id)] = operacion
+
+
+def _registrar_cambio_objeto(session: Session, obj, tabla: str, operacion: str):
+    registrar_cambio(session, tabla, getattr(obj, "id", None), operacion)
+    padre = PADRES_SYNC.get(tabla)
+    if padre is not None:
+        padre_id = getattr(obj, padre[1], None)
+        if padre_id is not None:
+            registrar_cambio(session, padre[0], padre_id)
+
+
+def _ids_dml(orm_execute_state) -> Optional[Set[Any]]:
+    """
+    Ids afectados por un UPDATE/DELETE filtrado solo por id
+
+    Reconoce `id = valor` e `id IN (...)`, también como executemany con
+    parámetros por fila. None si el WHERE es otro (no se pueden conocer).
+    """
+    where = getattr(orm_execute_state.statement, "whereclause", None)
+    if not isinstance(where, BinaryExpression) or getattr(where.left, "key", None) != "id":
+        return None
+    if where.operator not in (operators.eq, operators.in_op) or not isinstance(where.right, BindParameter):
+        return None
+
+    valor = where.right.value
+    if valor is not None:
+        return set(valor) if where.operator is operators.in_op else {valor}
+
+    parametros = orm_execute_state.parameters
+    filas = parametros if isinstance(parametros, list) else [parametros or {}]
+    try:
+        return {fila[where.right.key] for fila in filas}
+    except (KeyError, TypeError):
+        return None
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_flush(session, flush_context):
+    tablas = _tablas(session)
+    filas = _filas(session)
+    for operacion, objetos in (("upsert", (*session.new, *session.dirty)), ("delete", session.deleted)):
+        for obj in objetos:
+            tabla = getattr(obj, "__tablename__", None)
+            if tabla:
+                tablas.add(tabla)
+                ids = filas.setdefault(tabla, set())
+                if ids is not None:
+                    ids.add(getattr(obj, "id", None))
+                _registrar_cambio_objeto(session, obj, tabla, operacion)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabla = getattr(orm_execute_state.statement, "table", None)
+        nombre = getattr(tabla, "name", None)
+        if nombre:
+            session = orm_execute_state.session
+            _tablas(session).add(nombre)
+            filas = _filas(session)
+            ids = None if orm_execute_state.is_insert else _ids_dml(orm_execute_state)
+            if ids is None:
+                filas[nombre] = None
+                registrar_cambio(session, nombre, None)
+                return
+            if filas.get(nombre, set()) is not None:
+                filas.setdefault(nombre, set()).update(ids)
+            operacion = "delete" if orm_execute_state.is_delete else "upsert"
+            for fila_id in ids:
+                registrar_cambio(session, nombre, fila_id, operacion)
+
+
+@event.listens_for(Session, "before_commit")
+def _incrementar_versiones(session):
+    # Volcar lo pendiente para conocer todas las tablas de este commit
+    session.flush()
+    tablas = sorted(_tablas(session) - TABLAS_SIN_VERSION)
+    if not tablas:
+        return
+
+    from .models import RegistroCambio, VersionEntidad
+
+    conn = session.connection()
+    dialecto = postgresql if conn.dialect.name == "postgresql" else sqlite
+    stmt = dialecto.insert(VersionEntidad).values([{"tabla": tabla, "version": 1} for tabla in tablas])
+    # connection.execute no pasa por do_orm_execute: no se registra como escritura
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=[VersionEntidad.tabla],
+        set_={"version": VersionEntidad.version + 1, "fecha_actualizacion": func.now()},
+    ))
+
+    cambios = session.info.pop("cambios_sync", None)
+    if cambios:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:clave)"), {"clave": CLAVE_LOCK_REGISTRO})
+        conn.execute(RegistroCambio.__table__.insert(), [
+            {"tabla": tabla, "fila_id": fila_id, "operacion": operacion}
+            for (tabla, fila_id), operacion in sorted(cambios.items(), key=lambda c: (c[0][0], c[0][1] or 0))
+        ])
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_commit(session):
+    tablas = session.info.pop("tablas_modificadas", None)
+    filas = session.info.pop("filas_modificadas", None)
+    session.info.pop("cambios_sync", None)
+    if not tablas:
+        return
+    # Marca para el enrutado de lecturas (read-your-writes con réplica)
+    session.info["escritura_confirmada"] = True
+    for callback in _callbacks:
+        callback(tablas)
+    for callback in _callbacks_filas:
+        callback(filas or {})
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_rollback(session):
+    session.info.pop("tablas_modificadas", None)
+    session.info.pop("filas_modificadas", None)
+    session.info.pop("cambios_sync", None)
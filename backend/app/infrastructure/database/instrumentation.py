@@ -0,0 +1,255 @@
+"""
+Instrumentación SQL por request
+
+Hooks before/after_cursor_execute que acumulan, en un contexto por
+request (ContextVar), el número de sentencias, el tiempo total de BD y las
+sentencias más lentas. En desarrollo/test detecta la misma forma de
+sentencia repetida N veces en un request (patrón N+1).
+
+Las sentencias que superan SQL_SLOW_MS se registran en el log
+"app.sql.lentas" con el SQL normalizado, la forma de los parámetros (tipos,
+nunca valores), la duración y el método de repositorio que la originó; con
+SQL_SLOW_EXPLAIN se adjunta además el plan de ejecución (estimado; con
+SQL_SLOW_EXPLAIN_ANALYZE, el real, a costa de ejecutarla otra vez).
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+import warnings
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from ...core.config import settings
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - SQLAlchemy async siempre lo instala
+    greenlet = None
+
+
+logger = logging.getLogger("app.sql")
+logger_lentas = logging.getLogger("app.sql.lentas")
+
+# Carpetas cuyo código se reporta como origen de una sentencia lenta
+_CAPAS_ORIGEN = (f"{os.sep}repositories{os.sep}", f"{os.sep}services{os.sep}", f"{os.sep}endpoints{os.sep}")
+
+# SAVEPOINT en el que corre el EXPLAIN de PostgreSQL (siempre se revierte)
+_SAVEPOINT_PLAN = "plan_sql_lenta"
+
+_RE_LISTA_IN = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.I)
+
+
+class ConsultasRepetidasError(RuntimeError):
+    """La misma sentencia se repitió demasiadas veces en un request (N+1)"""
+
+
+class ConsultasRepetidasWarning(UserWarning):
+    """Aviso de posible N+1"""
+
+
+class EstadisticasSQL:
+    """Métricas SQL acumuladas durante un request"""
+
+    def __init__(self, max_lentas: int = 3):
+        self.sentencias = 0
+        self.tiempo_ms = 0.0
+        self.max_lentas = max_lentas
+        self.lentas: List[dict] = []
+        self.formas: Counter = Counter()
+        self.repetidas: List[str] = []
+
+    def registrar(self, sentencia: str, duracion_ms: float):
+        self.sentencias += 1
+        self.tiempo_ms += duracion_ms
+        self.formas[sentencia] += 1
+
+        if len(self.lentas) < self.max_lentas or duracion_ms > self.lentas[-1]["ms"]:
+            self.lentas.append({"sql": _resumir(sentencia), "ms": round(duracion_ms, 2)})
+            self.lentas.sort(key=lambda s: s["ms"], reverse=True)
+            del self.lentas[self.max_lentas:]
+
+    def as_dict(self) -> dict:
+        return {
+            "sentencias": self.sentencias,
+            "db_ms": round(self.tiempo_ms, 2),
+            "lentas": self.lentas,
+            "repetidas": self.repetidas,
+        }
+
+
+_estadisticas: ContextVar[Optional[EstadisticasSQL]] = ContextVar("estadisticas_sql", default=None)
+
+
+def iniciar_contexto() -> EstadisticasSQL:
+    """Abrir un contexto de medición (lo llama el middleware al iniciar el request)"""
+    estadisticas = EstadisticasSQL(settings.SQL_LENTAS_TOP)
+    _estadisticas.set(estadisticas)
+    return estadisticas
+
+
+def estadisticas_actuales() -> Optional[EstadisticasSQL]:
+    return _estadisticas.get()
+
+
+def _resumir(sentencia: str, largo: int = 200) -> str:
+    """SQL en una línea y truncado para logs/cabeceras"""
+    compacta = " ".join(sentencia.split())
+    return compacta if len(compacta) <= largo else compacta[:largo] + "..."
+
+
+def normalizar_sql(sentencia: str) -> str:
+    """SQL en una línea con las listas IN (...) colapsadas, para agrupar formas"""
+    return _RE_LISTA_IN.sub("IN (...)", " ".join(sentencia.split()))
+
+
+def forma_parametros(parametros, executemany: bool = False):
+    """Tipos de los parámetros enlazados (sin valores, pueden contener datos personales)"""
+    def tipos(fila):
+        if isinstance(fila, dict):
+            return {clave: type(valor).__name__ for clave, valor in fila.items()}
+        if isinstance(fila, (list, tuple)):
+            return [type(valor).__name__ for valor in fila]
+        return type(fila).__name__
+
+    if executemany and isinstance(parametros, (list, tuple)):
+        return {"filas": len(parametros), "forma": tipos(parametros[0]) if parametros else None}
+    return tipos(parametros)
+
+
+def _frames_llamador():
+    """Frames del llamador, incluida la corrutina suspendida detrás del greenlet de SQLAlchemy"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+    if greenlet is not None:
+        padre = greenlet.getcurrent().parent
+        frame = padre.gr_frame if padre is not None else None
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+
+
+def metodo_origen() -> str:
+    """Primer método de repositorio/servicio/endpoint en la pila ('modulo.Clase.metodo')"""
+    for frame in _frames_llamador():
+        if any(capa in frame.f_code.co_filename for capa in _CAPAS_ORIGEN):
+            modulo = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+            return f"{modulo}.{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+    return "desconocido"
+
+
+def capturar_plan(conn, sentencia: str, parametros, analizar: bool = False) -> list:
+    """
+    Plan de ejecución de una sentencia SELECT
+
+    PostgreSQL: EXPLAIN, o EXPLAIN (ANALYZE, BUFFERS) con analizar=True,
+    que vuelve a ejecutar la sentencia. Corre dentro de un SAVEPOINT que
+    siempre se revierte: un error del EXPLAIN no deja abortada la
+    transacción del request ni el ANALYZE deja efectos.
+    SQLite: EXPLAIN QUERY PLAN (no ejecuta la sentencia).
+    Se usa un cursor DBAPI aparte para no disparar los hooks ni alterar el
+    resultado de la sentencia original.
+    """
+    if not sentencia.lstrip().upper().startswith(("SELECT", "WITH")):
+        return []
+
+    dialecto = conn.dialect.name
+    if dialecto == "postgresql":
+        prefijo = "EXPLAIN (ANALYZE, BUFFERS) " if analizar else "EXPLAIN "
+    elif dialecto == "sqlite":
+        prefijo = "EXPLAIN QUERY PLAN "
+    else:
+        return []
+
+    cursor = conn.connection.cursor()
+    try:
+        if dialecto == "sqlite":
+            cursor.execute(prefijo + sentencia, parametros)
+            return [fila[-1] for fila in cursor.fetchall()]
+
+        cursor.execute(f"SAVEPOINT {_SAVEPOINT_PLAN}")
+        try:
+            cursor.execute(prefijo + sentencia, parametros)
+            return [fila[0] for fila in cursor.fetchall()]
+        finally:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT_PLAN}")
+            cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT_PLAN}")
+    finally:
+        cursor.close()
+
+
+def _registrar_lenta(conn, sentencia: str, parametros, executemany: bool, duracion_ms: float):
+    registro = {
+        "evento": "sql_lenta",
+        "ms": round(duracion_ms, 2),
+        "sql": normalizar_sql(sentencia),
+        "parametros": forma_parametros(parametros, executemany),
+        "origen": metodo_origen(),
+    }
+    if settings.SQL_SLOW_EXPLAIN and not executemany:
+        try:
+            registro["plan"] = capturar_plan(conn, sentencia, parametros, settings.SQL_SLOW_EXPLAIN_ANALYZE)
+        except Exception as e:
+            registro["plan_error"] = str(e)
+    logger_lentas.warning(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+def _detectar_n_mas_1(estadisticas: EstadisticasSQL, sentencia: str):
+    umbral = settings.SQL_NPLUS1_UMBRAL
+    if umbral <= 0 or settings.ENVIRONMENT not in ("development", "test"):
+        return
+    if estadisticas.formas[sentencia] != umbral:
+        return
+
+    mensaje = f"Sentencia repetida {umbral} veces en un request (posible N+1): {_resumir(sentencia)}"
+    estadisticas.repetidas.append(_resumir(sentencia))
+    if settings.SQL_NPLUS1_ERROR:
+        raise ConsultasRepetidasError(mensaje)
+    warnings.warn(mensaje, ConsultasRepetidasWarning, stacklevel=2)
+    logger.warning(mensaje)
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_sql", []).append((context, time.perf_counter()))
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    _, inicio = conn.info["inicio_sql"].pop()
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    if settings.SQL_SLOW_MS > 0 and duracion_ms >= settings.SQL_SLOW_MS:
+        _registrar_lenta(conn, statement, parameters, executemany, duracion_ms)
+
+    estadisticas = _estadisticas.get()
+    if estadisticas is None:
+        return
+
+    estadisticas.registrar(statement, duracion_ms)
+    _detectar_n_mas_1(estadisticas, statement)
+
+
+def _error_al_ejecutar(contexto):
+    """Descartar el inicio de una sentencia que falló (no llega a after_cursor_execute)"""
+    conn = contexto.connection
+    pila = conn.info.get("inicio_sql") if conn is not None else None
+    # Solo si la entrada es de esta sentencia: si el error vino del propio
+    # after_cursor_execute (p. ej. N+1) ya se sacó
+    if pila and pila[-1][0] is contexto.execution_context:
+        pila.pop()
+
+
+def instrumentar_engine(engine):
+    """Registrar los hooks de medición en un engine (sync o async)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _antes_de_ejecutar):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(sync_engine, "after_cursor_execute", _despues_de_ejecutar)
+    event.listen(sync_engine, "handle_error", _error_al_ejecutar)
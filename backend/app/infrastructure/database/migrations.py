@@ -0,0 +1,248 @@
+"""
+Migraciones SQL versionadas (SQLite y PostgreSQL)
+
+Los scripts viven en backend/migrations con el formato
+NNN_descripcion[.dialecto].sql:
+
+- 008_indices.sql            se aplica en cualquier dialecto
+- 008_indices.postgresql.sql reemplaza al genérico en PostgreSQL
+- 008_indices.sqlite.sql     reemplaza al genérico en SQLite
+
+Si una versión solo tiene variantes de otro dialecto se registra como
+aplicada sin ejecutar nada. Un script con la directiva
+"-- migrate:no-transaction" se ejecuta en autocommit, necesario para
+CREATE INDEX CONCURRENTLY en PostgreSQL.
+
+Las versiones aplicadas se guardan en schema_migrations. Una BD nueva se
+crea con metadata.create_all y se marcan todas las versiones; una BD
+anterior al runner (sin schema_migrations) se marca hasta VERSION_BASE y
+se aplican las siguientes. Con la BD al día el arranque solo lee la tabla
+de versiones.
+"""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, inspect, select
+
+
+# backend/migrations
+DIRECTORIO_MIGRACIONES = Path(__file__).resolve().parents[3] / "migrations"
+
+# Última versión aplicada a mano (run_migration.py anterior) en BD existentes
+VERSION_BASE = "006"
+
+DIRECTIVA_SIN_TRANSACCION = "-- migrate:no-transaction"
+
+DIALECTOS = ("sqlite", "postgresql")
+
+_RE_ARCHIVO = re.compile(r"^(?P<version>\d+)_(?P<nombre>[\w-]+?)(?:\.(?P<dialecto>sqlite|postgresql))?\.sql$")
+_RE_DOLAR = re.compile(r"\$[A-Za-z_]*\$")
+
+metadata_migraciones = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata_migraciones,
+    Column("version", String(20), primary_key=True),
+    Column("nombre", String(200), nullable=False),
+    Column("aplicada_en", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+@dataclass
+class Migracion:
+    """Script de una versión resuelto para un dialecto"""
+    version: str
+    nombre: str
+    ruta: Optional[Path] = None  # None: no aplica a este dialecto
+
+    @property
+    def sql(self) -> str:
+        return self.ruta.read_text(encoding="utf-8") if self.ruta else ""
+
+    @property
+    def sin_transaccion(self) -> bool:
+        return any(
+            linea.strip().lower() == DIRECTIVA_SIN_TRANSACCION
+            for linea in self.sql.splitlines()
+        )
+
+
+def descubrir_migraciones(dialecto: str, directorio: Path = DIRECTORIO_MIGRACIONES) -> List[Migracion]:
+    """Migraciones del directorio ordenadas por versión, resueltas para el dialecto"""
+    por_version: Dict[str, Dict[Optional[str], Path]] = {}
+    nombres: Dict[str, str] = {}
+
+    for ruta in sorted(directorio.glob("*.sql")):
+        match = _RE_ARCHIVO.match(ruta.name)
+        if not match:
+            continue
+        version = match.group("version")
+        por_version.setdefault(version, {})[match.group("dialecto")] = ruta
+        nombres.setdefault(version, match.group("nombre"))
+
+    migraciones = []
+    for version in sorted(por_version, key=int):
+        variantes = por_version[version]
+        ruta = variantes.get(dialecto) or variantes.get(None)
+        migraciones.append(Migracion(version, nombres[version], ruta))
+    return migraciones
+
+
+def dividir_sentencias(sql: str) -> List[str]:
+    """
+    Separar un script en sentencias por ';'
+
+    Respeta literales ('...'), identificadores ("..."), comentarios (-- y
+    /* */) y bloques $tag$...$tag$ de PostgreSQL. Los comentarios se
+    descartan.
+    """
+    sentencias = []
+    actual = []
+    i = 0
+    n = len(sql)
+
+    while i < n:
+        c = sql[i]
+
+        if c == "-" and sql.startswith("--", i):
+            fin = sql.find("\n", i)
+            i = n if fin == -1 else fin
+            continue
+
+        if c == "/" and sql.startswith("/*", i):
+            fin = sql.find("*/", i + 2)
+            i = n if fin == -1 else fin + 2
+            actual.append(" ")
+            continue
+
+        if c in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if sql[j] == c:
+                    if j + 1 < n and sql[j + 1] == c:  # comilla escapada duplicándola
+                        j += 2
+                        continue
+                    break
+                j += 1
+            actual.append(sql[i:j + 1])
+            i = j + 1
+            continue
+
+        if c == "$":
+            match = _RE_DOLAR.match(sql, i)
+            if match:
+                etiqueta = match.group(0)
+                fin = sql.find(etiqueta, match.end())
+                fin = n if fin == -1 else fin + len(etiqueta)
+                actual.append(sql[i:fin])
+                i = fin
+                continue
+
+        if c == ";":
+            sentencia = "".join(actual).strip()
+            if sentencia:
+                sentencias.append(sentencia)
+            actual = []
+            i += 1
+            continue
+
+        actual.append(c)
+        i += 1
+
+    sentencia = "".join(actual).strip()
+    if sentencia:
+        sentencias.append(sentencia)
+    return sentencias
+
+
+def _estado_esquema(conn, metadata: MetaData) -> tuple:
+    """(existe schema_migrations, existe alguna tabla de la aplicación)"""
+    inspector = inspect(conn)
+    if inspector.has_table(schema_migrations.name):
+        return True, True
+    return False, any(inspector.has_table(tabla) for tabla in metadata.tables)
+
+
+async def versiones_aplicadas(engine) -> List[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(select(schema_migrations.c.version))
+        return [row.version for row in result]
+
+
+async def _registrar(conn, migraciones: List[Migracion]):
+    if migraciones:
+        await conn.execute(
+            schema_migrations.insert(),
+            [{"version": m.version, "nombre": m.nombre} for m in migraciones],
+        )
+
+
+async def aplicar_migracion(engine, migracion: Migracion):
+    """Ejecutar un script y registrar su versión"""
+    sentencias = dividir_sentencias(migracion.sql)
+
+    if migracion.sin_transaccion:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for sentencia in sentencias:
+                await conn.exec_driver_sql(sentencia)
+            await _registrar(conn, [migracion])
+        return
+
+    async with engine.begin() as conn:
+        for sentencia in sentencias:
+            await conn.exec_driver_sql(sentencia)
+        await _registrar(conn, [migracion])
+
+
+async def marcar(engine, hasta: Optional[str] = None, directorio: Path = DIRECTORIO_MIGRACIONES) -> List[str]:
+    """Registrar como aplicadas (sin ejecutarlas) las versiones hasta 'hasta' inclusive"""
+    migraciones = descubrir_migraciones(engine.dialect.name, directorio)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata_migraciones.create_all)
+        aplicadas = set((await conn.execute(select(schema_migrations.c.version))).scalars())
+        nuevas = [
+            m for m in migraciones
+            if m.version not in aplicadas and (hasta is None or int(m.version) <= int(hasta))
+        ]
+        await _registrar(conn, nuevas)
+    return [m.version for m in nuevas]
+
+
+async def migrar(
+    engine,
+    metadata: MetaData,
+    directorio: Path = DIRECTORIO_MIGRACIONES,
+    version_base: str = VERSION_BASE,
+) -> List[str]:
+    """
+    Llevar la BD a la última versión
+
+    Returns:
+        Versiones ejecutadas en esta llamada
+    """
+    async with engine.connect() as conn:
+        tiene_versiones, tiene_tablas = await conn.run_sync(_estado_esquema, metadata)
+
+    if not tiene_versiones:
+        # BD nueva: el esquema de los modelos ya es la última versión.
+        # BD anterior al runner: create_all completa tablas nuevas y se
+        # marcan como aplicadas las migraciones manuales hasta version_base.
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        await marcar(engine, hasta=version_base if tiene_tablas else None, directorio=directorio)
+
+    aplicadas = set(await versiones_aplicadas(engine))
+    pendientes = [
+        m for m in descubrir_migraciones(engine.dialect.name, directorio)
+        if m.version not in aplicadas
+    ]
+
+    for migracion in pendientes:
+        print(f"[*] Aplicando migracion {migracion.version}_{migracion.nombre}")
+        await aplicar_migracion(engine, migracion)
+
+    return [m.version for m in pendientes]
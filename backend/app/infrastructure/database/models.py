@@ -9,17 +9,21 @@ Incluye:
 - Transferencias
 - Chequeos GFE
 - Drafts (autosave)
+- Versiones y registro de cambios (caché HTTP, sync offline)
+- Claves de idempotencia (reintentos de escrituras)
+- Resúmenes de producción (analítica)
 """
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Float, Date, DateTime,
-    Boolean, Text, ForeignKey, Enum, JSON
+    Boolean, Text, ForeignKey, Enum, JSON, Index, LargeBinary, UniqueConstraint, literal_column, text
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from .connection import Base
+from .types import JSONComprimido
 
 
 class RolEnum(str, enum.Enum):
@@ -66,8 +70,8 @@ class Donadora(Base):
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(100), nullable=False, index=True)
     numero_registro = Column(String(50), unique=True, nullable=False, index=True)
-    raza = Column(String(50), nullable=False)
-    tipo_ganado = Column(String(10), nullable=False)  # SQLite compatible: 'carne' o 'leche'
+    raza = Column(String(50), nullable=False, index=True)
+    tipo_ganado = Column(String(10), nullable=False, index=True)  # SQLite compatible: 'carne' o 'leche'
     fecha_nacimiento = Column(Date, nullable=True)
     propietario_nombre = Column(String(100), nullable=False)
     propietario_contacto = Column(String(100), nullable=True)
@@ -86,6 +90,12 @@ class Donadora(Base):
     # Relaciones
     extracciones = relationship("ExtraccionDonadora", back_populates="donadora")
 
+    __table_args__ = (
+        # Listado/export: filtro por activo ordenado por fecha de creación
+        Index("ix_donadoras_activo_fecha_creacion", "activo", "fecha_creacion"),
+        Index("ix_donadoras_fecha_creacion", "fecha_creacion"),
+    )
+
 
 # ==================== SESIONES OPU ====================
 
@@ -129,7 +139,7 @@ class ExtraccionDonadora(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     sesion_opu_id = Column(Integer, ForeignKey("sesiones_opu.id", ondelete="CASCADE"), nullable=False)
-    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=False)
+    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=False, index=True)
     numero_secuencial = Column(Integer, nullable=False)
     hora_inicio = Column(String(10), nullable=True)  # Hora de inicio de extracción
     hora_fin = Column(String(10), nullable=True)     # Hora de fin de extracción
@@ -159,6 +169,11 @@ class ExtraccionDonadora(Base):
     donadora = relationship("Donadora", back_populates="extracciones")
     fecundaciones = relationship("Fecundacion", back_populates="extraccion_donadora")
 
+    __table_args__ = (
+        # selectinload de extracciones por sesión, en orden secuencial
+        Index("ix_extraccion_donadoras_sesion_secuencial", "sesion_opu_id", "numero_secuencial"),
+    )
+
     @property
     def total_ovocitos(self):
         """Total de ovocitos recuperados"""
@@ -172,8 +187,8 @@ class Fecundacion(Base):
     __tablename__ = "fecundaciones"
 
     id = Column(Integer, primary_key=True, index=True)
-    extraccion_donadora_id = Column(Integer, ForeignKey("extraccion_donadoras.id"), nullable=True)
-    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=True)
+    extraccion_donadora_id = Column(Integer, ForeignKey("extraccion_donadoras.id"), nullable=True, index=True)
+    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=True, index=True)
 
     # Maduración
     laboratorista = Column(String(100), nullable=False)
@@ -229,9 +244,9 @@ class TransferenciaRealizada(Base):
     __tablename__ = "transferencias_realizadas"
 
     id = Column(Integer, primary_key=True, index=True)
-    sesion_transferencia_id = Column(Integer, ForeignKey("sesiones_transferencia.id", ondelete="CASCADE"), nullable=True)
+    sesion_transferencia_id = Column(Integer, ForeignKey("sesiones_transferencia.id", ondelete="CASCADE"), nullable=True, index=True)
     numero_secuencial = Column(Integer, nullable=False)
-    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=True)
+    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=True, index=True)
     toro = Column(String(100), nullable=True)
     raza_toro = Column(String(50), nullable=True)
     estado = Column(String(50), nullable=True)
@@ -256,7 +271,7 @@ class ChequeoGFE(Base):
     __tablename__ = "chequeos_gfe"
 
     id = Column(Integer, primary_key=True, index=True)
-    transferencia_id = Column(Integer, ForeignKey("transferencias_realizadas.id"), nullable=True)
+    transferencia_id = Column(Integer, ForeignKey("transferencias_realizadas.id"), nullable=True, index=True)
     receptora = Column(String(100), nullable=False)
     tecnico_chequeo = Column(String(100), nullable=False)
     hacienda = Column(String(100), nullable=True)
@@ -274,6 +289,10 @@ class ChequeoGFE(Base):
     # Relaciones
     transferencia = relationship("TransferenciaRealizada", back_populates="chequeos")
 
+    __table_args__ = (
+        Index("ix_chequeos_gfe_fecha_estado", "fecha", "estado"),
+    )
+
 
 # ==================== FOTOS ====================
 
@@ -301,6 +320,11 @@ class Foto(Base):
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
     usuario_creacion_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
 
+    __table_args__ = (
+        # Galería de una entidad ordenada por posición
+        Index("ix_fotos_entidad_orden", "entidad_tipo", "entidad_id", "orden"),
+    )
+
 
 # ==================== DRAFTS (AUTOSAVE) ====================
 
@@ -317,12 +341,186 @@ class Draft(Base):
     modulo = Column(String(50), nullable=False, index=True)  # "donadora", "opu", "fecundacion", etc.
     tipo_registro = Column(String(50), nullable=False)  # "sesion", "detalle", etc.
     registro_id = Column(Integer, nullable=True)  # ID del registro si ya existe
-    datos_json = Column(JSON, nullable=False)  # Datos del formulario en JSON
+    datos_json = Column(JSONComprimido, nullable=False)  # Datos del formulario en JSON (zlib si es grande)
     estado = Column(String(15), default="draft", nullable=False)  # SQLite compatible: 'draft' o 'completado'
 
+    # Control de concurrencia optimista para patches (JSON Patch)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    # Versión reflejada en datos_json; los patches posteriores están en draft_patches
+    version_snapshot = Column(Integer, default=1, server_default="1", nullable=False)
+
     # Timestamps
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
     fecha_actualizacion = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relaciones
     usuario = relationship("Usuario", back_populates="drafts")
+
+    __table_args__ = (
+        # Drafts activos/completados de un usuario por módulo (get_by_usuario_modulo)
+        Index("ix_drafts_usuario_modulo_estado", "usuario_id", "modulo", "estado"),
+        # Un solo draft activo por formulario (registro_id NULL = formulario nuevo);
+        # es el destino del ON CONFLICT del autosave
+        Index(
+            "uq_drafts_activo",
+            "usuario_id",
+            "modulo",
+            "tipo_registro",
+            func.coalesce(registro_id, literal_column("0")),
+            unique=True,
+            sqlite_where=text("estado = 'draft'"),
+            postgresql_where=text("estado = 'draft'"),
+        ),
+    )
+
+
+class DraftPatch(Base):
+    """
+    Cambio incremental (RFC 6902) de un draft pendiente de compactar
+
+    Cada fila lleva el draft de version - 1 a version. Al compactar se
+    vuelcan sobre datos_json y se eliminan.
+    """
+    __tablename__ = "draft_patches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    draft_id = Column(Integer, ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    operaciones = Column(JSON, nullable=False)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("draft_id", "version", name="uq_draft_patches_draft_version"),
+    )
+
+
+# ==================== VERSIONES (CACHÉ HTTP) ====================
+
+class VersionEntidad(Base):
+    """
+    Contador de cambios por tabla
+
+    Se incrementa en el mismo commit que modifica la tabla; los GET lo usan
+    como validador (ETag) sin consultar los datos.
+    """
+    __tablename__ = "versiones_entidad"
+
+    tabla = Column(String(100), primary_key=True)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# ==================== SINCRONIZACIÓN (CLIENTES OFFLINE) ====================
+
+class RegistroCambio(Base):
+    """
+    Registro de cambios para /sync (una fila por fila escrita en cada commit)
+
+    El id es el número de secuencia del cambio: los clientes guardan el
+    último que vieron y piden los posteriores. operacion 'delete' es la
+    lápida de una fila eliminada; 'reset' (fila_id NULL) indica una escritura
+    masiva sin ids conocidos, el cliente debe recargar la tabla completa.
+    """
+    __tablename__ = "registro_cambios"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tabla = Column(String(100), nullable=False)
+    fila_id = Column(Integer, nullable=True)
+    operacion = Column(String(10), nullable=False)  # upsert | delete | reset
+    fecha = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Purga por antigüedad
+        Index("ix_registro_cambios_fecha", "fecha"),
+    )
+
+
+class MutacionSync(Base):
+    """
+    Mutación offline ya procesada por /sync/push
+
+    La clave (usuario, mutacion_id) hace idempotente el reenvío de la cola
+    del cliente: una mutación repetida devuelve el resultado guardado.
+    """
+    __tablename__ = "mutaciones_sync"
+
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id", ondelete="CASCADE"), nullable=False)
+    mutacion_id = Column(String(64), nullable=False)  # generado por el cliente (UUID)
+    entidad = Column(String(50), nullable=False)
+    operacion = Column(String(15), nullable=False)  # crear | actualizar | eliminar
+    estado = Column(String(15), nullable=False)  # aplicada | rechazada
+    fila_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "mutacion_id", name="uq_mutaciones_sync_usuario_mutacion"),
+        Index("ix_mutaciones_sync_fecha", "fecha_creacion"),
+    )
+
+
+# ==================== IDEMPOTENCIA ====================
+
+class ClaveIdempotencia(Base):
+    """
+    Respuesta guardada de una escritura enviada con Idempotency-Key
+
+    La clave es única por cliente (alcance = hash del token). Mientras la
+    request original se procesa queda en estado 'en_curso'; al terminar se
+    guarda la respuesta y los reintentos la reciben sin volver a ejecutarse.
+    """
+    __tablename__ = "claves_idempotencia"
+
+    id = Column(Integer, primary_key=True, index=True)
+    alcance = Column(String(64), nullable=False)
+    clave = Column(String(255), nullable=False)
+    huella = Column(String(64), nullable=False)  # sha256 de método, ruta y cuerpo
+    metodo = Column(String(10), nullable=False)
+    ruta = Column(String(500), nullable=False)
+    estado = Column(String(15), nullable=False, default="en_curso")  # en_curso | completada
+    status_code = Column(Integer, nullable=True)
+    cabeceras = Column(JSON, nullable=True)  # [[nombre, valor], ...]
+    cuerpo = Column(LargeBinary, nullable=True)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expira = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("alcance", "clave", name="uq_claves_idempotencia_alcance_clave"),
+        # Purga de vencidas
+        Index("ix_claves_idempotencia_expira", "expira"),
+    )
+
+
+# ==================== ANALÍTICA ====================
+
+class ResumenProduccionOPU(Base):
+    """
+    Agregado diario de producción de ovocitos
+
+    Una fila por fecha/cliente/hacienda/técnico/donadora/toros. Se recalcula
+    por partición (fecha, cliente) cada vez que cambia una sesión OPU.
+    """
+    __tablename__ = "resumen_produccion_opu"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fecha = Column(Date, nullable=False)
+    cliente = Column(String(100), nullable=False)
+    hacienda = Column(String(100), nullable=True)
+    tecnico_opu = Column(String(100), nullable=False)
+    donadora_id = Column(Integer, ForeignKey("donadoras.id"), nullable=False, index=True)
+    toro_a = Column(String(100), nullable=True)
+    toro_b = Column(String(100), nullable=True)
+
+    # Métricas agregadas
+    extracciones = Column(Integer, default=0, nullable=False)
+    grado_1 = Column(Integer, default=0, nullable=False)
+    grado_2 = Column(Integer, default=0, nullable=False)
+    grado_3 = Column(Integer, default=0, nullable=False)
+    desnudos = Column(Integer, default=0, nullable=False)
+    irregular = Column(Integer, default=0, nullable=False)
+    total_ovocitos = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_resumen_produccion_fecha_cliente", "fecha", "cliente"),
+    )
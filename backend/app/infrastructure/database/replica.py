@@ -0,0 +1,73 @@
+"""
+Enrutado de lecturas entre primario y réplica
+
+Las sesiones de lectura van a la réplica salvo que el mismo cliente haya
+confirmado una escritura hace menos de REPLICA_STICKY_SECONDS: en ese caso
+se leen del primario para no devolver datos previos a su propio cambio por
+el retraso de replicación. La marca vive en memoria del proceso; con varios
+workers cada uno aplica la ventana a los requests que atiende.
+
+Sin réplica real (p. ej. los lectores query_only de SQLite sobre el mismo
+archivo) no hay retraso que evitar y las lecturas nunca pasan al primario:
+con un único escritor, un GET que lo ocupara bloquearía la escritura del
+mismo request.
+"""
+import hashlib
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+
+def clave_cliente(authorization: Optional[str], host: Optional[str]) -> str:
+    """Identificador del cliente: hash del token (sin guardarlo) o la IP"""
+    origen = authorization or f"host:{host or ''}"
+    return hashlib.sha256(origen.encode("utf-8")).hexdigest()[:32]
+
+
+class EnrutadorLecturas:
+    """Elige la factory de sesiones de lectura según escrituras recientes"""
+
+    def __init__(
+        self,
+        primaria: async_sessionmaker,
+        lectura: async_sessionmaker,
+        ventana_segundos: float,
+        max_clientes: int = 10_000,
+        con_replica: bool = False,
+    ):
+        """
+        Args:
+            con_replica: True solo si `lectura` apunta a una réplica con
+                retraso (DATABASE_REPLICA_URL); sin ella nunca se desvían
+                lecturas al primario
+        """
+        self.primaria = primaria
+        self.lectura = lectura
+        self.ventana = ventana_segundos
+        self.max_clientes = max_clientes
+        self.con_replica = con_replica
+        self._escrituras: Dict[str, float] = {}
+
+    def registrar_escritura(self, clave: str):
+        """Fijar el cliente al primario durante la ventana"""
+        if not self.con_replica or self.ventana <= 0:
+            return
+        ahora = time.monotonic()
+        if len(self._escrituras) >= self.max_clientes:
+            self._escrituras = {c: t for c, t in self._escrituras.items() if t > ahora}
+        self._escrituras[clave] = ahora + self.ventana
+
+    def escribio_recientemente(self, clave: str) -> bool:
+        expira = self._escrituras.get(clave)
+        if expira is None:
+            return False
+        if expira <= time.monotonic():
+            self._escrituras.pop(clave, None)
+            return False
+        return True
+
+    def factory_lectura(self, clave: str) -> async_sessionmaker:
+        if self.con_replica and self.escribio_recientemente(clave):
+            return self.primaria
+        return self.lectura
@@ -0,0 +1,16 @@
+"""
+Expresiones SQL dependientes del dialecto (SQLite / PostgreSQL)
+"""
+from sqlalchemy import func, literal_column
+
+
+def expr_mes(columna, dialecto: str):
+    """
+    Expresión 'YYYY-MM' para agrupar por mes una columna de fecha
+
+    El formato va como literal (no parámetro) para que PostgreSQL reconozca
+    la misma expresión en el SELECT y en el GROUP BY.
+    """
+    if dialecto == "postgresql":
+        return func.to_char(columna, literal_column("'YYYY-MM'"))
+    return func.strftime(literal_column("'%Y-%m'"), columna)
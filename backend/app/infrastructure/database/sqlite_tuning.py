@@ -0,0 +1,64 @@
+"""
+Ajustes de SQLite para producción local
+
+- WAL: los lectores no esperan al escritor (y viceversa).
+- synchronous=NORMAL: seguro con WAL y mucho más rápido que FULL.
+- busy_timeout, mmap_size y cache_size configurables en Settings.
+- Conexiones de lectura con query_only para que un GET nunca escriba.
+
+Las escrituras se serializan dando al engine principal una sola conexión
+(pool_size=1, sin overflow): los requests que escriben esperan turno en la
+cola del pool en lugar de fallar con "database is locked".
+"""
+from sqlalchemy import event
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ...core.config import settings
+
+
+def es_sqlite_archivo(database_url: str) -> bool:
+    """True si la URL es SQLite sobre un archivo (no :memory:)"""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return False
+    return bool(url.database) and url.database != ":memory:" and url.query.get("mode") != "memory"
+
+
+def pragmas(solo_lectura: bool = False, config=settings) -> list:
+    """Sentencias PRAGMA aplicadas a cada conexión nueva"""
+    sentencias = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}",
+        # Valor negativo = tamaño en KiB en lugar de páginas
+        f"PRAGMA cache_size=-{int(config.SQLITE_CACHE_SIZE_KB)}",
+    ]
+    if solo_lectura:
+        sentencias.append("PRAGMA query_only=ON")
+    return sentencias
+
+
+def pool_kwargs(solo_lectura: bool = False, config=settings) -> dict:
+    """Pool del escritor único o del grupo de lectores"""
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": config.SQLITE_READ_POOL_SIZE if solo_lectura else 1,
+        "max_overflow": 0,
+        "pool_timeout": config.SQLITE_WRITE_TIMEOUT,
+    }
+
+
+def configurar_sqlite(engine, solo_lectura: bool = False, config=settings):
+    """Registrar los pragmas en el evento connect del engine"""
+    sentencias = pragmas(solo_lectura, config)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for sentencia in sentencias:
+                cursor.execute(sentencia)
+        finally:
+            cursor.close()
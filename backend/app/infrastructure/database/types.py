@@ -0,0 +1,46 @@
+"""
+Tipos de columna propios
+
+JSONComprimido guarda como JSON normal los documentos pequeños y
+comprime con zlib los que superan DRAFT_COMPRIMIR_DESDE_BYTES, envueltos
+en {"__zlib__": "<base64>"}. La conversión es transparente para el ORM y
+para los INSERT/UPDATE de Core (incluido ON CONFLICT ... excluded).
+"""
+import base64
+import json
+import zlib
+
+from sqlalchemy.types import JSON, TypeDecorator
+
+from app.core.config import settings
+
+
+CLAVE_COMPRIMIDO = "__zlib__"
+
+
+def comprimir(valor, umbral: int):
+    """Envolver el documento comprimido si su JSON ocupa al menos 'umbral' bytes"""
+    if valor is None or umbral <= 0:
+        return valor
+    crudo = json.dumps(valor, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(crudo) < umbral:
+        return valor
+    return {CLAVE_COMPRIMIDO: base64.b64encode(zlib.compress(crudo, 6)).decode("ascii")}
+
+
+def descomprimir(valor):
+    if isinstance(valor, dict) and len(valor) == 1 and CLAVE_COMPRIMIDO in valor:
+        return json.loads(zlib.decompress(base64.b64decode(valor[CLAVE_COMPRIMIDO])))
+    return valor
+
+
+class JSONComprimido(TypeDecorator):
+    """JSON que se comprime por encima de un tamaño configurable"""
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return comprimir(value, settings.DRAFT_COMPRIMIR_DESDE_BYTES)
+
+    def process_result_value(self, value, dialect):
+        return descomprimir(value)
@@ -0,0 +1,80 @@
+"""
+Repositorio para el resumen del Dashboard
+
+Cada contador sale de una consulta dirigida (COUNT/SUM) en lugar de
+descargar listas completas de entidades.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import ChequeoGFE, Donadora, SesionOPU, TransferenciaRealizada
+from .gfe_repository import ESTADO_PRENADA
+from .opu_repository import OPURepository
+
+
+class DashboardRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_contadores(self, hoy: date) -> Dict[str, Any]:
+        """Donadoras activas, sesiones OPU del mes y tasa de preñez global"""
+        inicio_mes = hoy.replace(day=1)
+        inicio_siguiente = (inicio_mes + timedelta(days=32)).replace(day=1)
+
+        donadoras = await self.db.execute(
+            select(func.count(Donadora.id)).where(Donadora.activo == True)
+        )
+        sesiones_mes = await self.db.execute(
+            select(func.count(SesionOPU.id)).where(SesionOPU.fecha >= inicio_mes, SesionOPU.fecha < inicio_siguiente)
+        )
+        gfe = await self.db.execute(
+            select(
+                func.count(ChequeoGFE.id).label("chequeos"),
+                func.sum(case((ChequeoGFE.estado == ESTADO_PRENADA, 1), else_=0)).label("prenadas"),
+            )
+        )
+        gfe = gfe.one()
+        chequeos = gfe.chequeos or 0
+        prenadas = gfe.prenadas or 0
+
+        return {
+            "total_donadoras": donadoras.scalar() or 0,
+            "sesiones_opu_mes": sesiones_mes.scalar() or 0,
+            "total_chequeos": chequeos,
+            "total_prenadas": prenadas,
+            "tasa_prenez": round(prenadas * 100 / chequeos) if chequeos else 0,
+        }
+
+    async def get_sesiones_recientes(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Últimas sesiones OPU con totales agregados"""
+        return await OPURepository(self.db).get_resumenes(0, limit)
+
+    async def get_gfe_pendientes(self, limit: int = 10) -> Dict[str, Any]:
+        """Transferencias sin chequeo GFE (las más antiguas primero)"""
+        sin_chequeo = ~select(ChequeoGFE.id).where(
+            ChequeoGFE.transferencia_id == TransferenciaRealizada.id
+        ).exists()
+
+        total = await self.db.execute(
+            select(func.count(TransferenciaRealizada.id)).where(sin_chequeo)
+        )
+        result = await self.db.execute(
+            select(
+                TransferenciaRealizada.id,
+                TransferenciaRealizada.fecha,
+                TransferenciaRealizada.receptora,
+                TransferenciaRealizada.cliente,
+                TransferenciaRealizada.donadora_id,
+                TransferenciaRealizada.toro,
+            )
+            .where(sin_chequeo)
+            .order_by(TransferenciaRealizada.fecha.asc(), TransferenciaRealizada.id.asc())
+            .limit(limit)
+        )
+        return {
+            "total": total.scalar() or 0,
+            "items": [dict(row._mapping) for row in result],
+        }
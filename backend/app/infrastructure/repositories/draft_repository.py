@@ -1,14 +1,36 @@
 """
 Repositorio para gestión de drafts (autosave)
 """
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_, delete, func, literal_column, text, update
+from sqlalchemy.dialects import postgresql, sqlite
 
-from ..database.models import Draft
+from app.core.json_patch import aplicar_patch
+from ..database.models import Draft, DraftPatch
 from .base_repository import BaseRepository
 
 
+# Clave del índice único parcial uq_drafts_activo (destino del ON CONFLICT)
+CLAVE_DRAFT_ACTIVO = (
+    Draft.usuario_id,
+    Draft.modulo,
+    Draft.tipo_registro,
+    func.coalesce(Draft.registro_id, literal_column("0")),
+)
+# Literal (no parámetro) para que SQLite reconozca el índice parcial
+FILTRO_DRAFT_ACTIVO = text("estado = 'draft'")
+
+
+class ConflictoVersionDraft(Exception):
+    """El patch se calculó sobre una versión que ya no es la actual"""
+
+    def __init__(self, version_actual: Optional[int]):
+        super().__init__(f"Versión actual del draft: {version_actual}")
+        self.version_actual = version_actual
+
+
 class DraftRepository(BaseRepository[Draft]):
     """Repositorio para drafts (borrador autosave)"""
 
@@ -62,14 +84,213 @@ class DraftRepository(BaseRepository[Draft]):
         )
         return result.scalar_one_or_none()
 
+    def _upsert_stmt(self, valores: List[Dict[str, Any]]):
+        """INSERT ... ON CONFLICT (clave activa) DO UPDATE con los datos nuevos"""
+        dialecto = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialecto.insert(Draft).values(valores)
+        return stmt.on_conflict_do_update(
+            index_elements=list(CLAVE_DRAFT_ACTIVO),
+            index_where=FILTRO_DRAFT_ACTIVO,
+            set_={
+                "datos_json": stmt.excluded.datos_json,
+                "fecha_actualizacion": func.now(),
+                # Escritura completa: nuevo snapshot, los patches pendientes quedan obsoletos
+                "version": Draft.version + 1,
+                "version_snapshot": Draft.version + 1,
+            },
+        )
+
+    async def _descartar_patches(self, draft_ids: List[int]):
+        await self.db.execute(delete(DraftPatch).where(DraftPatch.draft_id.in_(draft_ids)))
+
+    async def upsert(
+        self,
+        usuario_id: int,
+        modulo: str,
+        tipo_registro: str,
+        registro_id: Optional[int],
+        datos_json: Dict[str, Any],
+    ) -> Draft:
+        """
+        Crear o actualizar el draft activo de un formulario en una sola sentencia
+
+        Los formularios nuevos (registro_id None) comparten clave, así que
+        los autosaves sucesivos actualizan el mismo draft.
+        """
+        stmt = self._upsert_stmt([{
+            "usuario_id": usuario_id,
+            "modulo": modulo,
+            "tipo_registro": tipo_registro,
+            "registro_id": registro_id,
+            "datos_json": datos_json,
+        }]).returning(Draft)
+        result = await self.db.execute(stmt, execution_options={"populate_existing": True})
+        draft = result.scalar_one()
+        await self._descartar_patches([draft.id])
+        await self.db.commit()
+        return draft
+
+    async def patches_pendientes(self, drafts: List[Draft]) -> Dict[int, List[list]]:
+        """Operaciones aún no compactadas por draft (una sola consulta)"""
+        ids = [d.id for d in drafts if d.version > d.version_snapshot]
+        if not ids:
+            return {}
+        result = await self.db.execute(
+            select(DraftPatch.draft_id, DraftPatch.operaciones)
+            .where(DraftPatch.draft_id.in_(ids))
+            .order_by(DraftPatch.draft_id, DraftPatch.version)
+        )
+        pendientes: Dict[int, List[list]] = {}
+        for draft_id, operaciones in result:
+            pendientes.setdefault(draft_id, []).append(operaciones)
+        return pendientes
+
+    async def materializar(self, draft: Draft, pendientes: Optional[List[list]] = None) -> Dict[str, Any]:
+        """Documento actual del draft: snapshot + patches pendientes"""
+        if pendientes is None:
+            pendientes = (await self.patches_pendientes([draft])).get(draft.id, [])
+        documento = draft.datos_json
+        for operaciones in pendientes:
+            documento = aplicar_patch(documento, operaciones)
+        return documento
+
+    async def _compactar(self, draft_id: int, documento: Dict[str, Any], version: int):
+        await self.db.execute(
+            update(Draft)
+            .where(Draft.id == draft_id)
+            .values(datos_json=documento, version_snapshot=version)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            delete(DraftPatch).where(DraftPatch.draft_id == draft_id, DraftPatch.version <= version)
+        )
+
+    async def guardar_version(
+        self, draft_id: int, version_esperada: int, version: int, documento: Dict[str, Any]
+    ) -> bool:
+        """
+        Guardar un documento completo como snapshot de `version` (sin commit)
+
+        Solo si el draft sigue activo y en version_esperada; descarta los
+        patches pendientes. Devuelve False si el draft cambió o no existe.
+        """
+        result = await self.db.execute(
+            update(Draft)
+            .where(Draft.id == draft_id, Draft.version == version_esperada, Draft.estado == "draft")
+            .values(datos_json=documento, version=version, version_snapshot=version, fecha_actualizacion=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            return False
+        await self._descartar_patches([draft_id])
+        return True
+
+    async def apply_patch(
+        self,
+        draft: Draft,
+        version_base: int,
+        operaciones: List[Dict[str, Any]],
+        snapshot_cada: int,
+    ) -> int:
+        """
+        Aplicar un JSON Patch calculado sobre version_base
+
+        Solo se guarda el patch; cada snapshot_cada versiones el documento
+        completo se compacta en datos_json. Lanza ConflictoVersionDraft si
+        la versión cambió y JsonPatchError si el patch no aplica.
+
+        Returns:
+            Nueva versión del draft
+        """
+        if draft.version != version_base:
+            raise ConflictoVersionDraft(draft.version)
+
+        # Valida el patch contra el documento vigente antes de guardarlo
+        documento = aplicar_patch(await self.materializar(draft), operaciones)
+        nueva_version = version_base + 1
+
+        result = await self.db.execute(
+            update(Draft)
+            .where(Draft.id == draft.id, Draft.version == version_base, Draft.estado == "draft")
+            .values(version=nueva_version, fecha_actualizacion=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await self.db.rollback()
+            actual = await self.db.scalar(select(Draft.version).where(Draft.id == draft.id))
+            raise ConflictoVersionDraft(actual)
+
+        self.db.add(DraftPatch(draft_id=draft.id, version=nueva_version, operaciones=operaciones))
+        if nueva_version - draft.version_snapshot >= snapshot_cada:
+            await self.db.flush()
+            await self._compactar(draft.id, documento, nueva_version)
+
+        await self.db.commit()
+        return nueva_version
+
     async def mark_as_completed(self, draft_id: int):
-        """Marcar draft como completado"""
+        """Marcar draft como completado (compacta los patches pendientes)"""
+        draft = await self.get_by_id(draft_id)
+        if draft is not None and draft.version > draft.version_snapshot:
+            await self._compactar(draft_id, await self.materializar(draft), draft.version)
         await self.update(draft_id, {"estado": "completado"})
 
+    async def purgar(
+        self,
+        ttl_dias: int,
+        ttl_dias_por_modulo: Dict[str, int],
+        retencion_completados_horas: int,
+        ahora: Optional[datetime] = None,
+    ) -> int:
+        """
+        Eliminar drafts completados tras la retención y drafts abandonados tras su TTL
+
+        El TTL se cuenta desde la última modificación; ttl_dias_por_modulo
+        reemplaza a ttl_dias para los módulos indicados.
+
+        Returns:
+            Número de drafts eliminados
+        """
+        ahora = ahora or datetime.now(timezone.utc)
+        ultima_modificacion = func.coalesce(Draft.fecha_actualizacion, Draft.fecha_creacion)
+
+        condiciones = [and_(
+            Draft.estado == "completado",
+            ultima_modificacion < ahora - timedelta(hours=retencion_completados_horas),
+        )]
+        for modulo, dias in ttl_dias_por_modulo.items():
+            condiciones.append(and_(
+                Draft.estado == "draft",
+                Draft.modulo == modulo,
+                ultima_modificacion < ahora - timedelta(days=dias),
+            ))
+        por_defecto = [Draft.estado == "draft", ultima_modificacion < ahora - timedelta(days=ttl_dias)]
+        if ttl_dias_por_modulo:
+            por_defecto.append(Draft.modulo.not_in(list(ttl_dias_por_modulo)))
+        condiciones.append(and_(*por_defecto))
+
+        vencidos = select(Draft.id).where(or_(*condiciones)).scalar_subquery()
+        await self.db.execute(delete(DraftPatch).where(DraftPatch.draft_id.in_(vencidos)))
+        result = await self.db.execute(delete(Draft).where(Draft.id.in_(vencidos)))
+        await self.db.commit()
+        return result.rowcount
+
+    async def delete(self, id: int) -> bool:
+        """Eliminar un draft y sus patches (SQLite no aplica ON DELETE CASCADE)"""
+        await self._descartar_patches([id])
+        return await super().delete(id)
+
     async def delete_user_drafts(self, usuario_id: int, modulo: str):
         """Eliminar todos los drafts de un usuario en un módulo"""
         from sqlalchemy import delete as sql_delete
 
+        await self.db.execute(
+            sql_delete(DraftPatch).where(
+                DraftPatch.draft_id.in_(
+                    select(Draft.id).where(Draft.usuario_id == usuario_id, Draft.modulo == modulo)
+                )
+            )
+        )
         stmt = sql_delete(Draft).where(
             and_(
                 Draft.usuario_id == usuario_id,
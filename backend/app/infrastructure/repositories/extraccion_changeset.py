@@ -0,0 +1,192 @@
+"""
+Change-set de extracciones OPU
+
+Calcula el diff entre las extracciones almacenadas de una sesión y las
+recibidas en un update, y genera sentencias set-based que solo tocan las
+filas cuyos valores realmente cambiaron:
+
+- UPDATE ... FROM (VALUES ...) en PostgreSQL (executemany en otros dialectos)
+- DELETE ... WHERE id IN (...)
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, bindparam, cast, column, delete, update, values
+
+from ..database.models import ExtraccionDonadora
+
+
+# Columnas editables de una extracción (las fotos se gestionan en /fotos)
+CAMPOS_EXTRACCION = (
+    "donadora_id",
+    "numero_secuencial",
+    "hora_inicio",
+    "hora_fin",
+    "toro_a",
+    "toro_b",
+    "raza_toro",
+    "ct",
+    "cc",
+    "eo",
+    "prevision_campo",
+    "grado_1",
+    "grado_2",
+    "grado_3",
+    "desnudos",
+    "irregular",
+    "observaciones",
+)
+
+# Conteos que nunca son NULL en la BD
+CAMPOS_CONTEO = ("grado_1", "grado_2", "grado_3", "desnudos", "irregular")
+
+tabla_extracciones = ExtraccionDonadora.__table__
+
+
+def normalizar_extraccion(data: dict, donadora_id: int) -> Dict[str, Any]:
+    """Valores de columna de una extracción recibida, con defaults aplicados"""
+    valores = {campo: data.get(campo) for campo in CAMPOS_EXTRACCION}
+    valores["donadora_id"] = donadora_id
+    valores["numero_secuencial"] = data["numero_secuencial"]
+    for campo in CAMPOS_CONTEO:
+        if valores[campo] is None:
+            valores[campo] = 0
+    return valores
+
+
+@dataclass
+class CambioExtraccion:
+    """Resultado por fila de la sincronización"""
+    accion: str  # creada | actualizada | eliminada | sin_cambios
+    numero_secuencial: int
+    id: Optional[int] = None
+    campos: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "numero_secuencial": self.numero_secuencial,
+            "accion": self.accion,
+            "campos": self.campos,
+        }
+
+
+@dataclass
+class ChangeSetExtracciones:
+    """Diff entre extracciones almacenadas y recibidas"""
+    nuevas: List[Dict[str, Any]] = field(default_factory=list)
+    actualizaciones: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    eliminadas: List[int] = field(default_factory=list)
+    cambios: List[CambioExtraccion] = field(default_factory=list)
+
+    @property
+    def vacio(self) -> bool:
+        """True si no hay nada que escribir"""
+        return not (self.nuevas or self.actualizaciones or self.eliminadas)
+
+
+def calcular_changeset(
+    actuales: Iterable[ExtraccionDonadora],
+    recibidas: List[Tuple[Optional[int], Dict[str, Any]]],
+) -> ChangeSetExtracciones:
+    """
+    Comparar extracciones almacenadas con las recibidas
+
+    Args:
+        actuales: Extracciones cargadas de la sesión
+        recibidas: Pares (id o None, valores normalizados) en el orden recibido
+
+    Returns:
+        ChangeSetExtracciones con inserts, updates (solo columnas cambiadas) y deletes
+    """
+    actuales_by_id = {ext.id: ext for ext in actuales}
+    changeset = ChangeSetExtracciones()
+    ids_recibidos = set()
+
+    for ext_id, valores in recibidas:
+        existente = actuales_by_id.get(ext_id) if ext_id else None
+        if existente is None or ext_id in ids_recibidos:
+            changeset.nuevas.append(valores)
+            continue
+
+        ids_recibidos.add(ext_id)
+        diff = {
+            campo: valor
+            for campo, valor in valores.items()
+            if getattr(existente, campo) != valor
+        }
+        if diff:
+            changeset.actualizaciones[ext_id] = diff
+            changeset.cambios.append(
+                CambioExtraccion("actualizada", valores["numero_secuencial"], ext_id, sorted(diff))
+            )
+        else:
+            changeset.cambios.append(
+                CambioExtraccion("sin_cambios", valores["numero_secuencial"], ext_id)
+            )
+
+    for ext_id, existente in actuales_by_id.items():
+        if ext_id not in ids_recibidos:
+            changeset.eliminadas.append(ext_id)
+            changeset.cambios.append(
+                CambioExtraccion("eliminada", existente.numero_secuencial, ext_id)
+            )
+
+    return changeset
+
+
+def sentencias_update(
+    actualizaciones: Dict[int, Dict[str, Any]],
+    dialecto: str,
+) -> List[Tuple[Any, Optional[List[dict]]]]:
+    """
+    Sentencias UPDATE agrupadas por conjunto de columnas cambiadas
+
+    En PostgreSQL cada grupo es un único UPDATE ... FROM (VALUES ...); en el
+    resto de dialectos (SQLite no admite alias de columnas en VALUES) se usa
+    un UPDATE parametrizado ejecutado como executemany.
+
+    Returns:
+        Lista de (sentencia, parámetros executemany o None)
+    """
+    grupos: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+    for ext_id, diff in actualizaciones.items():
+        grupos[tuple(sorted(diff))].append((ext_id, diff))
+
+    sentencias = []
+    for campos, filas in grupos.items():
+        if dialecto == "postgresql":
+            tabla_valores = values(
+                column("id", Integer),
+                *[column(campo, tabla_extracciones.c[campo].type) for campo in campos],
+                name="v",
+            ).data([(ext_id, *[diff[campo] for campo in campos]) for ext_id, diff in filas])
+
+            stmt = (
+                update(tabla_extracciones)
+                .where(tabla_extracciones.c.id == tabla_valores.c.id)
+                .values({
+                    campo: cast(tabla_valores.c[campo], tabla_extracciones.c[campo].type)
+                    for campo in campos
+                })
+            )
+            sentencias.append((stmt, None))
+        else:
+            stmt = (
+                update(tabla_extracciones)
+                .where(tabla_extracciones.c.id == bindparam("b_id"))
+                .values({campo: bindparam(f"b_{campo}") for campo in campos})
+            )
+            params = [
+                {"b_id": ext_id, **{f"b_{campo}": diff[campo] for campo in campos}}
+                for ext_id, diff in filas
+            ]
+            sentencias.append((stmt, params))
+
+    return sentencias
+
+
+def sentencia_delete(ids: List[int]):
+    """DELETE set-based de las extracciones eliminadas"""
+    return delete(tabla_extracciones).where(tabla_extracciones.c.id.in_(ids))
@@ -1,14 +1,21 @@
 """
 Repositorio para chequeos GFE
 """
-from typing import List
+from datetime import date
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import case, func, select
 
-from ..database.models import ChequeoGFE
+from ..database.models import ChequeoGFE, TransferenciaRealizada
+from ..database.sql_utils import expr_mes
 from .base_repository import BaseRepository
 
 
+AGRUPACIONES_TASA = ("tecnico", "cliente", "hacienda", "mes", "toro", "finalidad")
+
+ESTADO_PRENADA = "preñada"
+
+
 class GFERepository(BaseRepository[ChequeoGFE]):
     def __init__(self, db: AsyncSession):
         super().__init__(db, ChequeoGFE)
@@ -18,3 +25,61 @@ class GFERepository(BaseRepository[ChequeoGFE]):
             select(ChequeoGFE).where(ChequeoGFE.receptora.ilike(f"%{receptora}%"))
         )
         return result.scalars().all()
+
+    async def get_tasas_prenez(
+        self,
+        agrupar: str,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Tasa de preñez agrupada en una sola consulta
+
+        Args:
+            agrupar: tecnico | cliente | hacienda | mes | toro | finalidad
+                (toro y finalidad vienen de la transferencia vinculada)
+            desde/hasta: Rango de fechas del chequeo (usa ix_chequeos_gfe_fecha_estado)
+
+        Returns:
+            Lista de {clave, chequeos, prenadas, vacias, tasa_prenez}
+        """
+        if agrupar not in AGRUPACIONES_TASA:
+            raise ValueError(f"Agrupación no soportada: {agrupar}")
+
+        claves = {
+            "tecnico": ChequeoGFE.tecnico_chequeo,
+            "cliente": ChequeoGFE.cliente,
+            "hacienda": ChequeoGFE.hacienda,
+            "mes": expr_mes(ChequeoGFE.fecha, self.db.bind.dialect.name),
+            "toro": TransferenciaRealizada.toro,
+            "finalidad": TransferenciaRealizada.finalidad,
+        }
+        clave = claves[agrupar]
+        prenadas = func.sum(case((ChequeoGFE.estado == ESTADO_PRENADA, 1), else_=0))
+
+        stmt = select(
+            clave.label("clave"),
+            func.count(ChequeoGFE.id).label("chequeos"),
+            prenadas.label("prenadas"),
+        ).group_by(clave)
+
+        if agrupar in ("toro", "finalidad"):
+            stmt = stmt.select_from(ChequeoGFE).outerjoin(
+                TransferenciaRealizada, TransferenciaRealizada.id == ChequeoGFE.transferencia_id
+            )
+        if desde:
+            stmt = stmt.where(ChequeoGFE.fecha >= desde)
+        if hasta:
+            stmt = stmt.where(ChequeoGFE.fecha <= hasta)
+
+        result = await self.db.execute(stmt.order_by(func.count(ChequeoGFE.id).desc()))
+        return [
+            {
+                "clave": row.clave,
+                "chequeos": row.chequeos,
+                "prenadas": row.prenadas or 0,
+                "vacias": row.chequeos - (row.prenadas or 0),
+                "tasa_prenez": round((row.prenadas or 0) * 100 / row.chequeos, 2) if row.chequeos else 0.0,
+            }
+            for row in result
+        ]
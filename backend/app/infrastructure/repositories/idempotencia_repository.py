@@ -0,0 +1,111 @@
+"""
+Repositorio de claves de idempotencia (Idempotency-Key)
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import ClaveIdempotencia
+
+
+class IdempotenciaRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, alcance: str, clave: str) -> Optional[ClaveIdempotencia]:
+        result = await self.db.execute(
+            select(ClaveIdempotencia).where(
+                ClaveIdempotencia.alcance == alcance,
+                ClaveIdempotencia.clave == clave,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def reservar(
+        self,
+        alcance: str,
+        clave: str,
+        huella: str,
+        metodo: str,
+        ruta: str,
+        ttl_horas: int,
+        en_curso_segundos: int,
+        ahora: Optional[datetime] = None,
+    ) -> Tuple[ClaveIdempotencia, bool]:
+        """
+        Reservar la clave para procesar la request
+
+        El índice único (alcance, clave) decide entre requests concurrentes,
+        aunque lleguen a procesos distintos. Una clave vencida o una reserva
+        huérfana (en curso desde hace más de `en_curso_segundos`) se
+        reemplaza.
+
+        Returns:
+            (registro, reservada): reservada=False si la clave ya existía y
+            el registro es el de la request original
+        """
+        ahora = ahora or datetime.now(timezone.utc)
+        for _ in range(2):
+            registro = ClaveIdempotencia(
+                alcance=alcance,
+                clave=clave,
+                huella=huella,
+                metodo=metodo,
+                ruta=ruta[:500],
+                estado="en_curso",
+                fecha_creacion=ahora,
+                expira=ahora + timedelta(hours=ttl_horas),
+            )
+            self.db.add(registro)
+            try:
+                await self.db.commit()
+                return registro, True
+            except IntegrityError:
+                await self.db.rollback()
+
+            reemplazable = await self.db.execute(
+                delete(ClaveIdempotencia).where(
+                    ClaveIdempotencia.alcance == alcance,
+                    ClaveIdempotencia.clave == clave,
+                    or_(
+                        ClaveIdempotencia.expira < ahora,
+                        and_(
+                            ClaveIdempotencia.estado == "en_curso",
+                            ClaveIdempotencia.fecha_creacion < ahora - timedelta(seconds=en_curso_segundos),
+                        ),
+                    ),
+                )
+            )
+            await self.db.commit()
+            if not reemplazable.rowcount:
+                break
+
+        existente = await self.get(alcance, clave)
+        if existente is None:
+            # Liberada entre el insert y la lectura: se trata como en curso
+            return registro, False
+        return existente, False
+
+    async def completar(self, id: int, status_code: int, cabeceras: List[list], cuerpo: bytes) -> None:
+        """Guardar la respuesta de la request original"""
+        await self.db.execute(
+            update(ClaveIdempotencia)
+            .where(ClaveIdempotencia.id == id)
+            .values(estado="completada", status_code=status_code, cabeceras=cabeceras, cuerpo=cuerpo)
+        )
+        await self.db.commit()
+
+    async def liberar(self, id: int) -> None:
+        """Eliminar la reserva (respuesta no reutilizable: el reintento se vuelve a ejecutar)"""
+        await self.db.execute(delete(ClaveIdempotencia).where(ClaveIdempotencia.id == id))
+        await self.db.commit()
+
+    async def purgar(self, ahora: Optional[datetime] = None) -> int:
+        """Eliminar claves vencidas; devuelve cuántas"""
+        ahora = ahora or datetime.now(timezone.utc)
+        result = await self.db.execute(delete(ClaveIdempotencia).where(ClaveIdempotencia.expira < ahora))
+        await self.db.commit()
+        return result.rowcount
@@ -0,0 +1,170 @@
+"""
+Repositorio para el linaje OPU → fecundación → transferencia → GFE
+
+Cada etapa se resuelve con una única consulta agregada por donadora, de
+modo que el reporte completo usa un número fijo de consultas sin importar
+el número de donadoras o sesiones.
+"""
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, case, distinct, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import (
+    ChequeoGFE,
+    Donadora,
+    ExtraccionDonadora,
+    Fecundacion,
+    SesionOPU,
+    SesionTransferencia,
+    TransferenciaRealizada,
+)
+from .gfe_repository import ESTADO_PRENADA
+
+
+class LinajeRepository:
+    """Consultas agregadas por donadora para cada etapa del linaje"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def extracciones_por_donadora(
+        self,
+        donadora_id: Optional[int] = None,
+        sesion_opu_id: Optional[int] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Sesiones, extracciones y ovocitos por donadora
+
+        ovocitos_fecundados cuenta los ovocitos de las extracciones que
+        pasaron a fecundación (no se registra cuántos embriones resultan).
+        """
+        ext = ExtraccionDonadora
+        total = ext.grado_1 + ext.grado_2 + ext.grado_3 + ext.desnudos + ext.irregular
+        fecundada = exists().where(Fecundacion.extraccion_donadora_id == ext.id)
+        stmt = (
+            select(
+                ext.donadora_id,
+                Donadora.nombre,
+                Donadora.numero_registro,
+                func.count(distinct(ext.sesion_opu_id)).label("sesiones"),
+                func.count(ext.id).label("extracciones"),
+                func.coalesce(func.sum(total), 0).label("ovocitos"),
+                func.coalesce(func.sum(case((fecundada, total), else_=0)), 0).label("ovocitos_fecundados"),
+            )
+            .join(SesionOPU, SesionOPU.id == ext.sesion_opu_id)
+            .join(Donadora, Donadora.id == ext.donadora_id)
+            .group_by(ext.donadora_id, Donadora.nombre, Donadora.numero_registro)
+        )
+        if donadora_id:
+            stmt = stmt.where(ext.donadora_id == donadora_id)
+        if sesion_opu_id:
+            stmt = stmt.where(ext.sesion_opu_id == sesion_opu_id)
+        if desde:
+            stmt = stmt.where(SesionOPU.fecha >= desde)
+        if hasta:
+            stmt = stmt.where(SesionOPU.fecha <= hasta)
+
+        result = await self.db.execute(stmt)
+        return {row.donadora_id: dict(row._mapping) for row in result}
+
+    async def fecundaciones_por_donadora(
+        self,
+        donadora_id: Optional[int] = None,
+        sesion_opu_id: Optional[int] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> Dict[int, int]:
+        """
+        Fecundaciones por donadora
+
+        La donadora sale del registro de fecundación o, si falta, de la
+        extracción OPU asociada.
+        """
+        donadora = func.coalesce(Fecundacion.donadora_id, ExtraccionDonadora.donadora_id)
+        stmt = (
+            select(donadora.label("donadora_id"), func.count(Fecundacion.id).label("fecundaciones"))
+            .select_from(Fecundacion)
+            .outerjoin(ExtraccionDonadora, ExtraccionDonadora.id == Fecundacion.extraccion_donadora_id)
+            .where(donadora.isnot(None))
+            .group_by(donadora)
+        )
+        if donadora_id:
+            stmt = stmt.where(donadora == donadora_id)
+        if sesion_opu_id:
+            stmt = stmt.where(ExtraccionDonadora.sesion_opu_id == sesion_opu_id)
+        if desde:
+            stmt = stmt.where(Fecundacion.fecha_inicio_maduracion >= desde)
+        if hasta:
+            stmt = stmt.where(Fecundacion.fecha_inicio_maduracion <= hasta)
+
+        result = await self.db.execute(stmt)
+        return {row.donadora_id: row.fecundaciones for row in result}
+
+    async def transferencias_por_donadora(
+        self,
+        donadora_id: Optional[int] = None,
+        sesion_opu_id: Optional[int] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> Dict[int, Dict[str, int]]:
+        """
+        Transferencias, chequeos GFE y preñadas por donadora
+
+        Las transferencias no guardan la sesión OPU de origen; con
+        sesion_opu_id se toman las de sus donadoras desde la fecha de la sesión.
+        """
+        t = TransferenciaRealizada
+        fecha = func.coalesce(t.fecha, SesionTransferencia.fecha)
+        stmt = (
+            select(
+                t.donadora_id,
+                func.count(distinct(t.id)).label("transferencias"),
+                func.count(distinct(ChequeoGFE.transferencia_id)).label("chequeadas"),
+                func.count(
+                    distinct(case((ChequeoGFE.estado == ESTADO_PRENADA, ChequeoGFE.transferencia_id)))
+                ).label("prenadas"),
+            )
+            .select_from(t)
+            .outerjoin(SesionTransferencia, SesionTransferencia.id == t.sesion_transferencia_id)
+            .outerjoin(ChequeoGFE, ChequeoGFE.transferencia_id == t.id)
+            .where(t.donadora_id.isnot(None))
+            .group_by(t.donadora_id)
+        )
+        if donadora_id:
+            stmt = stmt.where(t.donadora_id == donadora_id)
+        if sesion_opu_id:
+            fecha_sesion = select(SesionOPU.fecha).where(SesionOPU.id == sesion_opu_id).scalar_subquery()
+            donadoras_sesion = select(ExtraccionDonadora.donadora_id).where(
+                ExtraccionDonadora.sesion_opu_id == sesion_opu_id
+            )
+            stmt = stmt.where(and_(t.donadora_id.in_(donadoras_sesion), fecha >= fecha_sesion))
+        if desde:
+            stmt = stmt.where(fecha >= desde)
+        if hasta:
+            stmt = stmt.where(fecha <= hasta)
+
+        result = await self.db.execute(stmt)
+        return {
+            row.donadora_id: {
+                "transferencias": row.transferencias,
+                "chequeadas": row.chequeadas,
+                "prenadas": row.prenadas,
+            }
+            for row in result
+        }
+
+    async def nombres_donadoras(self, ids) -> Dict[int, Dict[str, str]]:
+        """Nombre y registro de donadoras que no aparecen en extracciones"""
+        if not ids:
+            return {}
+        result = await self.db.execute(
+            select(Donadora.id, Donadora.nombre, Donadora.numero_registro).where(Donadora.id.in_(ids))
+        )
+        return {
+            row.id: {"nombre": row.nombre, "numero_registro": row.numero_registro}
+            for row in result
+        }
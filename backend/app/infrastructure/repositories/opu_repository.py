@@ -1,26 +1,48 @@
 """
 Repository para gestión de sesiones OPU y extracciones
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.util import identity_key
 
+from app.core.proyeccion import Proyeccion, opciones_carga
+from ..database.events import registrar_cambio
 from ..database.models import SesionOPU, ExtraccionDonadora, Donadora
 from .donadora_repository import DonadoraRepository
+from .produccion_repository import ProduccionRepository
+from .extraccion_changeset import (
+    CambioExtraccion,
+    ChangeSetExtracciones,
+    calcular_changeset,
+    normalizar_extraccion,
+    sentencia_delete,
+    sentencias_update,
+)
+
+
+# Colecciones anidadas de SesionOPUResponse -> relación del modelo
+COLECCIONES_SESION = {"extracciones": "extracciones_donadoras"}
 
 
 class OPURepository:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.donadora_repo = DonadoraRepository(db)
+        self.produccion_repo = ProduccionRepository(db)
 
     async def _load_with_extracciones(self, sesion_id: int) -> Optional[SesionOPU]:
-        """Cargar sesión con extracciones usando selectinload para evitar lazy en serialización"""
+        """
+        Cargar sesión con extracciones usando selectinload para evitar lazy en serialización
+
+        populate_existing refresca la colección aunque la sesión ya esté en el identity map.
+        """
         result = await self.db.execute(
             select(SesionOPU)
             .options(selectinload(SesionOPU.extracciones_donadoras))
             .where(SesionOPU.id == sesion_id)
+            .execution_options(populate_existing=True)
         )
         return result.scalar_one_or_none()
 
@@ -57,115 +79,176 @@ class OPURepository:
 
         for ext in extracciones:
             donadora_id = await self._resolve_donadora_id(ext)
-            nueva_ext = ExtraccionDonadora(
-                sesion_opu_id=sesion.id,
-                donadora_id=donadora_id,
-                numero_secuencial=ext["numero_secuencial"],
-                hora_inicio=ext.get("hora_inicio"),
-                hora_fin=ext.get("hora_fin"),
-                toro_a=ext.get("toro_a"),
-                toro_b=ext.get("toro_b"),
-                raza_toro=ext.get("raza_toro"),
-                ct=ext.get("ct"),
-                cc=ext.get("cc"),
-                eo=ext.get("eo"),
-                prevision_campo=ext.get("prevision_campo"),
-                grado_1=ext.get("grado_1", 0),
-                grado_2=ext.get("grado_2", 0),
-                grado_3=ext.get("grado_3", 0),
-                desnudos=ext.get("desnudos", 0),
-                irregular=ext.get("irregular", 0),
-                observaciones=ext.get("observaciones"),
+            self.db.add(
+                ExtraccionDonadora(
+                    sesion_opu_id=sesion.id,
+                    **normalizar_extraccion(ext, donadora_id),
+                )
             )
-            self.db.add(nueva_ext)
 
+        await self.db.flush()
+        await self.produccion_repo.refrescar_particiones([(sesion.fecha, sesion.cliente)])
         await self.db.commit()
         # Volver a cargar con extracciones para evitar lazy load en la respuesta
         return await self._load_with_extracciones(sesion.id)
 
-    async def get_by_id(self, sesion_id: int) -> Optional[SesionOPU]:
-        """Obtener sesión por ID con extracciones"""
+    async def get_by_id(self, sesion_id: int, proyeccion: Optional[Proyeccion] = None) -> Optional[SesionOPU]:
+        """Obtener sesión por ID (con extracciones salvo que la proyección las excluya)"""
         result = await self.db.execute(
             select(SesionOPU)
-            .options(selectinload(SesionOPU.extracciones_donadoras))
+            .options(*opciones_carga(SesionOPU, proyeccion, COLECCIONES_SESION))
             .where(SesionOPU.id == sesion_id)
         )
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[SesionOPU]:
-        """Obtener todas las sesiones con extracciones"""
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, proyeccion: Optional[Proyeccion] = None
+    ) -> List[SesionOPU]:
+        """Obtener sesiones (con extracciones salvo que la proyección las excluya)"""
         result = await self.db.execute(
             select(SesionOPU)
-            .options(selectinload(SesionOPU.extracciones_donadoras))
+            .options(*opciones_carga(SesionOPU, proyeccion, COLECCIONES_SESION))
             .offset(skip)
             .limit(limit)
             .order_by(SesionOPU.fecha.desc())
         )
         return result.scalars().all()
 
+    async def get_resumenes(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Listar sesiones con totales de extracciones calculados en SQL
+
+        Primero se eligen los ids de la página (fecha, id descendentes) y el
+        GROUP BY sobre extraccion_donadoras se limita a esas sesiones, sin
+        agregar la tabla completa ni hidratar las extracciones como objetos ORM.
+        """
+        pagina = (
+            select(SesionOPU.id)
+            .order_by(SesionOPU.fecha.desc(), SesionOPU.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .cte("pagina")
+        )
+
+        ext = ExtraccionDonadora
+        totales = (
+            select(
+                ext.sesion_opu_id.label("sesion_opu_id"),
+                func.count(func.distinct(ext.donadora_id)).label("total_donadoras"),
+                func.sum(ext.grado_1).label("grado_1"),
+                func.sum(ext.grado_2).label("grado_2"),
+                func.sum(ext.grado_3).label("grado_3"),
+                func.sum(ext.desnudos).label("desnudos"),
+                func.sum(ext.irregular).label("irregular"),
+            )
+            .where(ext.sesion_opu_id.in_(select(pagina.c.id)))
+            .group_by(ext.sesion_opu_id)
+            .subquery()
+        )
+
+        cabecera = [
+            SesionOPU.id,
+            SesionOPU.fecha,
+            SesionOPU.tecnico_opu,
+            SesionOPU.tecnico_busqueda,
+            SesionOPU.cliente,
+            SesionOPU.hacienda,
+            SesionOPU.lote,
+            SesionOPU.hora_inicio,
+            SesionOPU.hora_final,
+            SesionOPU.finalidad,
+            SesionOPU.fecha_creacion,
+        ]
+        conteos = ("total_donadoras", "grado_1", "grado_2", "grado_3", "desnudos", "irregular")
+
+        result = await self.db.execute(
+            select(
+                *cabecera,
+                *[func.coalesce(totales.c[campo], 0).label(campo) for campo in conteos],
+            )
+            .join(pagina, pagina.c.id == SesionOPU.id)
+            .outerjoin(totales, totales.c.sesion_opu_id == SesionOPU.id)
+            .order_by(SesionOPU.fecha.desc(), SesionOPU.id.desc())
+        )
+
+        resumenes = []
+        for row in result.mappings():
+            resumen = dict(row)
+            resumen["total_ovocitos"] = sum(
+                resumen[campo] for campo in ("grado_1", "grado_2", "grado_3", "desnudos", "irregular")
+            )
+            resumenes.append(resumen)
+        return resumenes
+
     async def update(self, sesion: SesionOPU, data: dict, extracciones: Optional[List[dict]] = None) -> SesionOPU:
-        """Actualizar sesión y, si se envían, sincronizar extracciones sin recrearlas todas"""
+        """
+        Actualizar sesión y, si se envían, sincronizar extracciones por diff
+
+        Solo se escriben las extracciones cuyos valores cambiaron; la sesión
+        devuelta incluye `cambios` con la acción aplicada a cada fila.
+        """
+        particion_anterior = (sesion.fecha, sesion.cliente)
         for key, value in data.items():
             setattr(sesion, key, value)
 
+        cambios = []
         if extracciones is not None:
-            actuales_by_id = {ext.id: ext for ext in sesion.extracciones_donadoras}
-            ids_recibidos = set()
-
-            for ext in extracciones:
-                donadora_id = await self._resolve_donadora_id(ext)
-                ext_id = ext.get("id")
-
-                if ext_id and ext_id in actuales_by_id:
-                    existente = actuales_by_id[ext_id]
-                    existente.donadora_id = donadora_id
-                    existente.numero_secuencial = ext["numero_secuencial"]
-                    existente.hora_inicio = ext.get("hora_inicio")
-                    existente.hora_fin = ext.get("hora_fin")
-                    existente.toro_a = ext.get("toro_a")
-                    existente.toro_b = ext.get("toro_b")
-                    existente.raza_toro = ext.get("raza_toro")
-                    existente.ct = ext.get("ct")
-                    existente.cc = ext.get("cc")
-                    existente.eo = ext.get("eo")
-                    existente.prevision_campo = ext.get("prevision_campo")
-                    existente.grado_1 = ext.get("grado_1", 0)
-                    existente.grado_2 = ext.get("grado_2", 0)
-                    existente.grado_3 = ext.get("grado_3", 0)
-                    existente.desnudos = ext.get("desnudos", 0)
-                    existente.irregular = ext.get("irregular", 0)
-                    existente.observaciones = ext.get("observaciones")
-                    ids_recibidos.add(ext_id)
-                else:
-                    nueva_ext = ExtraccionDonadora(
-                        sesion_opu_id=sesion.id,
-                        donadora_id=donadora_id,
-                        numero_secuencial=ext["numero_secuencial"],
-                        hora_inicio=ext.get("hora_inicio"),
-                        hora_fin=ext.get("hora_fin"),
-                        toro_a=ext.get("toro_a"),
-                        toro_b=ext.get("toro_b"),
-                        raza_toro=ext.get("raza_toro"),
-                        ct=ext.get("ct"),
-                        cc=ext.get("cc"),
-                        eo=ext.get("eo"),
-                        prevision_campo=ext.get("prevision_campo"),
-                        grado_1=ext.get("grado_1", 0),
-                        grado_2=ext.get("grado_2", 0),
-                        grado_3=ext.get("grado_3", 0),
-                        desnudos=ext.get("desnudos", 0),
-                        irregular=ext.get("irregular", 0),
-                        observaciones=ext.get("observaciones"),
-                    )
-                    self.db.add(nueva_ext)
-
-            for ext_id, ext_obj in actuales_by_id.items():
-                if ext_id not in ids_recibidos:
-                    await self.db.delete(ext_obj)
+            changeset = await self._calcular_changeset(sesion, extracciones)
+            await self._aplicar_changeset(sesion.id, changeset)
+            cambios = changeset.cambios
+            # Las extracciones se escriben con DML: anotar la sesión para /sync
+            registrar_cambio(self.db, "sesiones_opu", sesion.id)
 
+        await self.db.flush()
+        await self.produccion_repo.refrescar_particiones(
+            [particion_anterior, (sesion.fecha, sesion.cliente)]
+        )
         await self.db.commit()
         # Devolver sesión con extracciones cargadas
-        return await self._load_with_extracciones(sesion.id)
+        actualizada = await self._load_with_extracciones(sesion.id)
+        actualizada.cambios = [cambio.as_dict() for cambio in cambios]
+        return actualizada
+
+    async def _calcular_changeset(self, sesion: SesionOPU, extracciones: List[dict]) -> ChangeSetExtracciones:
+        """Normalizar extracciones recibidas y compararlas con las almacenadas"""
+        recibidas = []
+        for ext in extracciones:
+            donadora_id = await self._resolve_donadora_id(ext)
+            recibidas.append((ext.get("id"), normalizar_extraccion(ext, donadora_id)))
+        return calcular_changeset(sesion.extracciones_donadoras, recibidas)
+
+    async def _aplicar_changeset(self, sesion_id: int, changeset: ChangeSetExtracciones):
+        """Ejecutar el change-set con sentencias set-based dentro de la transacción actual"""
+        if changeset.vacio:
+            return
+
+        dialecto = self.db.bind.dialect.name
+        for stmt, params in sentencias_update(changeset.actualizaciones, dialecto):
+            if params is None:
+                await self.db.execute(stmt)
+            else:
+                await self.db.execute(stmt, params)
+
+        if changeset.eliminadas:
+            await self.db.execute(sentencia_delete(changeset.eliminadas))
+            # El DELETE de Core no toca el identity map: sin expulsar las
+            # instancias, un insert posterior que reutilice el id las pisaría
+            for ext_id in changeset.eliminadas:
+                eliminada = self.db.identity_map.get(identity_key(ExtraccionDonadora, ext_id))
+                if eliminada is not None:
+                    self.db.expunge(eliminada)
+
+        nuevas = [
+            ExtraccionDonadora(sesion_opu_id=sesion_id, **valores)
+            for valores in changeset.nuevas
+        ]
+        if nuevas:
+            self.db.add_all(nuevas)
+            await self.db.flush()
+            changeset.cambios.extend(
+                CambioExtraccion("creada", nueva.numero_secuencial, nueva.id)
+                for nueva in nuevas
+            )
 
     async def marcar_hora(self, sesion: SesionOPU, campo: str, valor: str) -> SesionOPU:
         """Marcar hora de inicio o final para una sesión OPU"""
@@ -175,6 +258,9 @@ class OPURepository:
 
     async def delete(self, sesion: SesionOPU) -> bool:
         """Eliminar sesión"""
+        particion = (sesion.fecha, sesion.cliente)
         await self.db.delete(sesion)
+        await self.db.flush()
+        await self.produccion_repo.refrescar_particiones([particion])
         await self.db.commit()
         return True
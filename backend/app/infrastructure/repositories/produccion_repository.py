@@ -0,0 +1,198 @@
+"""
+Repositorio de analítica de producción de ovocitos
+
+Las consultas de rendimiento leen la tabla resumen_produccion_opu, que se
+mantiene incrementalmente: cada cambio en una sesión OPU recalcula solo su
+partición (fecha, cliente) con un INSERT ... SELECT ... GROUP BY.
+"""
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import Donadora, ExtraccionDonadora, ResumenProduccionOPU, SesionOPU
+from ..database.sql_utils import expr_mes
+
+
+AGRUPACIONES = ("donadora", "toro", "tecnico", "hacienda", "mes")
+
+METRICAS = ("extracciones", "grado_1", "grado_2", "grado_3", "desnudos", "irregular", "total_ovocitos")
+
+DIMENSIONES = (
+    "fecha",
+    "cliente",
+    "hacienda",
+    "tecnico_opu",
+    "donadora_id",
+    "toro_a",
+    "toro_b",
+)
+
+
+class ProduccionRepository:
+    """Agregados de rendimiento OPU por donadora, toro, técnico, hacienda o mes"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _select_agregado(self):
+        """SELECT agregado de extracciones con las dimensiones del resumen"""
+        ext = ExtraccionDonadora
+        total = ext.grado_1 + ext.grado_2 + ext.grado_3 + ext.desnudos + ext.irregular
+        return (
+            select(
+                SesionOPU.fecha,
+                SesionOPU.cliente,
+                SesionOPU.hacienda,
+                SesionOPU.tecnico_opu,
+                ext.donadora_id,
+                ext.toro_a,
+                ext.toro_b,
+                func.count(ext.id),
+                func.sum(ext.grado_1),
+                func.sum(ext.grado_2),
+                func.sum(ext.grado_3),
+                func.sum(ext.desnudos),
+                func.sum(ext.irregular),
+                func.sum(total),
+            )
+            .join(SesionOPU, SesionOPU.id == ext.sesion_opu_id)
+            .group_by(
+                SesionOPU.fecha,
+                SesionOPU.cliente,
+                SesionOPU.hacienda,
+                SesionOPU.tecnico_opu,
+                ext.donadora_id,
+                ext.toro_a,
+                ext.toro_b,
+            )
+        )
+
+    async def refrescar_particiones(self, particiones: Iterable[Tuple[date, str]]):
+        """
+        Recalcular el resumen de las particiones (fecha, cliente) indicadas
+
+        Se ejecuta dentro de la transacción del llamador (no hace commit), de
+        modo que el resumen queda consistente con la escritura de la sesión.
+        """
+        particiones = {(fecha, cliente) for fecha, cliente in particiones if fecha and cliente}
+        if not particiones:
+            return
+
+        filtro_resumen = or_(*[
+            and_(ResumenProduccionOPU.fecha == fecha, ResumenProduccionOPU.cliente == cliente)
+            for fecha, cliente in particiones
+        ])
+        filtro_sesion = or_(*[
+            and_(SesionOPU.fecha == fecha, SesionOPU.cliente == cliente)
+            for fecha, cliente in particiones
+        ])
+
+        await self.db.execute(delete(ResumenProduccionOPU).where(filtro_resumen))
+        await self.db.execute(
+            insert(ResumenProduccionOPU).from_select(
+                [*DIMENSIONES, *METRICAS],
+                self._select_agregado().where(filtro_sesion),
+            )
+        )
+
+    async def reconstruir(self) -> int:
+        """Reconstruir el resumen completo (backfill o reparación)"""
+        await self.db.execute(delete(ResumenProduccionOPU))
+        await self.db.execute(
+            insert(ResumenProduccionOPU).from_select(
+                [*DIMENSIONES, *METRICAS],
+                self._select_agregado(),
+            )
+        )
+        await self.db.commit()
+
+        result = await self.db.execute(select(func.count(ResumenProduccionOPU.id)))
+        return result.scalar()
+
+    def _filtros(self, tabla, desde: Optional[date], hasta: Optional[date], cliente: Optional[str]):
+        filtros = []
+        if desde:
+            filtros.append(tabla.c.fecha >= desde)
+        if hasta:
+            filtros.append(tabla.c.fecha <= hasta)
+        if cliente:
+            filtros.append(tabla.c.cliente == cliente)
+        return filtros
+
+    async def rendimiento(
+        self,
+        agrupar: str,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        cliente: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rendimiento de ovocitos agrupado por una dimensión
+
+        Args:
+            agrupar: donadora | toro | tecnico | hacienda | mes
+            desde/hasta: Rango de fechas de sesión (inclusive)
+            cliente: Filtrar por cliente
+
+        Returns:
+            Lista de {clave, etiqueta, extracciones, grado_1..., total_ovocitos, promedio_ovocitos}
+        """
+        if agrupar not in AGRUPACIONES:
+            raise ValueError(f"Agrupación no soportada: {agrupar}")
+
+        resumen = ResumenProduccionOPU.__table__
+        metricas = [resumen.c[m] for m in METRICAS]
+
+        if agrupar == "toro":
+            # Cada extracción cuenta para los dos toros asignados (una vez si son el mismo)
+            por_toro_a = select(resumen.c.toro_a.label("clave"), *metricas).where(resumen.c.toro_a.isnot(None))
+            por_toro_b = select(resumen.c.toro_b.label("clave"), *metricas).where(
+                resumen.c.toro_b.isnot(None),
+                or_(resumen.c.toro_a.is_(None), resumen.c.toro_b != resumen.c.toro_a),
+            )
+            filtros = self._filtros(resumen, desde, hasta, cliente)
+            fuente = union_all(por_toro_a.where(*filtros), por_toro_b.where(*filtros)).subquery()
+            clave = fuente.c.clave
+            etiqueta = fuente.c.clave
+            stmt = select(
+                clave.label("clave"),
+                etiqueta.label("etiqueta"),
+                *[func.sum(fuente.c[m]).label(m) for m in METRICAS],
+            ).group_by(clave)
+        else:
+            if agrupar == "donadora":
+                clave = resumen.c.donadora_id
+                etiqueta = Donadora.nombre
+            elif agrupar == "tecnico":
+                clave = etiqueta = resumen.c.tecnico_opu
+            elif agrupar == "hacienda":
+                clave = etiqueta = resumen.c.hacienda
+            else:
+                clave = etiqueta = expr_mes(resumen.c.fecha, self.db.bind.dialect.name)
+
+            stmt = select(
+                clave.label("clave"),
+                etiqueta.label("etiqueta"),
+                *[func.sum(resumen.c[m]).label(m) for m in METRICAS],
+            ).where(*self._filtros(resumen, desde, hasta, cliente))
+
+            if agrupar == "donadora":
+                stmt = stmt.join(Donadora, Donadora.id == resumen.c.donadora_id).group_by(clave, etiqueta)
+            else:
+                stmt = stmt.group_by(clave)
+
+        stmt = stmt.order_by(literal_column("total_ovocitos").desc())
+        result = await self.db.execute(stmt)
+
+        filas = []
+        for row in result.mappings():
+            fila = {m: row[m] or 0 for m in METRICAS}
+            fila["clave"] = None if row["clave"] is None else str(row["clave"])
+            fila["etiqueta"] = row["etiqueta"]
+            fila["promedio_ovocitos"] = (
+                round(fila["total_ovocitos"] / fila["extracciones"], 2) if fila["extracciones"] else 0.0
+            )
+            filas.append(fila)
+        return filas
@@ -0,0 +1,59 @@
+"""
+Repositorio del registro de cambios y de las mutaciones offline (/sync)
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import MutacionSync, RegistroCambio
+
+
+class SyncRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def limites_cursor(self) -> Tuple[Optional[int], int]:
+        """(primer id retenido o None si el registro está vacío, último id o 0)"""
+        result = await self.db.execute(select(func.min(RegistroCambio.id), func.max(RegistroCambio.id)))
+        minimo, maximo = result.one()
+        return minimo, maximo or 0
+
+    async def cambios_desde(
+        self, desde: int, limite: int, tablas: Optional[Iterable[str]] = None
+    ) -> List[RegistroCambio]:
+        """Cambios con id > desde en orden de secuencia (recorrido por clave primaria)"""
+        stmt = select(RegistroCambio).where(RegistroCambio.id > desde)
+        if tablas is not None:
+            stmt = stmt.where(RegistroCambio.tabla.in_(list(tablas)))
+        result = await self.db.execute(stmt.order_by(RegistroCambio.id).limit(limite))
+        return result.scalars().all()
+
+    async def get_mutacion(self, usuario_id: int, mutacion_id: str) -> Optional[MutacionSync]:
+        result = await self.db.execute(
+            select(MutacionSync).where(
+                MutacionSync.usuario_id == usuario_id,
+                MutacionSync.mutacion_id == mutacion_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def purgar(self, retencion_dias: int, ahora: Optional[datetime] = None) -> int:
+        """
+        Eliminar cambios y mutaciones más viejos que la retención
+
+        Se conserva siempre el último cambio para poder distinguir un cursor
+        vencido de uno al día.
+
+        Returns:
+            Número de filas eliminadas
+        """
+        limite = (ahora or datetime.now(timezone.utc)) - timedelta(days=retencion_dias)
+        ultimo = select(func.max(RegistroCambio.id)).scalar_subquery()
+        cambios = await self.db.execute(
+            delete(RegistroCambio).where(and_(RegistroCambio.fecha < limite, RegistroCambio.id < ultimo))
+        )
+        mutaciones = await self.db.execute(delete(MutacionSync).where(MutacionSync.fecha_creacion < limite))
+        await self.db.commit()
+        return cambios.rowcount + mutaciones.rowcount
@@ -3,18 +3,28 @@ Aplicacion principal FastAPI
 Sistema de Gestion de Embriones Bovinos
 """
 from contextlib import asynccontextmanager
+import os
 import time
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .application.services.draft_buffer import draft_buffer
+from .application.services.draft_retention import purgador_drafts
+from .core import metrics
+from .core.cache import registrar_invalidacion
 from .core.config import settings
-from .core.dependencies import get_db
-from .infrastructure.database.connection import close_db, init_db
+from .core.dependencies import get_current_active_admin, get_db
+from .infrastructure.database.connection import close_db, engine, init_db, pool_stats, resolver_pool
 from .presentation.api.v1.router import api_router
+from .presentation.middleware.compresion import CompresionMiddleware
+from .presentation.middleware.idempotencia import IdempotenciaMiddleware
+from .presentation.middleware.metrics import MetricsMiddleware
+from .presentation.middleware.sql_metrics import SQLMetricsMiddleware
 
 
 @asynccontextmanager
@@ -26,13 +36,21 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     print("[*] Iniciando aplicacion...")
+    # Directorios de archivos locales (antes se creaban al importar el modulo)
+    for subdirectorio in ("donadoras", "microscopicas"):
+        os.makedirs(os.path.join(settings.UPLOAD_DIR, subdirectorio), exist_ok=True)
     await init_db()
     print("[OK] Base de datos inicializada")
+    registrar_invalidacion()
+    draft_buffer.iniciar()
+    purgador_drafts.iniciar()
 
     yield
 
     # Shutdown
     print("[*] Cerrando aplicacion...")
+    await purgador_drafts.detener()
+    await draft_buffer.detener()
     await close_db()
     print("[OK] Conexiones cerradas")
 
@@ -43,8 +61,27 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="API REST para gestion de transferencia de embriones bovinos",
     lifespan=lifespan,
+    # Serialización con orjson para las respuestas que pasan por response_model
+    default_response_class=ORJSONResponse,
 )
 
+# Idempotency-Key en escrituras; el más interno: guarda la respuesta sin
+# comprimir ni cabeceras CORS/Server-Timing, que se agregan en cada envío
+if settings.IDEMPOTENCIA_HABILITADA:
+    app.add_middleware(IdempotenciaMiddleware)
+
+# Métricas SQL por request (Server-Timing + log estructurado)
+app.add_middleware(SQLMetricsMiddleware)
+
+# Métricas Prometheus (requests, latencia, pool de conexiones)
+if settings.METRICS_ENABLED:
+    metrics.registrar_pool(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Compresión gzip/brotli (negociada con Accept-Encoding)
+if settings.COMPRESION_HABILITADA:
+    app.add_middleware(CompresionMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -55,16 +92,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Montar archivos estaticos (uploads)
-try:
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-except RuntimeError:
-    # Si el directorio no existe, crear
-    import os
-
-    os.makedirs("uploads/donadoras", exist_ok=True)
-    os.makedirs("uploads/microscopicas", exist_ok=True)
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Montar archivos estaticos (uploads); el directorio se crea en el startup
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Incluir rutas de la API
 app.include_router(api_router, prefix="/api/v1")
@@ -93,3 +122,27 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         "database": "ok" if db_ok else "error",
         "latency_ms": latency_ms,
     }
+
+
+@app.get("/health/pool")
+async def health_pool():
+    """Contadores del pool de conexiones."""
+    return pool_stats(engine)
+
+
+@app.get("/health/pool/configuracion")
+async def health_pool_configuracion(admin=Depends(get_current_active_admin)):
+    """Parametros efectivos del pool (solo administradores)."""
+    return {
+        "dialecto": engine.dialect.name,
+        "configuracion": resolver_pool(),
+        "pgbouncer": settings.DB_PGBOUNCER,
+    }
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        """Metricas en formato de texto Prometheus."""
+        return Response(content=metrics.registro.exponer(), media_type=metrics.CONTENT_TYPE)
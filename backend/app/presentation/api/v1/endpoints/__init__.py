@@ -1,7 +1,7 @@
 """
 Endpoints de la API
 """
-from . import auth, donadoras, drafts, opu, fecundacion, transferencia, gfe, fotos, sesion_transferencia
+from . import auth, donadoras, drafts, opu, fecundacion, transferencia, gfe, fotos, sesion_transferencia, analitica, reportes, dashboard
 
 __all__ = [
     "auth",
@@ -12,5 +12,8 @@ __all__ = [
     "transferencia",
     "sesion_transferencia",
     "gfe",
-    "fotos"
+    "fotos",
+    "analitica",
+    "reportes",
+    "dashboard"
 ]
@@ -0,0 +1,50 @@
+"""
+Endpoints de analítica de producción OPU
+"""
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_db, get_read_db, get_current_user, get_current_active_admin
+from app.core.etag import condicional
+from app.infrastructure.repositories.produccion_repository import AGRUPACIONES, ProduccionRepository
+from app.application.schemas.analitica_schema import ReconstruccionResumen, RendimientoProduccion
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/produccion", response_model=List[RendimientoProduccion],
+    dependencies=[Depends(condicional("resumen_produccion_opu", "donadoras"))],
+)
+async def get_rendimiento_produccion(
+    agrupar: str = Query("donadora", description="donadora | toro | tecnico | hacienda | mes"),
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    cliente: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Rendimiento de ovocitos agregado en SQL por la dimensión indicada"""
+    if agrupar not in AGRUPACIONES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"agrupar debe ser uno de: {', '.join(AGRUPACIONES)}"
+        )
+
+    repo = ProduccionRepository(db)
+    return await repo.rendimiento(agrupar, desde, hasta, cliente)
+
+
+@router.post("/produccion/reconstruir", response_model=ReconstruccionResumen)
+async def reconstruir_resumen_produccion(
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_active_admin)
+):
+    """Reconstruir el resumen de producción desde las extracciones (solo administradores)"""
+    repo = ProduccionRepository(db)
+    filas = await repo.reconstruir()
+    return {"filas": filas}
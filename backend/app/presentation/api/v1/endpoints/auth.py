@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db, get_current_user, get_current_active_admin
+from app.core.dependencies import get_db, get_read_db, get_current_user, get_current_active_admin
 from app.core.security import verify_password, get_password_hash, create_access_token
 from app.infrastructure.repositories.usuario_repository import UsuarioRepository
 from app.infrastructure.database.models import Usuario
@@ -108,7 +108,7 @@ async def get_current_user_info(current_user: Usuario = Depends(get_current_user
 
 @router.get("/users", response_model=list[UsuarioResponse])
 async def get_all_users(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     admin = Depends(get_current_active_admin)
 ):
     """Obtener todos los usuarios (solo administradores)"""
@@ -0,0 +1,59 @@
+"""
+Endpoint de resumen para el Dashboard
+"""
+from datetime import date
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_respuestas
+from app.core.config import settings
+from app.core.dependencies import get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.serializacion import respuesta_json
+from app.infrastructure.repositories.dashboard_repository import DashboardRepository
+from app.application.schemas.dashboard_schema import DashboardSummary
+
+
+router = APIRouter()
+
+# Tablas cuyas escrituras cambian el resumen
+TABLAS_DASHBOARD = {
+    "donadoras",
+    "sesiones_opu",
+    "extraccion_donadoras",
+    "transferencias_realizadas",
+    "chequeos_gfe",
+}
+ETIQUETAS_DASHBOARD = [f"{tabla}:*" for tabla in sorted(TABLAS_DASHBOARD)]
+
+
+@router.get(
+    "/summary", response_model=DashboardSummary,
+    dependencies=[Depends(condicional(*TABLAS_DASHBOARD))],
+)
+async def get_dashboard_summary(
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Contadores, sesiones recientes y chequeos GFE pendientes
+
+    Se cachea unos segundos y se invalida al confirmar escrituras relevantes.
+    """
+    hoy = date.today()
+    repo = DashboardRepository(db)
+
+    async def calcular():
+        return DashboardSummary.model_validate({
+            "contadores": await repo.get_contadores(hoy),
+            "sesiones_recientes": await repo.get_sesiones_recientes(),
+            "gfe_pendientes": await repo.get_gfe_pendientes(),
+        })
+
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "dashboard.summary", {"hoy": hoy}, ETIQUETAS_DASHBOARD, calcular,
+        ttl=settings.DASHBOARD_CACHE_TTL,
+        validador=response.headers.get("etag"),
+    ), response)
@@ -1,7 +1,7 @@
 """
 Endpoints para gestión de donadoras
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -10,17 +10,23 @@ import csv
 import io
 
 from app.core.config import settings
-from app.core.dependencies import get_db, get_current_user
+from app.core.cache import cache_respuestas
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.serializacion import respuesta_json
 from app.core.cloudinary_service import upload_image, delete_image
 from app.infrastructure.repositories.donadora_repository import DonadoraRepository
 from app.infrastructure.database.models import Donadora
 from app.application.schemas.donadora_schema import (
-    DonadoraCreate, DonadoraResponse, DonadoraUpdate
+    DonadoraCreate, DonadoraListResponse, DonadoraResponse, DonadoraUpdate
 )
 
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_DONADORAS = ("donadoras",)
+
 
 def _parse_fecha(fecha_str: Optional[str]):
     """Convertir string ISO a date o None"""
@@ -48,13 +54,19 @@ async def create_donadora(
     notas: Optional[str] = Form(None),
     foto: Optional[UploadFile] = File(None),
     db: AsyncSession = Depends(get_db),
+    db_lectura: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Crear nueva donadora con foto opcional"""
+    """
+    Crear nueva donadora con foto opcional
+
+    Las validaciones usan la sesión de lectura y la foto se sube antes de
+    tocar la de escritura, que no queda retenida durante la subida.
+    """
     repo = DonadoraRepository(db)
 
     # Verificar que no exista el número de registro
-    existing = await repo.get_by_numero_registro(numero_registro)
+    existing = await DonadoraRepository(db_lectura).get_by_numero_registro(numero_registro)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -92,21 +104,24 @@ async def create_donadora(
     return created
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[Depends(condicional(*TABLAS_DONADORAS))])
 async def get_donadoras_statistics(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Obtener estadísticas de donadoras"""
     repo = DonadoraRepository(db)
-    stats = await repo.get_statistics()
-    return stats
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "donadoras.stats", None, ["donadoras:*"], repo.get_statistics,
+        validador=response.headers.get("etag"),
+    ), response)
 
 
 @router.get("/export/csv")
 async def export_donadoras_csv(
     activo: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Exportar todas las donadoras a CSV"""
@@ -161,8 +176,12 @@ async def export_donadoras_csv(
     )
 
 
-@router.get("/")
+@router.get(
+    "/", response_model=DonadoraListResponse,
+    dependencies=[Depends(condicional(*TABLAS_DONADORAS))],
+)
 async def get_donadoras(
+    response: Response,
     skip: int = 0,
     limit: int = 30,
     activo: Optional[bool] = None,
@@ -170,7 +189,7 @@ async def get_donadoras(
     tipo_ganado: Optional[str] = None,
     propietario_nombre: Optional[str] = None,
     q: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
@@ -178,47 +197,62 @@ async def get_donadoras(
     Retorna: { donadoras: [...], total: int, page: int, limit: int }
     """
     repo = DonadoraRepository(db)
+    filtros = {
+        "activo": activo,
+        "raza": raza,
+        "tipo_ganado": tipo_ganado,
+        "propietario_nombre": propietario_nombre,
+    }
 
-    # Usar filtros avanzados
-    donadoras, total = await repo.get_with_filters(
-        skip=skip,
-        limit=limit,
-        activo=activo,
-        raza=raza,
-        tipo_ganado=tipo_ganado,
-        propietario_nombre=propietario_nombre,
-        search_query=q
-    )
+    async def calcular():
+        # Usar filtros avanzados
+        donadoras, total = await repo.get_with_filters(
+            skip=skip, limit=limit, search_query=q, **filtros
+        )
 
-    # Convertir a esquemas Pydantic
-    donadoras_response = [DonadoraResponse.model_validate(d) for d in donadoras]
+        # Una sola validación (filas ORM incluidas) y volcado directo a JSON
+        return DonadoraListResponse.model_validate({
+            "donadoras": donadoras,
+            "total": total,
+            "page": skip // limit + 1 if limit > 0 else 1,
+            "limit": limit,
+            "total_pages": (total + limit - 1) // limit if limit > 0 else 1
+        })
 
-    return {
-        "donadoras": donadoras_response,
-        "total": total,
-        "page": skip // limit + 1 if limit > 0 else 1,
-        "limit": limit,
-        "total_pages": (total + limit - 1) // limit if limit > 0 else 1
-    }
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "donadoras.listado", {"skip": skip, "limit": limit, "q": q, **filtros}, ["donadoras:*"], calcular,
+        validador=response.headers.get("etag"),
+    ), response)
 
 
-@router.get("/{id}", response_model=DonadoraResponse)
+@router.get(
+    "/{id}", response_model=DonadoraResponse,
+    dependencies=[Depends(condicional(*TABLAS_DONADORAS))],
+)
 async def get_donadora(
     id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Obtener una donadora por ID"""
     repo = DonadoraRepository(db)
-    donadora = await repo.get_by_id(id)
 
-    if not donadora:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Donadora no encontrada"
-        )
+    async def calcular():
+        donadora = await repo.get_by_id(id)
 
-    return donadora
+        if not donadora:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Donadora no encontrada"
+            )
+
+        return DonadoraResponse.model_validate(donadora)
+
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "donadoras.detalle", {"id": id}, [f"donadoras:{id}"], calcular,
+        validador=response.headers.get("etag"),
+    ), response)
 
 
 @router.put("/{id}", response_model=DonadoraResponse)
@@ -236,12 +270,14 @@ async def update_donadora(
     activo: Optional[bool] = Form(None),
     foto: Optional[UploadFile] = File(None),
     db: AsyncSession = Depends(get_db),
+    db_lectura: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Actualizar donadora con foto opcional"""
+    """Actualizar donadora con foto opcional (como en la creación, Cloudinary antes del escritor)"""
     repo = DonadoraRepository(db)
+    repo_lectura = DonadoraRepository(db_lectura)
 
-    donadora = await repo.get_by_id(id)
+    donadora = await repo_lectura.get_by_id(id)
     if not donadora:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -255,7 +291,7 @@ async def update_donadora(
     if numero_registro is not None:
         # Solo validar/actualizar si cambia el número de registro
         if numero_registro != donadora.numero_registro:
-            existing = await repo.get_by_numero_registro(numero_registro)
+            existing = await repo_lectura.get_by_numero_registro(numero_registro)
             if existing and existing.id != id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,21 +1,33 @@
 """
 Endpoints para gestión de drafts (autosave)
 """
+import dataclasses
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core.dependencies import get_db, get_current_user
-from app.infrastructure.repositories.draft_repository import DraftRepository
-from app.infrastructure.database.models import Draft
+from app.application.services.draft_buffer import DraftPendiente, draft_buffer
+from app.core.config import settings
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.json_patch import JsonPatchError, aplicar_patch
+from app.infrastructure.repositories.draft_repository import ConflictoVersionDraft, DraftRepository
 from app.application.schemas.draft_schema import (
-    DraftCreate, DraftResponse, DraftUpdate
+    DraftCreate, DraftPatchRequest, DraftPatchResponse,
+    DraftResponse, DraftUpdate
 )
 
 
 router = APIRouter()
 
 
+def _conflicto(version_actual: Optional[int]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"mensaje": "El draft cambió; reenviar el documento completo", "version": version_actual}
+    )
+
+
 @router.post("/", response_model=DraftResponse, status_code=status.HTTP_201_CREATED)
 async def create_or_update_draft(
     draft_data: DraftCreate,
@@ -25,41 +37,27 @@ async def create_or_update_draft(
     """
     Crear o actualizar draft (autosave)
 
-    Si ya existe un draft para el mismo módulo/tipo/registro, lo actualiza
+    Upsert sobre el draft activo del mismo módulo/tipo/registro; los
+    formularios nuevos (sin registro_id) reutilizan su único draft activo
     """
     repo = DraftRepository(db)
-
-    # Buscar draft existente
-    existing = None
-    if draft_data.registro_id:
-        existing = await repo.get_draft_by_registro(
-            current_user.id,
-            draft_data.modulo,
-            draft_data.registro_id
-        )
-
-    if existing:
-        # Actualizar existente
-        updated = await repo.update(existing.id, {"datos_json": draft_data.datos_json})
-        return updated
-    else:
-        # Crear nuevo
-        draft = Draft(
-            usuario_id=current_user.id,
-            modulo=draft_data.modulo,
-            tipo_registro=draft_data.tipo_registro,
-            registro_id=draft_data.registro_id,
-            datos_json=draft_data.datos_json
-        )
-        created = await repo.create(draft)
-        return created
+    draft = await repo.upsert(
+        current_user.id,
+        draft_data.modulo,
+        draft_data.tipo_registro,
+        draft_data.registro_id,
+        draft_data.datos_json,
+    )
+    # El documento completo reemplaza a los patches que hubiera en memoria
+    draft_buffer.descartar(draft.id)
+    return draft
 
 
 @router.get("/", response_model=list[DraftResponse])
 async def get_user_drafts(
     modulo: Optional[str] = None,
     tipo_registro: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Obtener drafts del usuario actual"""
@@ -86,7 +84,86 @@ async def get_user_drafts(
         )
         drafts = result.scalars().all()
 
-    return drafts
+    # Aplicar los patches aún no compactados y lo que siga en el buffer
+    pendientes = await repo.patches_pendientes(drafts)
+    respuesta = []
+    for draft in drafts:
+        item = DraftResponse.model_validate(draft)
+        en_memoria = draft_buffer.obtener(draft.id)
+        if en_memoria is not None:
+            item.datos_json, item.version = en_memoria.documento, en_memoria.version
+        elif draft.id in pendientes:
+            item.datos_json = await repo.materializar(draft, pendientes[draft.id])
+        respuesta.append(item)
+    return respuesta
+
+
+@router.patch("/{draft_id}", response_model=DraftPatchResponse)
+async def patch_draft(
+    draft_id: int,
+    patch: DraftPatchRequest,
+    db: AsyncSession = Depends(get_db),
+    db_lectura: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Aplicar cambios incrementales (JSON Patch) a un draft
+
+    El patch debe calcularse sobre version_base; si el draft cambió desde
+    entonces responde 409 con la versión actual y el cliente reenvía el
+    documento completo con POST /drafts/
+
+    Con el buffer activo el patch se aplica en memoria y no se escribe
+    nada: la sesión de escritura ni siquiera toma conexión (ver
+    services/draft_buffer.py)
+    """
+    pendiente = draft_buffer.obtener(draft_id) if draft_buffer.activo else None
+    if pendiente is None:
+        repo = DraftRepository(db_lectura if draft_buffer.activo else db)
+        draft = await repo.get_by_id(draft_id)
+        if not draft or draft.estado != "draft":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Draft no encontrado"
+            )
+        usuario_id = draft.usuario_id
+    else:
+        usuario_id = pendiente.usuario_id
+
+    if usuario_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para modificar este draft"
+        )
+
+    try:
+        if not draft_buffer.activo:
+            version = await repo.apply_patch(
+                draft, patch.version_base, patch.operaciones, settings.DRAFT_SNAPSHOT_CADA
+            )
+            return DraftPatchResponse(id=draft_id, version=version)
+
+        if pendiente is None:
+            pendiente = DraftPendiente(
+                usuario_id=usuario_id,
+                version_bd=draft.version,
+                version=draft.version,
+                documento=await repo.materializar(draft),
+            )
+        if pendiente.version != patch.version_base:
+            raise ConflictoVersionDraft(pendiente.version)
+        documento = aplicar_patch(pendiente.documento, patch.operaciones)
+    except ConflictoVersionDraft as e:
+        raise _conflicto(e.version_actual)
+    except JsonPatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+    version = pendiente.version + 1
+    draft_buffer.encolar(draft_id, dataclasses.replace(pendiente, version=version, documento=documento))
+    return DraftPatchResponse(id=draft_id, version=version)
 
 
 @router.delete("/{draft_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -112,6 +189,7 @@ async def delete_draft(
             detail="No tienes permiso para eliminar este draft"
         )
 
+    draft_buffer.descartar(draft_id)
     await repo.delete(draft_id)
 
 
@@ -137,4 +215,7 @@ async def mark_draft_as_completed(
             detail="No tienes permiso para modificar este draft"
         )
 
+    # Lo último que quedó en memoria forma parte del draft completado
+    if await draft_buffer.flush([draft_id], db):
+        await db.refresh(draft)
     await repo.mark_as_completed(draft_id)
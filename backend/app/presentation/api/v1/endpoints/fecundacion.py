@@ -1,11 +1,13 @@
 """
 Endpoints para gestión de fecundación (IVF)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.serializacion import lista_json, respuesta_json
 from app.infrastructure.database.models import Fecundacion
 from app.infrastructure.repositories.fecundacion_repository import FecundacionRepository
 from app.application.schemas.fecundacion_schema import (
@@ -17,6 +19,9 @@ from app.application.schemas.fecundacion_schema import (
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_FECUNDACIONES = ("fecundaciones",)
+
 
 @router.post("/", response_model=FecundacionResponse, status_code=status.HTTP_201_CREATED)
 async def create_fecundacion(
@@ -35,25 +40,34 @@ async def create_fecundacion(
     return created
 
 
-@router.get("/", response_model=List[FecundacionResponse])
+@router.get(
+    "/", response_model=List[FecundacionResponse],
+    dependencies=[Depends(condicional(*TABLAS_FECUNDACIONES))],
+)
 async def list_fecundaciones(
+    response: Response,
     donadora_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Listar fecundaciones (filtrable por donadora)"""
     repo = FecundacionRepository(db)
     if donadora_id:
-        return await repo.get_by_donadora(donadora_id)
-    return await repo.get_all(skip, limit)
+        fecundaciones = await repo.get_by_donadora(donadora_id)
+    else:
+        fecundaciones = await repo.get_all(skip, limit)
+    return respuesta_json(lista_json(FecundacionResponse, fecundaciones), response)
 
 
-@router.get("/{fecundacion_id}", response_model=FecundacionResponse)
+@router.get(
+    "/{fecundacion_id}", response_model=FecundacionResponse,
+    dependencies=[Depends(condicional(*TABLAS_FECUNDACIONES))],
+)
 async def get_fecundacion(
     fecundacion_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = FecundacionRepository(db)
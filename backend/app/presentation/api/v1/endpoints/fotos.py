@@ -1,12 +1,15 @@
 """
 Endpoints para gestión de fotos múltiples
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from typing import Optional
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.cache import cache_respuestas
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.serializacion import respuesta_json
 from app.core.cloudinary_service import upload_image, delete_image
 from app.infrastructure.database.models import Foto
 from app.application.schemas.foto_schema import FotoResponse, FotosResponse
@@ -14,6 +17,9 @@ from app.application.schemas.foto_schema import FotoResponse, FotosResponse
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_FOTOS = ("fotos",)
+
 
 @router.post("/", response_model=FotoResponse, status_code=status.HTTP_201_CREATED)
 async def upload_foto(
@@ -23,12 +29,19 @@ async def upload_foto(
     descripcion: Optional[str] = Form(None),
     archivo: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
+    db_lectura: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Subir una foto para una entidad"""
+    """
+    Subir una foto para una entidad
+
+    La validación se lee con la sesión de lectura y la subida a Cloudinary
+    ocurre antes de tocar la sesión de escritura: así la conexión del
+    escritor no queda retenida mientras dura la subida.
+    """
 
     # Validar que no exceda el máximo de 6 fotos
-    result = await db.execute(
+    result = await db_lectura.execute(
         select(Foto).where(
             Foto.entidad_tipo == entidad_tipo,
             Foto.entidad_id == entidad_id
@@ -65,40 +78,51 @@ async def upload_foto(
     return foto
 
 
-@router.get("/{entidad_tipo}/{entidad_id}", response_model=FotosResponse)
+@router.get(
+    "/{entidad_tipo}/{entidad_id}", response_model=FotosResponse,
+    dependencies=[Depends(condicional(*TABLAS_FOTOS))],
+)
 async def get_fotos(
     entidad_tipo: str,
     entidad_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Obtener todas las fotos de una entidad"""
-    result = await db.execute(
-        select(Foto)
-        .where(
-            Foto.entidad_tipo == entidad_tipo,
-            Foto.entidad_id == entidad_id
+    async def calcular():
+        result = await db.execute(
+            select(Foto)
+            .where(
+                Foto.entidad_tipo == entidad_tipo,
+                Foto.entidad_id == entidad_id
+            )
+            .order_by(Foto.orden, Foto.fecha_creacion)
         )
-        .order_by(Foto.orden, Foto.fecha_creacion)
-    )
-    fotos = result.scalars().all()
+        fotos = result.scalars().all()
+
+        return FotosResponse.model_validate({
+            "entidad_tipo": entidad_tipo,
+            "entidad_id": entidad_id,
+            "fotos": fotos,
+            "total": len(fotos)
+        })
 
-    return {
-        "entidad_tipo": entidad_tipo,
-        "entidad_id": entidad_id,
-        "fotos": fotos,
-        "total": len(fotos)
-    }
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "fotos.entidad", {"entidad_tipo": entidad_tipo, "entidad_id": entidad_id}, ["fotos:*"], calcular,
+        validador=response.headers.get("etag"),
+    ), response)
 
 
 @router.delete("/{foto_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_foto(
     foto_id: int,
     db: AsyncSession = Depends(get_db),
+    db_lectura: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Eliminar una foto"""
-    result = await db.execute(
+    """Eliminar una foto (Cloudinary primero, sin retener el escritor)"""
+    result = await db_lectura.execute(
         select(Foto).where(Foto.id == foto_id)
     )
     foto = result.scalar_one_or_none()
@@ -113,7 +137,7 @@ async def delete_foto(
     await delete_image(foto.public_id)
 
     # Eliminar de BD
-    await db.delete(foto)
+    await db.execute(delete(Foto).where(Foto.id == foto_id))
     await db.commit()
 
 
@@ -122,10 +146,11 @@ async def delete_all_fotos(
     entidad_tipo: str,
     entidad_id: int,
     db: AsyncSession = Depends(get_db),
+    db_lectura: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Eliminar todas las fotos de una entidad"""
-    result = await db.execute(
+    """Eliminar todas las fotos de una entidad (Cloudinary primero, sin retener el escritor)"""
+    result = await db_lectura.execute(
         select(Foto).where(
             Foto.entidad_tipo == entidad_tipo,
             Foto.entidad_id == entidad_id
@@ -1,18 +1,24 @@
 """
 Endpoints para chequeos GFE
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.serializacion import lista_json, respuesta_json
 from app.infrastructure.database.models import ChequeoGFE
-from app.infrastructure.repositories.gfe_repository import GFERepository
-from app.application.schemas.gfe_schema import GFECreate, GFEResponse, GFEUpdate
+from app.infrastructure.repositories.gfe_repository import AGRUPACIONES_TASA, GFERepository
+from app.application.schemas.gfe_schema import GFECreate, GFEResponse, GFEUpdate, TasaPrenez
 
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_GFE = ("chequeos_gfe",)
+
 
 @router.post("/", response_model=GFEResponse, status_code=status.HTTP_201_CREATED)
 async def create_gfe(
@@ -26,24 +32,52 @@ async def create_gfe(
     return created
 
 
-@router.get("/", response_model=List[GFEResponse])
+@router.get("/", response_model=List[GFEResponse], dependencies=[Depends(condicional(*TABLAS_GFE))])
 async def list_gfe(
+    response: Response,
     receptora: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = GFERepository(db)
     if receptora:
-        return await repo.get_by_receptora(receptora)
-    return await repo.get_all(skip, limit)
+        chequeos = await repo.get_by_receptora(receptora)
+    else:
+        chequeos = await repo.get_all(skip, limit)
+    return respuesta_json(lista_json(GFEResponse, chequeos), response)
+
 
+@router.get(
+    "/tasas", response_model=List[TasaPrenez],
+    dependencies=[Depends(condicional("chequeos_gfe", "transferencias_realizadas"))],
+)
+async def get_tasas_prenez(
+    agrupar: str = Query("mes", description="tecnico | cliente | hacienda | mes | toro | finalidad"),
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Tasa de preñez agrupada, calculada en una sola consulta"""
+    if agrupar not in AGRUPACIONES_TASA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"agrupar debe ser uno de: {', '.join(AGRUPACIONES_TASA)}"
+        )
 
-@router.get("/{gfe_id}", response_model=GFEResponse)
+    repo = GFERepository(db)
+    return await repo.get_tasas_prenez(agrupar, desde, hasta)
+
+
+@router.get(
+    "/{gfe_id}", response_model=GFEResponse,
+    dependencies=[Depends(condicional(*TABLAS_GFE))],
+)
 async def get_gfe(
     gfe_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = GFERepository(db)
@@ -1,21 +1,32 @@
 """
 Endpoints para gestión de sesiones OPU
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.cache import cache_respuestas
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.proyeccion import Proyeccion, proyeccion
+from app.core.serializacion import lista_json, respuesta_json
 from app.infrastructure.repositories.opu_repository import OPURepository
 from app.infrastructure.database.models import SesionOPU
 from app.application.schemas.opu_schema import (
-    SesionOPUCreate, SesionOPUResponse, SesionOPUUpdate
+    SesionOPUCreate, SesionOPUResponse, SesionOPUResumen, SesionOPUUpdate, SesionOPUUpdateResponse
 )
 
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_OPU = ("sesiones_opu", "extraccion_donadoras", "donadoras")
+ETIQUETAS_OPU = [f"{tabla}:*" for tabla in TABLAS_OPU]
+
+# ?fields= / ?include= sobre SesionOPUResponse
+proyeccion_sesion = proyeccion(SesionOPUResponse, "extracciones")
+
 
 @router.post("/", response_model=SesionOPUResponse, status_code=status.HTTP_201_CREATED)
 async def create_sesion_opu(
@@ -38,46 +49,102 @@ async def create_sesion_opu(
     return created
 
 
-@router.get("/", response_model=List[SesionOPUResponse])
+@router.get(
+    "/", response_model=List[SesionOPUResponse],
+    dependencies=[Depends(condicional(*TABLAS_OPU))],
+)
 async def get_sesiones_opu(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    campos: Proyeccion = Depends(proyeccion_sesion),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Obtener sesiones OPU
+
+    `fields`/`include` limitan columnas y colecciones (p. ej. un selector
+    que solo necesita la cabecera no carga las extracciones).
+    """
+    repo = OPURepository(db)
+
+    async def calcular():
+        return lista_json(campos.esquema, await repo.get_all(skip, limit, campos))
+
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "opu.listado", {"skip": skip, "limit": limit, **campos.parametros()}, ETIQUETAS_OPU, calcular,
+        validador=response.headers.get("etag"),
+    ), response)
+
+
+@router.get(
+    "/resumen", response_model=List[SesionOPUResumen],
+    dependencies=[Depends(condicional(*TABLAS_OPU))],
+)
+async def get_resumen_sesiones_opu(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Obtener todas las sesiones OPU"""
+    """Listado liviano de sesiones OPU con totales de donadoras y ovocitos"""
     repo = OPURepository(db)
-    sesiones = await repo.get_all(skip, limit)
-    return sesiones
 
+    async def calcular():
+        return lista_json(SesionOPUResumen, await repo.get_resumenes(skip, limit))
+
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "opu.resumen", {"skip": skip, "limit": limit}, ETIQUETAS_OPU, calcular,
+        validador=response.headers.get("etag"),
+    ), response)
 
-@router.get("/{id}", response_model=SesionOPUResponse)
+
+@router.get(
+    "/{id}", response_model=SesionOPUResponse,
+    dependencies=[Depends(condicional(*TABLAS_OPU))],
+)
 async def get_sesion_opu(
     id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    campos: Proyeccion = Depends(proyeccion_sesion),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Obtener una sesión OPU por ID"""
+    """Obtener una sesión OPU por ID (admite `fields`/`include`)"""
     repo = OPURepository(db)
-    sesion = await repo.get_by_id(id)
 
-    if not sesion:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sesión OPU no encontrada"
-        )
+    async def calcular():
+        sesion = await repo.get_by_id(id, campos)
+
+        if not sesion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sesión OPU no encontrada"
+            )
 
-    return sesion
+        return campos.esquema.model_validate(sesion)
 
+    return respuesta_json(await cache_respuestas.obtener_o_calcular(
+        "opu.detalle", {"id": id, **campos.parametros()}, [f"sesiones_opu:{id}", "extraccion_donadoras:*", "donadoras:*"], calcular,
+        validador=response.headers.get("etag"),
+    ), response)
 
-@router.put("/{id}", response_model=SesionOPUResponse)
+
+@router.put("/{id}", response_model=SesionOPUUpdateResponse)
 async def update_sesion_opu(
     id: int,
     sesion_data: SesionOPUUpdate,
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """Actualizar sesión OPU (reemplaza extracciones si se envían)"""
+    """
+    Actualizar sesión OPU (sincroniza extracciones si se envían)
+
+    La respuesta incluye `cambios` por extracción para que el cliente
+    no tenga que volver a pedir la sesión completa.
+    """
     repo = OPURepository(db)
 
     sesion = await repo.get_by_id(id)
@@ -0,0 +1,47 @@
+"""
+Endpoints de reportes (linaje OPU → fecundación → transferencia → GFE)
+"""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_read_db, get_current_user
+from app.core.etag import condicional
+from app.application.services.linaje_service import LinajeService
+from app.application.schemas.reporte_schema import ReporteLinaje
+
+
+router = APIRouter()
+
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_LINAJE = (
+    "donadoras",
+    "sesiones_opu",
+    "extraccion_donadoras",
+    "fecundaciones",
+    "transferencias_realizadas",
+    "chequeos_gfe",
+)
+
+
+@router.get(
+    "/linaje", response_model=ReporteLinaje,
+    dependencies=[Depends(condicional(*TABLAS_LINAJE))],
+)
+async def get_reporte_linaje(
+    donadora_id: Optional[int] = None,
+    sesion_opu_id: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Linaje embrionario por donadora con tasas de conversión
+
+    Filtrable por donadora, sesión OPU o rango de fechas.
+    """
+    service = LinajeService(db)
+    return await service.reporte(donadora_id, sesion_opu_id, desde, hasta)
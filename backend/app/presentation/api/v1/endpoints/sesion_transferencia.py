@@ -2,10 +2,13 @@
 Endpoints para sesiones de transferencia
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.proyeccion import Proyeccion, proyeccion
+from app.core.serializacion import lista_json, respuesta_json, serializar_json
 from app.infrastructure.database.models import SesionTransferencia
 from app.infrastructure.repositories.sesion_transferencia_repository import SesionTransferenciaRepository
 from app.application.schemas.sesion_transferencia_schema import (
@@ -16,6 +19,12 @@ from app.application.schemas.sesion_transferencia_schema import (
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_SESIONES = ("sesiones_transferencia", "transferencias_realizadas")
+
+# ?fields= / ?include= sobre SesionTransferenciaResponse
+proyeccion_sesion = proyeccion(SesionTransferenciaResponse, "transferencias_realizadas")
+
 
 @router.post("/", response_model=SesionTransferenciaResponse, status_code=status.HTTP_201_CREATED)
 async def create_sesion_transferencia(
@@ -29,28 +38,39 @@ async def create_sesion_transferencia(
     return await repo.get_by_id_with_transferencias(created.id)
 
 
-@router.get("/", response_model=List[SesionTransferenciaResponse])
+@router.get(
+    "/", response_model=List[SesionTransferenciaResponse],
+    dependencies=[Depends(condicional(*TABLAS_SESIONES))],
+)
 async def list_sesiones_transferencia(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    campos: Proyeccion = Depends(proyeccion_sesion),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = SesionTransferenciaRepository(db)
-    return await repo.get_all_with_transferencias(skip, limit)
+    sesiones = await repo.get_all_with_transferencias(skip, limit, campos)
+    return respuesta_json(lista_json(campos.esquema, sesiones), response)
 
 
-@router.get("/{sesion_id}", response_model=SesionTransferenciaResponse)
+@router.get(
+    "/{sesion_id}", response_model=SesionTransferenciaResponse,
+    dependencies=[Depends(condicional(*TABLAS_SESIONES))],
+)
 async def get_sesion_transferencia(
     sesion_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    campos: Proyeccion = Depends(proyeccion_sesion),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = SesionTransferenciaRepository(db)
-    sesion = await repo.get_by_id_with_transferencias(sesion_id)
+    sesion = await repo.get_by_id_with_transferencias(sesion_id, campos)
     if not sesion:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión de transferencia no encontrada")
-    return sesion
+    return respuesta_json(serializar_json(campos.esquema.model_validate(sesion)), response)
 
 
 @router.put("/{sesion_id}", response_model=SesionTransferenciaResponse)
@@ -0,0 +1,73 @@
+"""
+Endpoints de sincronización para clientes offline
+
+Flujo del cliente:
+1. GET /sync (sin cursor) responde reset=true y el cursor actual: cargar
+   las colecciones con los listados normales y guardar el cursor.
+2. Tras cada escritura o al recuperar conexión: POST /sync/push con la cola
+   de mutaciones pendientes (reenviar es seguro) y luego
+   GET /sync?since=<cursor> para traer solo lo que cambió, repitiendo
+   mientras `mas` sea true.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.schemas.sync_schema import SyncPushRequest, SyncPushResponse, SyncResponse
+from app.application.services.sync_service import ENTIDADES, SyncService
+from app.core.config import settings
+from app.core.dependencies import get_current_user, get_db, get_read_db
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SyncResponse)
+async def get_cambios(
+    since: int = Query(0, ge=0, description="Cursor de la última sincronización (0 = inicial)"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    tablas: Optional[str] = Query(
+        None, description="Tablas a sincronizar, separadas por coma; el cursor devuelto vale solo para ellas"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Filas cambiadas y lápidas desde el cursor `since`"""
+    seleccion = None
+    if tablas:
+        seleccion = [tabla.strip() for tabla in tablas.split(",") if tabla.strip()]
+        desconocidas = sorted(set(seleccion) - set(ENTIDADES))
+        if desconocidas:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tablas no sincronizables: {', '.join(desconocidas)}"
+            )
+
+    service = SyncService(db, current_user.id)
+    return await service.cambios(since, limit or settings.SYNC_LIMITE_CAMBIOS, seleccion)
+
+
+@router.post("/push", response_model=SyncPushResponse)
+async def push_mutaciones(
+    lote: SyncPushRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Aplicar mutaciones encoladas offline, en orden e idempotentes por `id`
+
+    Cada mutación se confirma por separado: un rechazo no deshace las
+    anteriores. Los resultados `error` (fallo interno) no se guardan y se
+    pueden reintentar.
+    """
+    if len(lote.mutaciones) > settings.SYNC_MAX_MUTACIONES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.SYNC_MAX_MUTACIONES} mutaciones por lote"
+        )
+
+    service = SyncService(db, current_user.id)
+    resultados = await service.aplicar(lote.mutaciones)
+    _, cursor = await service.repo.limites_cursor()
+    return SyncPushResponse(resultados=resultados, cursor=cursor)
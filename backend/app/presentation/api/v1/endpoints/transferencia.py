@@ -1,11 +1,13 @@
 """
 Endpoints para transferencias realizadas
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_read_db, get_current_user
+from app.core.etag import condicional
+from app.core.serializacion import lista_json, respuesta_json
 from app.infrastructure.database.models import TransferenciaRealizada
 from app.infrastructure.repositories.transferencia_repository import TransferenciaRepository
 from app.application.schemas.transferencia_schema import (
@@ -17,6 +19,9 @@ from app.application.schemas.transferencia_schema import (
 
 router = APIRouter()
 
+# Tablas que componen las respuestas (validador ETag de los GET)
+TABLAS_TRANSFERENCIAS = ("transferencias_realizadas",)
+
 
 @router.post("/", response_model=TransferenciaResponse, status_code=status.HTTP_201_CREATED)
 async def create_transferencia(
@@ -31,24 +36,33 @@ async def create_transferencia(
     return created
 
 
-@router.get("/", response_model=List[TransferenciaResponse])
+@router.get(
+    "/", response_model=List[TransferenciaResponse],
+    dependencies=[Depends(condicional(*TABLAS_TRANSFERENCIAS))],
+)
 async def list_transferencias(
+    response: Response,
     donadora_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = TransferenciaRepository(db)
     if donadora_id:
-        return await repo.get_by_donadora(donadora_id)
-    return await repo.get_all(skip, limit)
+        transferencias = await repo.get_by_donadora(donadora_id)
+    else:
+        transferencias = await repo.get_all(skip, limit)
+    return respuesta_json(lista_json(TransferenciaResponse, transferencias), response)
 
 
-@router.get("/{transferencia_id}", response_model=TransferenciaResponse)
+@router.get(
+    "/{transferencia_id}", response_model=TransferenciaResponse,
+    dependencies=[Depends(condicional(*TABLAS_TRANSFERENCIAS))],
+)
 async def get_transferencia(
     transferencia_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     repo = TransferenciaRepository(db)
@@ -4,14 +4,18 @@ Router principal de la API v1
 from fastapi import APIRouter
 
 from .endpoints import (
+    analitica,
     auth,
+    dashboard,
     donadoras,
     drafts,
     fecundacion,
     fotos,
     gfe,
     opu,
+    reportes,
     sesion_transferencia,
+    sync,
     transferencia,
 )
 
@@ -20,6 +24,7 @@ api_router = APIRouter()
 
 # Incluir routers de cada modulo
 api_router.include_router(auth.router, prefix="/auth", tags=["Autenticacion"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 api_router.include_router(donadoras.router, prefix="/donadoras", tags=["Donadoras"])
 api_router.include_router(drafts.router, prefix="/drafts", tags=["Drafts (Autosave)"])
 api_router.include_router(opu.router, prefix="/opu", tags=["OPU"])
@@ -28,3 +33,6 @@ api_router.include_router(transferencia.router, prefix="/transferencia", tags=["
 api_router.include_router(sesion_transferencia.router, prefix="/sesion-transferencia", tags=["Sesion Transferencia"])
 api_router.include_router(gfe.router, prefix="/gfe", tags=["GFE"])
 api_router.include_router(fotos.router, prefix="/fotos", tags=["Fotos"])
+api_router.include_router(analitica.router, prefix="/analitica", tags=["Analitica"])
+api_router.include_router(reportes.router, prefix="/reportes", tags=["Reportes"])
+api_router.include_router(sync.router, prefix="/sync", tags=["Sync (offline)"])
@@ -0,0 +1,224 @@
+"""
+Middleware de compresión de respuestas (gzip / brotli)
+
+- Negocia la codificación con Accept-Encoding (q-values incluidos); brotli
+  solo si el paquete está instalado, si no gzip.
+- Umbral mínimo: el cuerpo se retiene hasta superar COMPRESION_MIN_BYTES;
+  si la respuesta termina antes se envía tal cual (con Content-Length).
+- Streaming: las respuestas en varios mensajes (StreamingResponse, p. ej.
+  exportaciones CSV) se comprimen trozo a trozo con flush de sincronización,
+  así el cliente recibe datos sin esperar al final.
+- No se tocan respuestas ya codificadas, con Cache-Control: no-transform ni
+  tipos ya comprimidos (imágenes, zip, pdf...).
+- El nivel depende de la clase de ruta (COMPRESION_NIVELES): las respuestas
+  interactivas de la API usan un nivel bajo (menos CPU por request) y las
+  exportaciones uno alto (se descargan una vez y pesan más).
+"""
+import zlib
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+
+# Clases de ruta con nivel propio en COMPRESION_NIVELES
+CLASE_API = "api"
+CLASE_EXPORTACION = "exportacion"
+CLASE_ARCHIVOS = "archivos"
+
+NIVEL_POR_DEFECTO = 6
+
+
+def codificaciones_disponibles() -> tuple:
+    """Codificaciones soportadas, en orden de preferencia del servidor"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def elegir_codificacion(accept_encoding: str, disponibles: tuple = None) -> Optional[str]:
+    """
+    Mejor codificación aceptada por el cliente (None = sin comprimir)
+
+    Gana el q-value más alto; a igual q, el orden de `disponibles`.
+    """
+    disponibles = disponibles or codificaciones_disponibles()
+    pesos = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if not nombre:
+            continue
+        q = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                q = float(parametro[2:])
+            except ValueError:
+                q = 0.0
+        pesos[nombre.strip()] = q
+
+    comodin = pesos.get("*", 0.0)
+    candidatas = [
+        (pesos.get(cod, comodin), -orden, cod)
+        for orden, cod in enumerate(disponibles)
+    ]
+    q, _, cod = max(candidatas)
+    return cod if q > 0 else None
+
+
+def clase_ruta(ruta: str, tipo_contenido: str) -> str:
+    """Clase de la ruta para elegir el nivel de compresión"""
+    if ruta.startswith("/uploads"):
+        return CLASE_ARCHIVOS
+    if "/export" in ruta or tipo_contenido.startswith("text/csv"):
+        return CLASE_EXPORTACION
+    return CLASE_API
+
+
+class _Compresor:
+    """Interfaz común gzip/brotli: comprimir(trozo) y terminar()"""
+
+    def __init__(self, codificacion: str, nivel: int):
+        if codificacion == "br":
+            self._obj = brotli.Compressor(quality=max(0, min(nivel, 11)))
+            self._comprimir = lambda datos: self._obj.process(datos) + self._obj.flush()
+            self._terminar = self._obj.finish
+        else:
+            self._obj = zlib.compressobj(max(1, min(nivel, 9)), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._comprimir = lambda datos: self._obj.compress(datos) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+            self._terminar = lambda: self._obj.flush(zlib.Z_FINISH)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._comprimir(datos) if datos else b""
+
+    def terminar(self) -> bytes:
+        return self._terminar()
+
+
+def _excluido(tipo_contenido: str) -> bool:
+    return any(tipo_contenido.startswith(tipo) for tipo in settings.COMPRESION_TIPOS_EXCLUIDOS)
+
+
+class CompresionMiddleware:
+    """Middleware ASGI puro: comprime el cuerpo a medida que se envía"""
+
+    def __init__(self, app, minimo_bytes: int = None, niveles: dict = None):
+        self.app = app
+        self.minimo_bytes = settings.COMPRESION_MIN_BYTES if minimo_bytes is None else minimo_bytes
+        self.niveles = settings.COMPRESION_NIVELES if niveles is None else niveles
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabeceras = dict(scope.get("headers") or [])
+        codificacion = elegir_codificacion(cabeceras.get(b"accept-encoding", b"").decode("latin-1"))
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        pendiente = []
+        retenidos = 0
+        compresor: Optional[_Compresor] = None
+        transparente = False
+
+        async def enviar_sin_comprimir(cuerpo: bytes):
+            headers = [
+                (k, v) for k, v in inicio["headers"]
+                if k.lower() not in (b"content-length", b"vary")
+            ]
+            headers.append((b"content-length", str(len(cuerpo)).encode("latin-1")))
+            headers.append((b"vary", _vary(inicio["headers"])))
+            await send({**inicio, "headers": headers})
+            await send({"type": "http.response.body", "body": cuerpo, "more_body": False})
+
+        async def enviar_inicio_comprimido(largo: Optional[int]):
+            headers = [
+                (k, v) for k, v in inicio["headers"]
+                if k.lower() not in (b"content-length", b"vary")
+            ]
+            if largo is not None:
+                headers.append((b"content-length", str(largo).encode("latin-1")))
+            headers.append((b"content-encoding", codificacion.encode("latin-1")))
+            headers.append((b"vary", _vary(inicio["headers"])))
+            await send({**inicio, "headers": headers})
+
+        async def send_comprimido(message):
+            nonlocal inicio, retenidos, transparente, compresor
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if _no_comprimible(message["status"], headers):
+                    transparente = True
+                    await send(message)
+                else:
+                    # Se retiene hasta saber si el cuerpo supera el umbral
+                    inicio = {**message, "headers": list(headers)}
+                return
+
+            if transparente or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            cuerpo = message.get("body", b"")
+            mas = message.get("more_body", False)
+
+            if compresor is not None:
+                datos = compresor.comprimir(cuerpo)
+                if not mas:
+                    datos += compresor.terminar()
+                if datos or not mas:
+                    await send({"type": "http.response.body", "body": datos, "more_body": mas})
+                return
+
+            pendiente.append(cuerpo)
+            retenidos += len(cuerpo)
+            if retenidos < self.minimo_bytes:
+                if not mas:
+                    await enviar_sin_comprimir(b"".join(pendiente))
+                return
+
+            tipo = _cabecera(inicio["headers"], b"content-type")
+            nivel = self.niveles.get(clase_ruta(scope["path"], tipo), NIVEL_POR_DEFECTO)
+            compresor = _Compresor(codificacion, nivel)
+            datos = compresor.comprimir(b"".join(pendiente))
+            pendiente.clear()
+            if not mas:
+                # Cuerpo completo: se conoce el largo comprimido
+                datos += compresor.terminar()
+                await enviar_inicio_comprimido(len(datos))
+            else:
+                await enviar_inicio_comprimido(None)
+            await send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+        await self.app(scope, receive, send_comprimido)
+
+
+def _cabecera(headers, nombre: bytes) -> str:
+    for clave, valor in headers:
+        if clave.lower() == nombre:
+            return valor.decode("latin-1").lower()
+    return ""
+
+
+def _vary(headers) -> bytes:
+    actual = _cabecera(headers, b"vary")
+    if not actual:
+        return b"Accept-Encoding"
+    if "accept-encoding" in actual or actual == "*":
+        return actual.encode("latin-1")
+    return f"{actual}, Accept-Encoding".encode("latin-1")
+
+
+def _no_comprimible(status: int, headers) -> bool:
+    if status < 200 or status in (204, 304):
+        return True
+    if _cabecera(headers, b"content-encoding"):
+        return True
+    if "no-transform" in _cabecera(headers, b"cache-control"):
+        return True
+    return _excluido(_cabecera(headers, b"content-type"))
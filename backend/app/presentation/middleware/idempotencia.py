@@ -0,0 +1,232 @@
+"""
+Middleware de idempotencia (cabecera Idempotency-Key)
+
+Una escritura (POST/PUT/PATCH/DELETE) enviada con Idempotency-Key se
+ejecuta una sola vez por cliente y clave:
+
+- Primera request: se reserva la clave (fila 'en_curso' en
+  claves_idempotencia), se ejecuta el endpoint y se guarda la respuesta.
+- Reintento con la respuesta ya guardada: se devuelve tal cual, con
+  `Idempotent-Replayed: true`, sin volver a ejecutar el endpoint (ni subir
+  otra vez la imagen a Cloudinary, ni crear filas duplicadas).
+- Reintento mientras la original sigue en curso: 409 con Retry-After.
+- Misma clave con otra petición (método, ruta o cuerpo distintos): 422.
+
+Las respuestas 5xx y las que dependen del momento (401, 403, 408, 409, 429)
+no se guardan: se libera la clave y el reintento vuelve a ejecutarse. Las
+requests sin la cabecera pasan sin cambios.
+
+Las rutas de autenticación no usan idempotencia, y ninguna respuesta con
+credenciales (Set-Cookie, Authorization o un token en el cuerpo) se guarda:
+quedarían en texto plano en claves_idempotencia durante el TTL.
+
+El cliente se identifica como en la réplica de lecturas (hash del token o
+la IP), así dos usuarios no comparten claves.
+"""
+import hashlib
+import json
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.infrastructure.database import connection
+from app.infrastructure.database.replica import clave_cliente
+from app.infrastructure.repositories.idempotencia_repository import IdempotenciaRepository
+
+
+logger = logging.getLogger(__name__)
+
+CABECERA = b"idempotency-key"
+METODOS = {"POST", "PUT", "PATCH", "DELETE"}
+LARGO_MAXIMO_CLAVE = 255
+
+# Respuestas que no se repiten en un reintento
+STATUS_NO_GUARDABLES = {401, 403, 408, 409, 429}
+
+# Cabeceras propias de cada envío, no de la respuesta guardada
+CABECERAS_NO_GUARDADAS = {b"content-length", b"date", b"server", b"server-timing", b"set-cookie"}
+
+# Rutas que entregan credenciales (login, registro): pasan sin idempotencia
+RUTAS_EXCLUIDAS = ("/api/v1/auth/",)
+
+# Respuestas con credenciales: se liberan en lugar de guardarse
+CABECERAS_CREDENCIALES = {b"set-cookie", b"authorization"}
+CAMPOS_CREDENCIALES = (b'"access_token"', b'"refresh_token"', b'"id_token"')
+
+
+def huella_request(metodo: str, ruta: str, query: bytes, tipo_contenido: str, cuerpo: bytes) -> str:
+    """
+    Hash de la petición para detectar una clave reutilizada con otro contenido
+
+    En multipart se quita el boundary: el navegador genera uno nuevo en
+    cada envío del mismo formulario.
+    """
+    _, _, boundary = tipo_contenido.partition("boundary=")
+    if boundary:
+        cuerpo = cuerpo.replace(boundary.split(";")[0].strip('"').encode("latin-1"), b"")
+    digest = hashlib.sha256()
+    for parte in (metodo.encode("latin-1"), ruta.encode("utf-8"), query, cuerpo):
+        digest.update(parte)
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def contiene_credenciales(headers, cuerpo: bytes) -> bool:
+    """True si la respuesta entrega credenciales (cabeceras o token en el cuerpo)"""
+    if any(clave.lower() in CABECERAS_CREDENCIALES for clave, _ in headers):
+        return True
+    return any(campo in cuerpo for campo in CAMPOS_CREDENCIALES)
+
+
+def _cabecera(headers, nombre: bytes) -> str:
+    for clave, valor in headers:
+        if clave.lower() == nombre:
+            return valor.decode("latin-1")
+    return ""
+
+
+async def _responder(send, status: int, cuerpo: bytes, headers: list):
+    headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+    headers.append((b"content-length", str(len(cuerpo)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": cuerpo, "more_body": False})
+
+
+async def _responder_error(send, status: int, detalle: str, headers: Optional[list] = None):
+    cuerpo = json.dumps({"detail": detalle}, ensure_ascii=False).encode("utf-8")
+    await _responder(send, status, cuerpo, [(b"content-type", b"application/json")] + (headers or []))
+
+
+class IdempotenciaMiddleware:
+    """Middleware ASGI puro; la reserva y la respuesta se guardan con sesiones propias"""
+
+    def __init__(self, app, session_factory=None, rutas_excluidas=RUTAS_EXCLUIDAS):
+        self.app = app
+        self._session_factory = session_factory
+        self._rutas_excluidas = tuple(rutas_excluidas)
+
+    def _sesion(self):
+        return (self._session_factory or connection.AsyncSessionLocal)()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in METODOS
+            or scope["path"].startswith(self._rutas_excluidas)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope.get("headers") or []
+        clave = _cabecera(headers, CABECERA).strip()
+        if not clave:
+            await self.app(scope, receive, send)
+            return
+        if len(clave) > LARGO_MAXIMO_CLAVE:
+            await _responder_error(send, 400, f"Idempotency-Key admite hasta {LARGO_MAXIMO_CLAVE} caracteres")
+            return
+
+        # El cuerpo se lee completo para la huella y se vuelve a entregar al endpoint
+        partes = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            partes.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        cuerpo = b"".join(partes)
+
+        cliente = scope.get("client")
+        alcance = clave_cliente(_cabecera(headers, b"authorization") or None, cliente[0] if cliente else None)
+        huella = huella_request(
+            scope["method"], scope["path"], scope.get("query_string", b""),
+            _cabecera(headers, b"content-type"), cuerpo,
+        )
+
+        async with self._sesion() as db:
+            registro, reservada = await IdempotenciaRepository(db).reservar(
+                alcance, clave, huella, scope["method"], scope["path"],
+                settings.IDEMPOTENCIA_TTL_HORAS, settings.IDEMPOTENCIA_EN_CURSO_SEGUNDOS,
+            )
+
+        if not reservada:
+            await self._responder_existente(send, registro, huella)
+            return
+
+        entregado = False
+
+        async def receive_con_cuerpo():
+            nonlocal entregado
+            if not entregado:
+                entregado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            return await receive()
+
+        status = None
+        respuesta_headers = []
+        trozos = []
+        largo = 0
+
+        async def send_y_capturar(message):
+            nonlocal status, respuesta_headers, largo
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                respuesta_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body" and largo <= settings.IDEMPOTENCIA_MAX_BYTES:
+                trozo = message.get("body", b"")
+                largo += len(trozo)
+                trozos.append(trozo)
+            await send(message)
+
+        try:
+            await self.app(scope, receive_con_cuerpo, send_y_capturar)
+        except BaseException:
+            await self._liberar(registro.id)
+            raise
+
+        guardable = (
+            status is not None
+            and status < 500
+            and status not in STATUS_NO_GUARDABLES
+            and largo <= settings.IDEMPOTENCIA_MAX_BYTES
+        )
+        cuerpo_respuesta = b"".join(trozos)
+        if not guardable or contiene_credenciales(respuesta_headers, cuerpo_respuesta):
+            await self._liberar(registro.id)
+            return
+
+        cabeceras = [
+            [k.decode("latin-1"), v.decode("latin-1")]
+            for k, v in respuesta_headers
+            if k.lower() not in CABECERAS_NO_GUARDADAS
+        ]
+        try:
+            async with self._sesion() as db:
+                await IdempotenciaRepository(db).completar(registro.id, status, cabeceras, cuerpo_respuesta)
+        except Exception:
+            # La respuesta ya se envió; sin guardarla el reintento se vuelve a ejecutar
+            logger.exception("No se pudo guardar la respuesta de la clave de idempotencia %s", clave)
+            await self._liberar(registro.id)
+
+    async def _responder_existente(self, send, registro, huella: str):
+        if registro.huella != huella:
+            await _responder_error(
+                send, 422, "Idempotency-Key ya usada con otra petición (método, ruta o cuerpo distintos)"
+            )
+        elif registro.estado != "completada":
+            await _responder_error(
+                send, 409, "La petición con esta Idempotency-Key todavía se está procesando",
+                [(b"retry-after", b"1")],
+            )
+        else:
+            headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in registro.cabeceras or []]
+            headers.append((b"idempotent-replayed", b"true"))
+            await _responder(send, registro.status_code, registro.cuerpo or b"", headers)
+
+    async def _liberar(self, id: int):
+        try:
+            async with self._sesion() as db:
+                await IdempotenciaRepository(db).liberar(id)
+        except Exception:
+            logger.exception("No se pudo liberar la clave de idempotencia %s", id)
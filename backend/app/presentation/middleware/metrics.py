@@ -0,0 +1,46 @@
+"""
+Middleware de métricas HTTP
+
+Cuenta requests y mide su latencia por método y plantilla de ruta
+(/api/v1/donadoras/{donadora_id}, no la URL concreta, para acotar la
+cardinalidad). Las rutas no encontradas se agrupan en "sin_ruta".
+"""
+import time
+
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: una medición por request, sin tareas adicionales"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_con_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        inicio = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_con_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            ruta = getattr(route, "path_format", None) or getattr(route, "path", None) or "sin_ruta"
+            metodo = scope["method"]
+            http_requests_total.inc(metodo, ruta, status_code)
+            http_request_duration_seconds.observe(metodo, ruta, valor=time.perf_counter() - inicio)
@@ -0,0 +1,50 @@
+"""
+Middleware de métricas SQL por request
+
+Abre el contexto de instrumentación SQL, agrega la cabecera Server-Timing
+(db;dur=...) y emite un log estructurado al terminar cada request.
+"""
+import json
+import logging
+
+from app.infrastructure.database.instrumentation import iniciar_contexto
+
+
+logger = logging.getLogger("app.sql")
+
+
+class SQLMetricsMiddleware:
+    """Middleware ASGI puro (sin BaseHTTPMiddleware para no añadir tareas por request)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estadisticas = iniciar_contexto()
+        status_code = 500
+
+        async def send_con_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = f'db;dur={estadisticas.tiempo_ms:.2f};desc="{estadisticas.sentencias} queries"'
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            if estadisticas.sentencias:
+                logger.info(json.dumps({
+                    "evento": "sql_request",
+                    "metodo": scope["method"],
+                    "ruta": scope["path"],
+                    "status": status_code,
+                    **estadisticas.as_dict(),
+                }, ensure_ascii=False))
@@ -0,0 +1,109 @@
+"""
+Benchmark de serialización de listados grandes
+
+Mide, para una página de N donadoras (1.000 por defecto) en una base SQLite
+temporal, cuánto de la latencia se va en la consulta y cuánto en convertir
+las filas a JSON con cada camino:
+
+- clasico:      model_validate por fila + jsonable_encoder + json.dumps
+                (lo que hacía get_donadoras antes)
+- response_model: validación con List[schema] + jsonable_encoder + json
+                (serialización por defecto de FastAPI)
+- lista_json:   TypeAdapter.validate_python + dump_json (camino actual)
+
+Uso:
+    python benchmark_serializacion.py
+    python benchmark_serializacion.py --filas 5000 --repeticiones 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.application.schemas.donadora_schema import DonadoraResponse
+from app.core.serializacion import adaptador_lista, lista_json
+from app.infrastructure.database.connection import Base
+from app.infrastructure.database.models import Donadora
+from app.infrastructure.repositories.donadora_repository import DonadoraRepository
+
+
+def _clasico(filas) -> bytes:
+    cuerpo = [DonadoraResponse.model_validate(f) for f in filas]
+    return json.dumps(jsonable_encoder(cuerpo)).encode()
+
+
+def _response_model(filas) -> bytes:
+    validadas = adaptador_lista(DonadoraResponse).validate_python(list(filas), from_attributes=True)
+    return json.dumps(jsonable_encoder(validadas)).encode()
+
+
+def _lista_json(filas) -> bytes:
+    return lista_json(DonadoraResponse, filas)
+
+
+CAMINOS = {"clasico": _clasico, "response_model": _response_model, "lista_json": _lista_json}
+
+
+def _ms(muestras):
+    return statistics.median(muestras) * 1000
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as carpeta:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(carpeta) / 'bench.db'}")
+        SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with SessionLocal() as db:
+                db.add_all([
+                    Donadora(
+                        nombre=f"Donadora {i}", numero_registro=f"REG-{i:05d}", raza="Gyr",
+                        tipo_ganado="leche", propietario_nombre=f"Propietario {i % 50}",
+                        propietario_contacto="300 000 0000", fecha_nacimiento=date(2018, 1 + i % 12, 1),
+                        peso_kg=400 + i % 150, notas="Observaciones de ejemplo" * 3,
+                        fecha_creacion=datetime(2024, 1, 1),
+                    )
+                    for i in range(args.filas)
+                ])
+                await db.commit()
+
+            consulta = []
+            filas = []
+            for _ in range(args.repeticiones):
+                async with SessionLocal() as db:
+                    inicio = time.perf_counter()
+                    filas, _total = await DonadoraRepository(db).get_with_filters(skip=0, limit=args.filas)
+                    consulta.append(time.perf_counter() - inicio)
+
+            print(f"Filas: {len(filas)}  repeticiones: {args.repeticiones}  (medianas)")
+            print(f"  consulta            {_ms(consulta):8.2f} ms")
+            for nombre, camino in CAMINOS.items():
+                camino(filas)  # calentar (TypeAdapter, cachés de pydantic)
+                muestras = []
+                for _ in range(args.repeticiones):
+                    inicio = time.perf_counter()
+                    cuerpo = camino(filas)
+                    muestras.append(time.perf_counter() - inicio)
+                serializacion = _ms(muestras)
+                total = serializacion + _ms(consulta)
+                print(
+                    f"  {nombre:<18}  {serializacion:8.2f} ms  "
+                    f"{serializacion / total:6.1%} del total  ({len(cuerpo) / 1024:.0f} KiB)"
+                )
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de listados")
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -12,6 +12,7 @@ import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.infrastructure.database.connection import engine, Base, AsyncSessionLocal
+from app.infrastructure.database.migrations import metadata_migraciones, migrar
 from app.infrastructure.database.models import Usuario
 from app.core.security import get_password_hash
 
@@ -23,8 +24,10 @@ async def init_database():
     async with engine.begin() as conn:
         # Eliminar todas las tablas (¡CUIDADO en producción!)
         await conn.run_sync(Base.metadata.drop_all)
-        # Crear todas las tablas
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(metadata_migraciones.drop_all)
+
+    # Crear todas las tablas y marcar todas las migraciones como aplicadas
+    await migrar(engine, Base.metadata)
 
     print("[OK] Tablas creadas exitosamente")
 
@@ -0,0 +1,6 @@
+-- Migracion: Indices para agregados de tasa de prenez en chequeos_gfe
+-- Fecha: 2025-03-10
+-- Descripcion: Filtro por fecha/estado y join con transferencias_realizadas
+
+CREATE INDEX IF NOT EXISTS ix_chequeos_gfe_fecha_estado ON chequeos_gfe (fecha, estado);
+CREATE INDEX IF NOT EXISTS ix_chequeos_gfe_transferencia_id ON chequeos_gfe (transferencia_id);
@@ -0,0 +1,27 @@
+-- Migracion: Indices de claves foraneas y filtros frecuentes
+-- Fecha: 2025-03-17
+-- Descripcion: FKs usadas por selectinload/get_by_donadora y pares filtro+orden de los listados
+
+-- Extracciones OPU
+CREATE INDEX IF NOT EXISTS ix_extraccion_donadoras_sesion_secuencial ON extraccion_donadoras (sesion_opu_id, numero_secuencial);
+CREATE INDEX IF NOT EXISTS ix_extraccion_donadoras_donadora_id ON extraccion_donadoras (donadora_id);
+
+-- Fecundaciones
+CREATE INDEX IF NOT EXISTS ix_fecundaciones_donadora_id ON fecundaciones (donadora_id);
+CREATE INDEX IF NOT EXISTS ix_fecundaciones_extraccion_donadora_id ON fecundaciones (extraccion_donadora_id);
+
+-- Transferencias
+CREATE INDEX IF NOT EXISTS ix_transferencias_realizadas_donadora_id ON transferencias_realizadas (donadora_id);
+CREATE INDEX IF NOT EXISTS ix_transferencias_realizadas_sesion_transferencia_id ON transferencias_realizadas (sesion_transferencia_id);
+
+-- Drafts
+CREATE INDEX IF NOT EXISTS ix_drafts_usuario_modulo ON drafts (usuario_id, modulo);
+
+-- Donadoras
+CREATE INDEX IF NOT EXISTS ix_donadoras_raza ON donadoras (raza);
+CREATE INDEX IF NOT EXISTS ix_donadoras_tipo_ganado ON donadoras (tipo_ganado);
+CREATE INDEX IF NOT EXISTS ix_donadoras_fecha_creacion ON donadoras (fecha_creacion);
+CREATE INDEX IF NOT EXISTS ix_donadoras_activo_fecha_creacion ON donadoras (activo, fecha_creacion);
+
+-- Fotos
+CREATE INDEX IF NOT EXISTS ix_fotos_entidad_orden ON fotos (entidad_tipo, entidad_id, orden);
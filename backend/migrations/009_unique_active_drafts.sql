@@ -0,0 +1,17 @@
+-- Migracion: Un draft activo por formulario (upsert del autosave)
+-- Fecha: 2025-03-24
+-- Descripcion: Elimina drafts activos duplicados (se conserva el mas reciente) y crea el
+-- indice unico parcial usado por INSERT ... ON CONFLICT
+
+DELETE FROM drafts
+WHERE estado = 'draft'
+  AND id NOT IN (
+    SELECT MAX(id)
+    FROM drafts
+    WHERE estado = 'draft'
+    GROUP BY usuario_id, modulo, tipo_registro, COALESCE(registro_id, 0)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_drafts_activo
+ON drafts (usuario_id, modulo, tipo_registro, COALESCE(registro_id, 0))
+WHERE estado = 'draft';
@@ -0,0 +1,17 @@
+-- Migracion: Drafts incrementales con JSON Patch
+-- Fecha: 2025-03-31
+-- Descripcion: Version para concurrencia optimista, version del snapshot en datos_json
+-- y tabla de patches pendientes de compactar
+
+ALTER TABLE drafts ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE drafts ADD COLUMN version_snapshot INTEGER NOT NULL DEFAULT 1;
+
+CREATE TABLE IF NOT EXISTS draft_patches (
+    id INTEGER NOT NULL PRIMARY KEY,
+    draft_id INTEGER NOT NULL REFERENCES drafts (id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    operaciones JSON NOT NULL,
+    fecha_creacion DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    CONSTRAINT uq_draft_patches_draft_version UNIQUE (draft_id, version)
+);
+CREATE INDEX IF NOT EXISTS ix_draft_patches_id ON draft_patches (id);
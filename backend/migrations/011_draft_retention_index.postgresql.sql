@@ -0,0 +1,10 @@
+-- Migracion: Indice de drafts por usuario, modulo y estado
+-- Fecha: 2025-04-07
+-- Descripcion: Reemplaza ix_drafts_usuario_modulo por (usuario_id, modulo, estado), que cubre
+-- el filtro completo de get_by_usuario_modulo
+-- Variante PostgreSQL: CREATE/DROP INDEX CONCURRENTLY (sin bloquear escrituras)
+
+-- migrate:no-transaction
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_drafts_usuario_modulo_estado ON drafts (usuario_id, modulo, estado);
+DROP INDEX CONCURRENTLY IF EXISTS ix_drafts_usuario_modulo;
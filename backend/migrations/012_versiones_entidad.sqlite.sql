@@ -0,0 +1,10 @@
+-- Migracion: Contadores de version por tabla para GET condicionales
+-- Fecha: 2025-04-14
+-- Descripcion: versiones_entidad se incrementa en cada commit que escribe la tabla;
+-- los endpoints GET calculan el ETag con estos contadores
+
+CREATE TABLE IF NOT EXISTS versiones_entidad (
+    tabla VARCHAR(100) NOT NULL PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1,
+    fecha_actualizacion DATETIME NOT NULL DEFAULT (CURRENT_TIMESTAMP)
+);
@@ -0,0 +1,31 @@
+-- Migracion: Registro de cambios y mutaciones para sincronizacion offline
+-- Fecha: 2025-04-21
+-- Descripcion: registro_cambios guarda una fila por fila escrita en cada commit
+-- (secuencia monotona para GET /sync?since=, lapidas para los deletes);
+-- mutaciones_sync hace idempotente POST /sync/push
+
+CREATE TABLE IF NOT EXISTS registro_cambios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabla VARCHAR(100) NOT NULL,
+    fila_id INTEGER,
+    operacion VARCHAR(10) NOT NULL,
+    fecha DATETIME NOT NULL DEFAULT (CURRENT_TIMESTAMP)
+);
+
+CREATE INDEX IF NOT EXISTS ix_registro_cambios_fecha ON registro_cambios (fecha);
+
+CREATE TABLE IF NOT EXISTS mutaciones_sync (
+    id INTEGER PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    mutacion_id VARCHAR(64) NOT NULL,
+    entidad VARCHAR(50) NOT NULL,
+    operacion VARCHAR(15) NOT NULL,
+    estado VARCHAR(15) NOT NULL,
+    fila_id INTEGER,
+    error TEXT,
+    fecha_creacion DATETIME NOT NULL DEFAULT (CURRENT_TIMESTAMP),
+    CONSTRAINT uq_mutaciones_sync_usuario_mutacion UNIQUE (usuario_id, mutacion_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_mutaciones_sync_id ON mutaciones_sync (id);
+CREATE INDEX IF NOT EXISTS ix_mutaciones_sync_fecha ON mutaciones_sync (fecha_creacion);
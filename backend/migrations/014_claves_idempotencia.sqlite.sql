@@ -0,0 +1,23 @@
+-- Migracion: Claves de idempotencia para escrituras
+-- Fecha: 2025-04-28
+-- Descripcion: guarda la respuesta de cada POST/PUT/PATCH/DELETE enviado con
+-- Idempotency-Key para devolverla en los reintentos sin volver a ejecutarlo
+
+CREATE TABLE IF NOT EXISTS claves_idempotencia (
+    id INTEGER PRIMARY KEY,
+    alcance VARCHAR(64) NOT NULL,
+    clave VARCHAR(255) NOT NULL,
+    huella VARCHAR(64) NOT NULL,
+    metodo VARCHAR(10) NOT NULL,
+    ruta VARCHAR(500) NOT NULL,
+    estado VARCHAR(15) NOT NULL,
+    status_code INTEGER,
+    cabeceras JSON,
+    cuerpo BLOB,
+    fecha_creacion DATETIME NOT NULL DEFAULT (CURRENT_TIMESTAMP),
+    expira DATETIME NOT NULL,
+    CONSTRAINT uq_claves_idempotencia_alcance_clave UNIQUE (alcance, clave)
+);
+
+CREATE INDEX IF NOT EXISTS ix_claves_idempotencia_id ON claves_idempotencia (id);
+CREATE INDEX IF NOT EXISTS ix_claves_idempotencia_expira ON claves_idempotencia (expira);
@@ -1,50 +1,56 @@
 """
-Script para ejecutar migraciones SQL
-"""
-import sqlite3
-import sys
-from pathlib import Path
+Script para ejecutar migraciones SQL versionadas
 
-def run_migration(migration_file: str):
-    """Ejecuta un archivo de migración SQL"""
-    db_path = Path(__file__).parent / "embriones.db"
-    migration_path = Path(__file__).parent / "migrations" / migration_file
+Usa la DATABASE_URL de la configuración (SQLite o PostgreSQL) y la tabla
+schema_migrations para saber qué versiones faltan.
 
-    if not migration_path.exists():
-        print(f"[ERROR] Archivo de migracion no encontrado: {migration_path}")
-        sys.exit(1)
+Uso:
+    python run_migration.py             # aplicar migraciones pendientes
+    python run_migration.py --status    # listar versiones y su estado
+    python run_migration.py --stamp 006 # marcar como aplicadas hasta 006 sin ejecutarlas
+"""
+import argparse
+import asyncio
 
-    print(f"Base de datos: {db_path}")
-    print(f"Migracion: {migration_path}")
+from app.infrastructure.database import models  # noqa: F401 - registra las tablas en Base.metadata
+from app.infrastructure.database.connection import Base, engine
+from app.infrastructure.database.migrations import (
+    descubrir_migraciones,
+    marcar,
+    metadata_migraciones,
+    migrar,
+    versiones_aplicadas,
+)
 
-    # Leer SQL
-    with open(migration_path, 'r', encoding='utf-8') as f:
-        sql = f.read()
 
-    # Conectar y ejecutar
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+async def mostrar_estado():
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata_migraciones.create_all)
+    aplicadas = set(await versiones_aplicadas(engine))
 
-        # Ejecutar cada sentencia SQL
-        for statement in sql.split(';'):
-            statement = statement.strip()
-            if statement and not statement.startswith('--'):
-                print(f"Ejecutando: {statement[:50]}...")
-                cursor.execute(statement)
+    print(f"Base de datos: {engine.url.render_as_string(hide_password=True)}")
+    for migracion in descubrir_migraciones(engine.dialect.name):
+        estado = "aplicada " if migracion.version in aplicadas else "pendiente"
+        archivo = migracion.ruta.name if migracion.ruta else "(no aplica a este dialecto)"
+        print(f"  [{estado}] {migracion.version} {archivo}")
 
-        conn.commit()
-        conn.close()
 
-        print("[OK] Migracion aplicada exitosamente")
-    except Exception as e:
-        print(f"[ERROR] Error al aplicar migracion: {e}")
-        sys.exit(1)
+async def main(args):
+    try:
+        if args.status:
+            await mostrar_estado()
+        elif args.stamp:
+            versiones = await marcar(engine, hasta=args.stamp)
+            print(f"[OK] Versiones marcadas: {', '.join(versiones) or 'ninguna'}")
+        else:
+            versiones = await migrar(engine, Base.metadata)
+            print(f"[OK] Migraciones aplicadas: {', '.join(versiones) or 'ninguna (BD al dia)'}")
+    finally:
+        await engine.dispose()
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python run_migration.py <archivo_migracion>")
-        print("Ejemplo: python run_migration.py 001_add_cloudinary_fields.sql")
-        sys.exit(1)
 
-    run_migration(sys.argv[1])
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migraciones SQL versionadas")
+    parser.add_argument("--status", action="store_true", help="Listar versiones y su estado")
+    parser.add_argument("--stamp", metavar="VERSION", help="Marcar como aplicadas hasta VERSION")
+    asyncio.run(main(parser.parse_args()))
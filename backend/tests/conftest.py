@@ -0,0 +1,66 @@
+"""
+Fixtures compartidas de los tests del backend
+
+- engine / session_factory / db_session: BD SQLite en memoria con el esquema
+  creado, nueva en cada test
+- api_app: FastAPI mínima sobre esa BD (get_db y get_read_db sobreescritos)
+  con un usuario autenticado fijo; cada test incluye los routers que prueba
+
+La invalidación de la caché tras cada commit se registra como al iniciar la app.
+"""
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.cache import cache_respuestas, registrar_invalidacion
+from app.core.dependencies import get_current_user, get_db, get_read_db
+from app.infrastructure.database.connection import Base
+
+
+registrar_invalidacion()
+
+
+class DummyUser:
+    """Usuario autenticado de los tests de endpoints"""
+    id = 1
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def db_session(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def api_app(session_factory):
+    """App sin routers con la BD de prueba; la factory queda en app.state.session_factory"""
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: DummyUser()
+    app.state.session_factory = session_factory
+    cache_respuestas.vaciar()
+    try:
+        yield app
+    finally:
+        cache_respuestas.vaciar()
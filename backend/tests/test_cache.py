@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+from sqlalchemy import update
+
+from app.core import metrics
+from app.core.cache import CacheMemoria, CacheRespuestas, CacheSQLite, cache_respuestas
+from app.infrastructure.database.models import Donadora
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return CacheSQLite(str(tmp_path / "cache.db"), max_entradas=3)
+    return CacheMemoria(max_entradas=3)
+
+
+def test_backend_etiquetas_prefijos_y_lru(backend):
+    g = backend.generacion()
+    backend.set("lista", b"[1]", 60, ["donadoras:*"], g)
+    backend.set("d1", b'{"id":1}', 60, ["donadoras:1"], g)
+    backend.set("d2", b'{"id":2}', 60, ["donadoras:2"], g)
+    assert backend.get("d1") == (True, b'{"id":1}')
+
+    assert backend.invalidar(["donadoras:*", "donadoras:1"]) == 2
+    assert backend.get("lista") == (False, None)
+    assert backend.get("d2") == (True, b'{"id":2}')
+
+    assert backend.invalidar(prefijos=["donadoras:"]) == 1
+    assert len(backend) == 0
+
+    # Un cálculo iniciado antes de una invalidación no se guarda
+    g = backend.generacion()
+    backend.invalidar(["otra:*"])
+    backend.set("viejo", b"1", 60, ["donadoras:*"], g)
+    assert backend.get("viejo") == (False, None)
+
+    g = backend.generacion()
+    for i in range(4):
+        backend.set(f"k{i}", str(i).encode(), 60, [], g)
+    assert len(backend) == 3
+    assert backend.get("k0") == (False, None)
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(cache_respuestas, "backend", CacheMemoria())
+    return session_factory
+
+
+@pytest.mark.asyncio
+async def test_escrituras_invalidan_por_fila_y_por_tabla(session_factory):
+    async with session_factory() as db:
+        db.add_all([
+            Donadora(nombre=n, numero_registro=n, raza="Gyr", tipo_ganado="leche", propietario_nombre="P")
+            for n in ("A", "B")
+        ])
+        await db.commit()
+
+    calculos = []
+
+    async def consultar(espacio, parametros, etiquetas):
+        async def calcular():
+            calculos.append(espacio)
+            return {"espacio": espacio}
+        return await cache_respuestas.obtener_o_calcular(espacio, parametros, etiquetas, calcular)
+
+    async def todas():
+        await consultar("stats", None, ["donadoras:*"])
+        await consultar("detalle", {"id": 1}, ["donadoras:1"])
+        await consultar("detalle", {"id": 2}, ["donadoras:2"])
+
+    hits_antes = metrics.cache_requests_total._valores.get(("stats", "hit"), 0)
+    await todas()
+    await todas()
+    assert calculos == ["stats", "detalle", "detalle"]
+    assert metrics.cache_requests_total._valores[("stats", "hit")] == hits_antes + 1
+
+    # Escritura ORM de la fila 1: invalida listados y el detalle 1
+    async with session_factory() as db:
+        donadora = await db.get(Donadora, 1)
+        donadora.nombre = "A2"
+        await db.commit()
+    calculos.clear()
+    await todas()
+    assert calculos == ["stats", "detalle"]
+
+    # DML masivo sin ids: invalida todo lo de la tabla
+    async with session_factory() as db:
+        await db.execute(update(Donadora).values(activo=False))
+        await db.commit()
+    calculos.clear()
+    await todas()
+    assert calculos == ["stats", "detalle", "detalle"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_fuera_del_event_loop(tmp_path, monkeypatch):
+    cache = CacheRespuestas(CacheSQLite(str(tmp_path / "cache.db")), 60)
+    hilos = []
+    for operacion in ("get", "set", "generacion", "invalidar"):
+        original = getattr(cache.backend, operacion)
+
+        def registrar(*args, _original=original, **kwargs):
+            hilos.append(threading.current_thread())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(cache.backend, operacion, registrar)
+
+    async def calcular():
+        return {"a": 1}
+
+    assert await cache.obtener_o_calcular("e", None, ["t:*"], calcular, validador='W/"1"') == b'{"a":1}'
+    assert await cache.obtener_o_calcular("e", None, ["t:*"], calcular, validador='W/"1"') == b'{"a":1}'
+    assert hilos and threading.main_thread() not in hilos
+
+    # La invalidación tras un commit tampoco bloquea el loop
+    cache.al_confirmar({"t": {1}})
+    for _ in range(100):
+        if len(cache.backend) == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert len(cache.backend) == 0
+
+
+@pytest.mark.asyncio
+async def test_error_de_invalidacion_no_falla_el_commit(session_factory, caplog, monkeypatch):
+    def falla(*args, **kwargs):
+        raise RuntimeError("caché no disponible")
+
+    monkeypatch.setattr(cache_respuestas.backend, "invalidar", falla)
+    with caplog.at_level(logging.ERROR, logger="app.core.cache"):
+        async with session_factory() as db:
+            db.add(Donadora(nombre="A", numero_registro="A", raza="Gyr", tipo_ganado="leche", propietario_nombre="P"))
+            await db.commit()
+
+    assert "No se pudo invalidar la caché" in caplog.text
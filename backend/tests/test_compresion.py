@@ -0,0 +1,134 @@
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import AsyncClient
+
+from app.presentation.middleware import compresion
+from app.presentation.middleware.compresion import (
+    CompresionMiddleware,
+    clase_ruta,
+    elegir_codificacion,
+)
+
+
+GRANDE = "fila,valor\n" * 500
+
+
+def test_elegir_codificacion_respeta_q_values():
+    assert elegir_codificacion("gzip, deflate") == "gzip"
+    assert elegir_codificacion("gzip;q=0") is None
+    assert elegir_codificacion("identity") is None
+    assert elegir_codificacion("*") == "gzip"
+    assert elegir_codificacion("gzip;q=0.5, br", ("br", "gzip")) == "br"
+    assert elegir_codificacion("gzip, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert elegir_codificacion("gzip, br", ("br", "gzip")) == "br"
+
+
+def test_clase_ruta():
+    assert clase_ruta("/api/v1/donadoras/", "application/json") == "api"
+    assert clase_ruta("/api/v1/donadoras/export/csv", "text/csv") == "exportacion"
+    assert clase_ruta("/uploads/a.txt", "text/plain") == "archivos"
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+
+    @app.get("/chico")
+    async def chico():
+        return PlainTextResponse("hola")
+
+    @app.get("/grande")
+    async def grande():
+        return PlainTextResponse(GRANDE, headers={"Vary": "Origin"})
+
+    @app.get("/imagen")
+    async def imagen():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    app.add_middleware(CompresionMiddleware, minimo_bytes=500, niveles={"api": 1})
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
+async def _crudo(client, ruta, accept="gzip"):
+    respuesta = await client.get(ruta, headers={"Accept-Encoding": accept})
+    return respuesta, respuesta.headers.get("content-encoding")
+
+
+@pytest.mark.asyncio
+async def test_comprime_segun_umbral_y_tipo(client):
+    resp, cod = await _crudo(client, "/grande")
+    assert cod == "gzip"
+    assert resp.text == GRANDE
+    assert resp.headers["vary"] == "origin, Accept-Encoding"
+    assert int(resp.headers["content-length"]) < len(GRANDE)
+
+    resp, cod = await _crudo(client, "/chico")
+    assert cod is None and resp.text == "hola"
+    assert resp.headers["content-length"] == "4"
+
+    resp, cod = await _crudo(client, "/imagen")
+    assert cod is None and len(resp.content) == 4000
+
+    resp, cod = await _crudo(client, "/grande", accept="identity")
+    assert cod is None and resp.text == GRANDE
+
+
+@pytest.mark.asyncio
+async def test_streaming_se_comprime_por_trozos():
+    async def filas():
+        for _ in range(500):
+            yield "fila,valor\n"
+
+    middleware = CompresionMiddleware(
+        StreamingResponse(filas(), media_type="text/csv"), minimo_bytes=500, niveles={}
+    )
+    scope = {"type": "http", "method": "GET", "path": "/export/csv", "headers": [(b"accept-encoding", b"gzip")]}
+    mensajes = []
+
+    async def recibir():
+        return {"type": "http.disconnect"}
+
+    async def enviar(message):
+        mensajes.append(message)
+
+    await middleware(scope, recibir, enviar)
+
+    headers = dict(mensajes[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    trozos = [m["body"] for m in mensajes[1:]]
+    assert len(trozos) > 100
+    assert mensajes[-1]["more_body"] is False
+
+    # Cada trozo termina en flush de sincronización: se puede descomprimir a medida que llega
+    descompresor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert descompresor.decompress(trozos[0]).endswith(b"fila,valor\n")
+    assert gzip.decompress(b"".join(trozos)).decode() == GRANDE
+
+
+@pytest.mark.asyncio
+async def test_brotli_si_esta_disponible(client, monkeypatch):
+    class BrotliFalso:
+        class Compressor:
+            def __init__(self, quality):
+                self.datos = []
+
+            def process(self, datos):
+                self.datos.append(datos)
+                return b""
+
+            def flush(self):
+                return b""
+
+            def finish(self):
+                return b"BR:" + b"".join(self.datos)
+
+    monkeypatch.setattr(compresion, "brotli", BrotliFalso)
+    resp, cod = await _crudo(client, "/grande", accept="gzip, br")
+    assert cod == "br"
+    assert resp.content == b"BR:" + GRANDE.encode()
@@ -0,0 +1,53 @@
+import datetime
+import pytest
+from httpx import AsyncClient
+
+from app.infrastructure.database.models import ChequeoGFE, Donadora, TransferenciaRealizada
+from app.presentation.api.v1.endpoints import dashboard
+
+
+@pytest.fixture
+def test_app(api_app):
+    api_app.include_router(dashboard.router, prefix="/api/v1/dashboard")
+    return api_app
+
+
+@pytest.mark.asyncio
+async def test_summary_cuenta_y_se_invalida_al_escribir(test_app):
+    async with test_app.state.session_factory() as db:
+        t1 = TransferenciaRealizada(numero_secuencial=1, fecha=datetime.date(2025, 1, 2), receptora="R1")
+        t2 = TransferenciaRealizada(numero_secuencial=2, fecha=datetime.date(2025, 1, 1), receptora="R2")
+        db.add_all([t1, t2])
+        await db.flush()
+        db.add(ChequeoGFE(
+            transferencia_id=t1.id,
+            receptora="R1",
+            tecnico_chequeo="Vet",
+            fecha=datetime.date(2025, 2, 1),
+            cliente="C",
+            estado="preñada",
+        ))
+        await db.commit()
+
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        resp = await client.get("/api/v1/dashboard/summary")
+        assert resp.status_code == 200, resp.text
+        body = resp.json()
+        assert body["contadores"]["tasa_prenez"] == 100
+        assert body["contadores"]["total_donadoras"] == 0
+        assert body["gfe_pendientes"]["total"] == 1
+        assert body["gfe_pendientes"]["items"][0]["receptora"] == "R2"
+
+        # Una escritura confirmada sobre donadoras invalida la caché
+        async with test_app.state.session_factory() as db:
+            db.add(Donadora(
+                nombre="Dona",
+                numero_registro="D-1",
+                raza="Gyr",
+                tipo_ganado="leche",
+                propietario_nombre="Owner",
+            ))
+            await db.commit()
+
+        resp = await client.get("/api/v1/dashboard/summary")
+        assert resp.json()["contadores"]["total_donadoras"] == 1
@@ -0,0 +1,243 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+
+from app.application.services.draft_buffer import BufferDrafts, DraftPendiente, draft_buffer
+from app.application.services.draft_retention import PurgadorDrafts
+from app.core.config import settings
+from app.infrastructure.database.models import Draft, DraftPatch
+from app.infrastructure.repositories.draft_repository import DraftRepository
+from app.presentation.api.v1.endpoints import drafts as drafts_endpoint
+
+
+async def _drafts(factory):
+    async with factory() as db:
+        return (await db.execute(select(Draft).order_by(Draft.id))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_upsert_formulario_nuevo_reutiliza_draft_activo(session_factory):
+    async with session_factory() as db:
+        repo = DraftRepository(db)
+        primero = await repo.upsert(1, "opu", "sesion", None, {"paso": 1})
+        segundo = await repo.upsert(1, "opu", "sesion", None, {"paso": 2})
+        otro_registro = await repo.upsert(1, "opu", "sesion", 7, {"paso": 1})
+
+    assert primero.id == segundo.id
+    assert segundo.datos_json == {"paso": 2}
+    assert otro_registro.id != primero.id
+
+    drafts = await _drafts(session_factory)
+    assert [d.datos_json for d in drafts] == [{"paso": 2}, {"paso": 1}]
+
+
+@pytest.mark.asyncio
+async def test_draft_completado_no_bloquea_uno_nuevo(session_factory):
+    async with session_factory() as db:
+        repo = DraftRepository(db)
+        draft = await repo.upsert(1, "opu", "sesion", None, {"paso": 1})
+        await repo.mark_as_completed(draft.id)
+        nuevo = await repo.upsert(1, "opu", "sesion", None, {"paso": 1})
+
+    assert nuevo.id != draft.id
+    estados = [d.estado for d in await _drafts(session_factory)]
+    assert estados == ["completado", "draft"]
+
+
+@pytest.fixture
+async def client(api_app, monkeypatch):
+    monkeypatch.setattr(settings, "DRAFT_SNAPSHOT_CADA", 3)
+    # Sin buffer: cada patch se escribe al momento (los tests del buffer lo activan)
+    monkeypatch.setattr(draft_buffer, "intervalo", 0)
+    monkeypatch.setattr(draft_buffer, "_pendientes", {})
+    api_app.include_router(drafts_endpoint.router, prefix="/drafts")
+
+    async with AsyncClient(app=api_app, base_url="http://test") as client:
+        yield client
+
+
+async def _patches(factory):
+    async with factory() as db:
+        return await db.scalar(select(func.count(DraftPatch.id)))
+
+
+@pytest.mark.asyncio
+async def test_patch_incremental_con_compactacion(client, session_factory):
+    creado = (await client.post("/drafts/", json={
+        "modulo": "opu", "tipo_registro": "sesion", "datos_json": {"extracciones": []}
+    })).json()
+    assert creado["version"] == 1
+
+    version = creado["version"]
+    for gi in range(1, 5):
+        respuesta = await client.patch(f"/drafts/{creado['id']}", json={
+            "version_base": version,
+            "operaciones": [{"op": "add", "path": "/extracciones/-", "value": {"gi": gi}}],
+        })
+        assert respuesta.status_code == 200
+        version = respuesta.json()["version"]
+
+    # Compactado en la versión 4 (3 patches); queda pendiente el de la 5
+    async with session_factory() as db:
+        draft = await db.get(Draft, creado["id"])
+        assert (draft.version, draft.version_snapshot) == (5, 4)
+        assert len(draft.datos_json["extracciones"]) == 3
+    assert await _patches(session_factory) == 1
+
+    [leido] = (await client.get("/drafts/")).json()
+    assert leido["version"] == 5
+    assert leido["datos_json"]["extracciones"] == [{"gi": gi} for gi in range(1, 5)]
+
+    # Completar compacta el patch pendiente
+    assert (await client.post(f"/drafts/{creado['id']}/complete")).status_code == 204
+    async with session_factory() as db:
+        draft = await db.get(Draft, creado["id"])
+        assert len(draft.datos_json["extracciones"]) == 4
+    assert await _patches(session_factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_patch_version_obsoleta_e_invalido(client, session_factory):
+    creado = (await client.post("/drafts/", json={
+        "modulo": "opu", "tipo_registro": "sesion", "datos_json": {"a": 1}
+    })).json()
+    url = f"/drafts/{creado['id']}"
+
+    assert (await client.patch(url, json={
+        "version_base": 1, "operaciones": [{"op": "replace", "path": "/a", "value": 2}]
+    })).status_code == 200
+
+    obsoleto = await client.patch(url, json={
+        "version_base": 1, "operaciones": [{"op": "replace", "path": "/a", "value": 3}]
+    })
+    assert obsoleto.status_code == 409
+    assert obsoleto.json()["detail"]["version"] == 2
+
+    invalido = await client.patch(url, json={
+        "version_base": 2, "operaciones": [{"op": "remove", "path": "/no_existe"}]
+    })
+    assert invalido.status_code == 422
+
+    # El guardado completo (fallback del cliente) reemplaza el documento y descarta patches
+    completo = (await client.post("/drafts/", json={
+        "modulo": "opu", "tipo_registro": "sesion", "datos_json": {"a": 3}
+    })).json()
+    assert (completo["id"], completo["version"], completo["datos_json"]) == (creado["id"], 3, {"a": 3})
+    assert await _patches(session_factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_buffer_agrupa_patches_en_una_escritura(client, session_factory, monkeypatch):
+    monkeypatch.setattr(draft_buffer, "intervalo", 30)
+    creado = (await client.post("/drafts/", json={
+        "modulo": "opu", "tipo_registro": "sesion", "datos_json": {"extracciones": []}
+    })).json()
+
+    version = creado["version"]
+    for gi in range(1, 21):
+        respuesta = await client.patch(f"/drafts/{creado['id']}", json={
+            "version_base": version,
+            "operaciones": [{"op": "add", "path": "/extracciones/-", "value": {"gi": gi}}],
+        })
+        assert respuesta.status_code == 200
+        version = respuesta.json()["version"]
+    assert version == 21
+
+    # Nada escrito todavía, pero la lectura ve la última versión
+    async with session_factory() as db:
+        draft = await db.get(Draft, creado["id"])
+        assert (draft.version, draft.datos_json) == (1, {"extracciones": []})
+    assert await _patches(session_factory) == 0
+    [leido] = (await client.get("/drafts/")).json()
+    assert leido["version"] == 21 and len(leido["datos_json"]["extracciones"]) == 20
+
+    obsoleto = await client.patch(f"/drafts/{creado['id']}", json={
+        "version_base": 20, "operaciones": [{"op": "replace", "path": "/extracciones", "value": []}]
+    })
+    assert obsoleto.status_code == 409 and obsoleto.json()["detail"]["version"] == 21
+
+    # Completar escribe primero lo que está en memoria
+    assert (await client.post(f"/drafts/{creado['id']}/complete")).status_code == 204
+    assert draft_buffer.pendientes == 0
+    async with session_factory() as db:
+        draft = await db.get(Draft, creado["id"])
+        assert (draft.version, draft.estado) == (21, "completado")
+        assert len(draft.datos_json["extracciones"]) == 20
+
+
+@pytest.mark.asyncio
+async def test_buffer_flush_por_lotes_y_conflictos(session_factory):
+    async with session_factory() as db:
+        repo = DraftRepository(db)
+        a = await repo.upsert(1, "opu", "sesion", None, {"paso": 0})
+        b = await repo.upsert(1, "opu", "detalle", None, {"paso": 0})
+
+    def sin_sesion_propia():
+        raise AssertionError("el flush de un request no debe abrir otra sesión de escritura")
+
+    buffer = BufferDrafts(intervalo_segundos=30, session_factory=sin_sesion_propia)
+    for paso in range(1, 11):
+        buffer.encolar(a.id, DraftPendiente(1, 1, 1 + paso, {"paso": paso}))
+    # b se reescribió completo después de cargarlo: su versión en memoria es vieja
+    buffer.encolar(b.id, DraftPendiente(1, 1, 2, {"paso": "viejo"}))
+    async with session_factory() as db:
+        await DraftRepository(db).upsert(1, "opu", "detalle", None, {"paso": "nuevo"})
+
+    async with session_factory() as db:
+        assert await buffer.flush(db=db) == 1
+    assert (buffer.recibidos, buffer.escritos, buffer.pendientes) == (11, 1, 0)
+
+    drafts = {d.id: d for d in await _drafts(session_factory)}
+    assert (drafts[a.id].version, drafts[a.id].version_snapshot, drafts[a.id].datos_json) == (11, 11, {"paso": 10})
+    assert drafts[b.id].datos_json == {"paso": "nuevo"}
+
+
+@pytest.mark.asyncio
+async def test_datos_grandes_se_guardan_comprimidos(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "DRAFT_COMPRIMIR_DESDE_BYTES", 1024)
+    extracciones = [{"gi": i, "observaciones": "sin novedad"} for i in range(40)]
+
+    async with session_factory() as db:
+        repo = DraftRepository(db)
+        grande = await repo.upsert(1, "opu", "sesion", None, {"extracciones": extracciones})
+        pequeno = await repo.upsert(1, "opu", "detalle", None, {"gi": 1})
+
+    async with session_factory() as db:
+        crudos = dict((await db.execute(text("SELECT id, datos_json FROM drafts"))).all())
+        assert "__zlib__" in crudos[grande.id]
+        assert len(crudos[grande.id]) < len(json.dumps(extracciones))
+        assert json.loads(crudos[pequeno.id]) == {"gi": 1}
+
+        draft = await db.get(Draft, grande.id)
+        assert draft.datos_json == {"extracciones": extracciones}
+
+
+@pytest.mark.asyncio
+async def test_purga_completados_y_vencidos_por_modulo(session_factory, monkeypatch):
+    ahora = datetime.now(timezone.utc)
+    hace = lambda **delta: ahora - timedelta(**delta)  # noqa: E731
+
+    async with session_factory() as db:
+        db.add_all([
+            Draft(usuario_id=1, modulo="opu", tipo_registro="a", datos_json={}, fecha_creacion=hace(days=8)),
+            Draft(usuario_id=1, modulo="opu", tipo_registro="b", datos_json={}, fecha_creacion=hace(days=2)),
+            Draft(usuario_id=1, modulo="donadora", tipo_registro="a", datos_json={}, fecha_creacion=hace(days=8)),
+            Draft(usuario_id=1, modulo="donadora", tipo_registro="b", datos_json={}, fecha_creacion=hace(days=40)),
+            Draft(usuario_id=1, modulo="gfe", tipo_registro="a", datos_json={}, estado="completado",
+                  fecha_creacion=hace(days=3), fecha_actualizacion=hace(hours=30)),
+            Draft(usuario_id=1, modulo="gfe", tipo_registro="b", datos_json={}, estado="completado",
+                  fecha_creacion=hace(days=3), fecha_actualizacion=hace(hours=1)),
+        ])
+        await db.commit()
+
+    monkeypatch.setattr(settings, "DRAFT_TTL_DIAS", 30)
+    monkeypatch.setattr(settings, "DRAFT_TTL_DIAS_POR_MODULO", {"opu": 7})
+    monkeypatch.setattr(settings, "DRAFT_RETENCION_COMPLETADOS_HORAS", 24)
+    purgador = PurgadorDrafts(intervalo_segundos=0, session_factory=session_factory)
+    assert await purgador.purgar() == 3
+
+    restantes = [(d.modulo, d.tipo_registro) for d in await _drafts(session_factory)]
+    assert restantes == [("opu", "b"), ("donadora", "a"), ("gfe", "b")]
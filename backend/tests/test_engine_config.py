@@ -0,0 +1,42 @@
+from app.core.config import Settings
+from app.infrastructure.database.connection import build_engine_kwargs, resolver_pool
+
+PG_REMOTO = "postgresql+psycopg://u:p@db.render.com:5432/embriones"
+
+
+def test_perfil_produccion_sin_pre_ping_y_con_timeout():
+    config = Settings(ENVIRONMENT="production")
+    kwargs = build_engine_kwargs(PG_REMOTO, config)
+
+    assert kwargs["pool_pre_ping"] is False
+    assert kwargs["pool_recycle"] == 300
+    assert kwargs["connect_args"]["sslmode"] == "require"
+    assert kwargs["connect_args"]["options"] == "-c statement_timeout=30000"
+    assert kwargs["connect_args"]["prepare_threshold"] == 5
+
+
+def test_settings_sobrescriben_perfil_y_modo_pgbouncer():
+    config = Settings(ENVIRONMENT="production", DB_POOL_SIZE=20, DB_POOL_PRE_PING=True, DB_PGBOUNCER=True)
+    kwargs = build_engine_kwargs(PG_REMOTO, config)
+
+    assert resolver_pool(config)["pool_size"] == 20
+    assert kwargs["pool_size"] == 20
+    assert kwargs["pool_pre_ping"] is True
+    assert kwargs["connect_args"]["prepare_threshold"] is None
+
+    asyncpg = build_engine_kwargs("postgresql+asyncpg://u:p@localhost/embriones", config)
+    assert asyncpg["connect_args"]["statement_cache_size"] == 0
+    assert "ssl" not in asyncpg["connect_args"]
+
+
+def test_sqlite_escritor_unico_y_pool_de_lectura():
+    config = Settings(ENVIRONMENT="production", SQLITE_READ_POOL_SIZE=3)
+    escritor = build_engine_kwargs("sqlite+aiosqlite:///./embriones.db", config)
+    lector = build_engine_kwargs("sqlite+aiosqlite:///./embriones.db", config, solo_lectura=True)
+
+    assert (escritor["pool_size"], escritor["max_overflow"]) == (1, 0)
+    assert lector["pool_size"] == 3
+    assert escritor["connect_args"] == {}
+
+    memoria = build_engine_kwargs("sqlite+aiosqlite:///:memory:", config)
+    assert "pool_size" not in memoria
@@ -0,0 +1,91 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+
+from app.core.etag import coincide_etag
+from app.infrastructure.database.models import Donadora, VersionEntidad
+from app.infrastructure.repositories.donadora_repository import DonadoraRepository
+from app.presentation.api.v1.endpoints import donadoras
+
+
+@pytest.fixture
+def test_app(api_app):
+    api_app.include_router(donadoras.router, prefix="/donadoras")
+    return api_app
+
+
+async def _crear_donadora(factory, nombre):
+    async with factory() as db:
+        db.add(Donadora(nombre=nombre, numero_registro=nombre, raza="Gyr", tipo_ganado="leche", propietario_nombre="P"))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_commit_incrementa_version_de_la_tabla(test_app):
+    factory = test_app.state.session_factory
+    await _crear_donadora(factory, "Lola")
+    await _crear_donadora(factory, "Luna")
+
+    async with factory() as db:
+        versiones = dict((await db.execute(select(VersionEntidad.tabla, VersionEntidad.version))).all())
+    assert versiones == {"donadoras": 2}
+
+
+@pytest.mark.asyncio
+async def test_304_sin_consultar_ni_serializar(test_app, monkeypatch):
+    await _crear_donadora(test_app.state.session_factory, "Lola")
+
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        primera = await client.get("/donadoras/", params={"limit": 10})
+        assert primera.status_code == 200
+        etag = primera.headers["etag"]
+        assert primera.headers["cache-control"] == "private, no-cache"
+        assert "last-modified" in primera.headers
+
+        async def no_debe_consultar(*args, **kwargs):
+            raise AssertionError("la consulta no debía ejecutarse")
+
+        with monkeypatch.context() as m:
+            m.setattr(DonadoraRepository, "get_with_filters", no_debe_consultar)
+            no_modificada = await client.get("/donadoras/", params={"limit": 10}, headers={"If-None-Match": etag})
+        assert no_modificada.status_code == 304
+        assert no_modificada.content == b""
+        assert no_modificada.headers["etag"] == etag
+
+        # Otros parámetros: otra representación
+        otra = await client.get("/donadoras/", params={"limit": 5}, headers={"If-None-Match": etag})
+        assert otra.status_code == 200
+
+        await _crear_donadora(test_app.state.session_factory, "Luna")
+        cambiada = await client.get("/donadoras/", params={"limit": 10}, headers={"If-None-Match": etag})
+        assert cambiada.status_code == 200
+        assert cambiada.headers["etag"] != etag
+        assert cambiada.json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_no_sirve_cuerpo_de_otras_versiones(test_app, engine):
+    await _crear_donadora(test_app.state.session_factory, "Lola")
+
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        primera = await client.get("/donadoras/1")
+        assert primera.json()["nombre"] == "Lola"
+
+        # Escritura de otro worker: versiones_entidad cambia, pero la caché
+        # de este proceso no recibe la invalidación
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE donadoras SET nombre = 'Luna' WHERE id = 1"))
+            await conn.execute(text("UPDATE versiones_entidad SET version = version + 1 WHERE tabla = 'donadoras'"))
+
+        segunda = await client.get("/donadoras/1", headers={"If-None-Match": primera.headers["etag"]})
+        assert segunda.status_code == 200
+        assert segunda.headers["etag"] != primera.headers["etag"]
+        assert segunda.json()["nombre"] == "Luna"
+
+
+def test_comparacion_debil():
+    assert coincide_etag('"x", W/"abc"', 'W/"abc"')
+    assert coincide_etag('"abc"', 'W/"abc"')
+    assert coincide_etag("*", 'W/"abc"')
+    assert not coincide_etag('W/"abd"', 'W/"abc"')
+    assert not coincide_etag(None, 'W/"abc"')
@@ -1,37 +1,30 @@
 import io
 import pytest
-from fastapi import FastAPI
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
-from app.infrastructure.database.connection import Base
+from app.core.dependencies import get_db
 from app.presentation.api.v1.endpoints import fotos
-from app.core.dependencies import get_db, get_current_user
 
 
 @pytest.fixture
-async def test_app(monkeypatch):
+def test_app(api_app, session_factory, monkeypatch):
     """
     App FastAPI mínima con BD en memoria y dependencias sobreescritas
     para probar upload de fotos sin tocar servicios externos.
     """
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
-    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    escrituras = []
 
     async def override_get_db():
-        async with SessionLocal() as session:
+        async with session_factory() as session:
+            escrituras.append(session)
             yield session
 
-    class DummyUser:
-        id = 1
-
-    def override_get_current_user():
-        return DummyUser()
+    def sin_escritor_retenido():
+        # La conexión de escritura no debe estar tomada mientras se habla con Cloudinary
+        assert not any(sesion.in_transaction() for sesion in escrituras)
 
     async def fake_upload_image(file, folder="extracciones", max_size=5_242_880):
+        sin_escritor_retenido()
         # Consumir el file para simular lectura (luego se descarta)
         await file.read()
         return {
@@ -41,21 +34,16 @@ async def test_app(monkeypatch):
         }
 
     async def fake_delete_image(public_id: str) -> bool:
+        sin_escritor_retenido()
         return True
 
     # Parchear servicios de Cloudinary en el endpoint de fotos
     monkeypatch.setattr(fotos, "upload_image", fake_upload_image)
     monkeypatch.setattr(fotos, "delete_image", fake_delete_image)
 
-    app = FastAPI()
-    app.dependency_overrides[get_db] = override_get_db
-    app.dependency_overrides[get_current_user] = override_get_current_user
-    app.include_router(fotos.router, prefix="/api/v1/fotos")
-
-    try:
-        yield app
-    finally:
-        await engine.dispose()
+    api_app.dependency_overrides[get_db] = override_get_db
+    api_app.include_router(fotos.router, prefix="/api/v1/fotos")
+    return api_app
 
 
 @pytest.mark.asyncio
@@ -74,3 +62,19 @@ async def test_upload_foto_extraccion(test_app):
     assert body["orden"] == 0
     assert body["url"].startswith("http://cloudinary.test/")
     assert body["public_id"] == "fake_public_id"
+
+
+@pytest.mark.asyncio
+async def test_eliminar_fotos(test_app):
+    data = {"entidad_tipo": "extraccion", "entidad_id": "1"}
+
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        ids = []
+        for _ in range(3):
+            files = {"archivo": ("photo.png", io.BytesIO(b"\x89PNG\r\n\x1a\n"), "image/png")}
+            ids.append((await client.post("/api/v1/fotos/", files=files, data=data)).json()["id"])
+
+        assert (await client.delete(f"/api/v1/fotos/{ids[0]}")).status_code == 204
+        assert (await client.get("/api/v1/fotos/extraccion/1")).json()["total"] == 2
+        assert (await client.delete("/api/v1/fotos/extraccion/1")).status_code == 204
+        assert (await client.get("/api/v1/fotos/extraccion/1")).json()["total"] == 0
@@ -0,0 +1,49 @@
+import datetime
+import pytest
+
+from app.infrastructure.database.models import ChequeoGFE, TransferenciaRealizada
+from app.infrastructure.repositories.gfe_repository import GFERepository
+
+
+@pytest.mark.asyncio
+async def test_tasas_prenez_por_dimension(db_session):
+    fresh = TransferenciaRealizada(numero_secuencial=1, toro="Toro A", finalidad="Fresh")
+    vit = TransferenciaRealizada(numero_secuencial=2, toro="Toro B", finalidad="VIT")
+    db_session.add_all([fresh, vit])
+    await db_session.flush()
+
+    chequeos = [
+        (fresh.id, "preñada", datetime.date(2025, 5, 2)),
+        (fresh.id, "preñada", datetime.date(2025, 5, 3)),
+        (vit.id, "vacia", datetime.date(2025, 5, 3)),
+        (None, "preñada", datetime.date(2025, 6, 1)),
+    ]
+    for transferencia_id, estado, fecha in chequeos:
+        db_session.add(
+            ChequeoGFE(
+                transferencia_id=transferencia_id,
+                receptora="R",
+                tecnico_chequeo="Vet",
+                fecha=fecha,
+                cliente="C",
+                estado=estado,
+            )
+        )
+    await db_session.commit()
+
+    repo = GFERepository(db_session)
+
+    por_mes = {f["clave"]: f for f in await repo.get_tasas_prenez("mes")}
+    assert por_mes["2025-05"]["chequeos"] == 3
+    assert por_mes["2025-05"]["tasa_prenez"] == 66.67
+    assert por_mes["2025-06"]["vacias"] == 0
+
+    por_finalidad = {f["clave"]: f for f in await repo.get_tasas_prenez("finalidad")}
+    assert por_finalidad["Fresh"]["tasa_prenez"] == 100.0
+    assert por_finalidad["VIT"]["prenadas"] == 0
+    assert por_finalidad[None]["chequeos"] == 1  # chequeo sin transferencia vinculada
+
+    en_rango = await repo.get_tasas_prenez(
+        "toro", desde=datetime.date(2025, 5, 3), hasta=datetime.date(2025, 5, 31)
+    )
+    assert {f["clave"]: f["chequeos"] for f in en_rango} == {"Toro A": 1, "Toro B": 1}
@@ -0,0 +1,142 @@
+import datetime
+
+import pytest
+from fastapi import FastAPI, File, Form, HTTPException, Response, UploadFile
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.infrastructure.database.models import ClaveIdempotencia
+from app.infrastructure.database.replica import clave_cliente
+from app.infrastructure.repositories.idempotencia_repository import IdempotenciaRepository
+from app.presentation.middleware.idempotencia import IdempotenciaMiddleware, huella_request
+
+
+@pytest.fixture
+async def client(session_factory):
+    llamadas = []
+    app = FastAPI()
+    app.add_middleware(IdempotenciaMiddleware, session_factory=session_factory)
+
+    @app.post("/items", status_code=201)
+    async def crear(item: dict):
+        llamadas.append(item)
+        if item.get("falla"):
+            raise HTTPException(status_code=503, detail="no disponible")
+        return {"id": len(llamadas), **item}
+
+    @app.post("/api/v1/auth/login")
+    async def login(datos: dict):
+        llamadas.append("login")
+        return {"access_token": f"token-{len(llamadas)}", "token_type": "bearer"}
+
+    @app.post("/sesion")
+    async def sesion(response: Response):
+        llamadas.append("sesion")
+        response.set_cookie("sesion", "secreta")
+        return {"ok": True}
+
+    @app.post("/token")
+    async def token():
+        llamadas.append("token")
+        return {"refresh_token": "secreto"}
+
+    @app.post("/fotos")
+    async def subir(archivo: UploadFile = File(...), nota: str = Form("")):
+        llamadas.append(nota)
+        return {"id": len(llamadas), "bytes": len(await archivo.read())}
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        ac.llamadas = llamadas
+        yield ac
+
+
+async def test_reintento_devuelve_respuesta_guardada(client):
+    primera = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+    segunda = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.json() == primera.json() == {"id": 1, "a": 1}
+    assert segunda.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in primera.headers
+    assert segunda.headers["content-type"] == "application/json"
+    assert len(client.llamadas) == 1
+
+    # Sin cabecera o con otra clave se ejecuta normalmente
+    await client.post("/items", json={"a": 1})
+    await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k2"})
+    # Otro usuario con la misma clave no recibe la respuesta ajena
+    otro = await client.post(
+        "/items", json={"a": 1}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer otro"}
+    )
+    assert otro.json()["id"] == 4 and len(client.llamadas) == 4
+
+
+async def test_clave_reutilizada_con_otro_cuerpo(client):
+    await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k"})
+    distinta = await client.post("/items", json={"a": 2}, headers={"Idempotency-Key": "k"})
+    assert distinta.status_code == 422
+    assert len(client.llamadas) == 1
+
+    larga = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "x" * 256})
+    assert larga.status_code == 400
+
+
+async def test_errores_no_se_guardan(client, session_factory):
+    for _ in range(2):
+        respuesta = await client.post("/items", json={"falla": True}, headers={"Idempotency-Key": "k"})
+        assert respuesta.status_code == 503
+    assert len(client.llamadas) == 2
+
+    async with session_factory() as db:
+        assert (await db.execute(select(ClaveIdempotencia))).scalars().all() == []
+
+
+async def test_en_curso_y_reserva_huerfana(client, session_factory):
+    huella = huella_request("POST", "/items", b"", "application/json", b'{"a":1}')
+    alcance = clave_cliente(None, "127.0.0.1")
+    async with session_factory() as db:
+        _, reservada = await IdempotenciaRepository(db).reservar(alcance, "k", huella, "POST", "/items", 24, 120)
+        assert reservada
+
+    en_curso = await client.post(
+        "/items", content=b'{"a":1}', headers={"Idempotency-Key": "k", "Content-Type": "application/json"}
+    )
+    assert en_curso.status_code == 409 and en_curso.headers["retry-after"] == "1"
+    assert client.llamadas == []
+
+    # Reserva de un proceso caído hace más de IDEMPOTENCIA_EN_CURSO_SEGUNDOS: se reemplaza
+    despues = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)
+    async with session_factory() as db:
+        repo = IdempotenciaRepository(db)
+        registro, reservada = await repo.reservar(alcance, "k", huella, "POST", "/items", 24, 120, ahora=despues)
+        assert reservada
+        assert await repo.purgar(ahora=despues + datetime.timedelta(hours=25)) == 1
+
+
+async def test_multipart_ignora_boundary(client):
+    for boundary in ("aaa111", "bbb222"):
+        cuerpo = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"nota\"\r\n\r\nvaca\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"archivo\"; filename=\"f.jpg\"\r\n"
+            f"Content-Type: image/jpeg\r\n\r\nJPEGDATA\r\n--{boundary}--\r\n"
+        ).encode()
+        respuesta = await client.post("/fotos", content=cuerpo, headers={
+            "Idempotency-Key": "foto-1",
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        })
+        assert respuesta.status_code == 200
+        assert respuesta.json() == {"id": 1, "bytes": 8}
+    assert client.llamadas == ["vaca"]
+
+
+async def test_credenciales_no_se_guardan(client, session_factory):
+    for ruta, cuerpo in (("/api/v1/auth/login", {"username": "u"}), ("/sesion", {}), ("/token", {})):
+        for _ in range(2):
+            respuesta = await client.post(ruta, json=cuerpo, headers={"Idempotency-Key": f"k-{ruta}"})
+            assert respuesta.status_code == 200
+            assert "idempotent-replayed" not in respuesta.headers
+
+    # Cada reintento se ejecuta de nuevo y no queda nada en claves_idempotencia
+    assert client.llamadas == ["login", "login", "sesion", "sesion", "token", "token"]
+    async with session_factory() as db:
+        assert (await db.execute(select(ClaveIdempotencia))).scalars().all() == []
@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.json_patch import JsonPatchError, aplicar_patch, parsear_puntero
+
+
+def test_operaciones_rfc6902():
+    documento = {"sesion": {"fecha": "2025-03-01"}, "extracciones": [{"gi": 1}, {"gi": 2}]}
+
+    resultado = aplicar_patch(documento, [
+        {"op": "replace", "path": "/sesion/fecha", "value": "2025-03-02"},
+        {"op": "add", "path": "/extracciones/-", "value": {"gi": 3}},
+        {"op": "remove", "path": "/extracciones/0"},
+        {"op": "copy", "from": "/extracciones/0", "path": "/ultima"},
+        {"op": "move", "from": "/ultima", "path": "/sesion/copia"},
+        {"op": "add", "path": "/a~1b", "value": True},
+        {"op": "test", "path": "/extracciones/1/gi", "value": 3},
+    ])
+
+    assert resultado == {
+        "sesion": {"fecha": "2025-03-02", "copia": {"gi": 2}},
+        "extracciones": [{"gi": 2}, {"gi": 3}],
+        "a/b": True,
+    }
+    # El original no se modifica
+    assert documento["extracciones"] == [{"gi": 1}, {"gi": 2}]
+
+
+@pytest.mark.parametrize("operaciones", [
+    [{"op": "remove", "path": "/no_existe"}],
+    [{"op": "replace", "path": "/lista/5", "value": 1}],
+    [{"op": "add", "path": "/lista/01", "value": 1}],
+    [{"op": "test", "path": "/x", "value": 2}],
+    [{"op": "move", "from": "/lista", "path": "/lista/0"}],
+    [{"op": "borrar", "path": "/x"}],
+    [{"op": "add", "path": "x", "value": 1}],
+    [{"op": "add", "path": "/x/y", "value": 1}],
+])
+def test_patch_invalido(operaciones):
+    with pytest.raises(JsonPatchError):
+        aplicar_patch({"x": 1, "lista": [0]}, operaciones)
+
+
+def test_puntero_escapes():
+    assert parsear_puntero("") == []
+    assert parsear_puntero("/a~1b/~0c/") == ["a/b", "~c", ""]
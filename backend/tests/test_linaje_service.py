@@ -0,0 +1,99 @@
+import datetime
+import pytest
+
+from app.application.services.linaje_service import LinajeService
+from app.infrastructure.database.models import (
+    ChequeoGFE,
+    Donadora,
+    ExtraccionDonadora,
+    Fecundacion,
+    SesionOPU,
+    TransferenciaRealizada,
+)
+
+
+@pytest.mark.asyncio
+async def test_reporte_linaje_calcula_tasas_por_etapa(db_session):
+    dona = Donadora(
+        nombre="Dona",
+        numero_registro="L-1",
+        raza="Gyr",
+        tipo_ganado="leche",
+        propietario_nombre="Owner",
+    )
+    sesion = SesionOPU(
+        fecha=datetime.date(2025, 4, 1),
+        tecnico_opu="Ana",
+        tecnico_busqueda="Luis",
+        cliente="C",
+        finalidad="fresco",
+    )
+    db_session.add_all([dona, sesion])
+    await db_session.flush()
+
+    ext = ExtraccionDonadora(
+        sesion_opu_id=sesion.id,
+        donadora_id=dona.id,
+        numero_secuencial=1,
+        grado_1=6,
+        grado_2=4,
+        grado_3=0,
+        desnudos=0,
+        irregular=0,
+    )
+    # Segunda extracción que no pasó a fecundación
+    sin_fecundar = ExtraccionDonadora(
+        sesion_opu_id=sesion.id, donadora_id=dona.id, numero_secuencial=2, grado_1=5,
+        grado_2=0, grado_3=0, desnudos=0, irregular=0,
+    )
+    db_session.add_all([ext, sin_fecundar])
+    await db_session.flush()
+
+    db_session.add(
+        Fecundacion(
+            extraccion_donadora_id=ext.id,
+            laboratorista="Lab",
+            fecha_inicio_maduracion=datetime.date(2025, 4, 1),
+        )
+    )
+    transferencias = [
+        TransferenciaRealizada(numero_secuencial=i, donadora_id=dona.id, fecha=datetime.date(2025, 4, 8))
+        for i in range(1, 5)
+    ]
+    db_session.add_all(transferencias)
+    await db_session.flush()
+
+    for t, estado in zip(transferencias, ["preñada", "vacia", "preñada"]):
+        db_session.add(
+            ChequeoGFE(
+                transferencia_id=t.id,
+                receptora=f"R{t.id}",
+                tecnico_chequeo="Vet",
+                fecha=datetime.date(2025, 5, 20),
+                cliente="C",
+                estado=estado,
+            )
+        )
+    await db_session.commit()
+
+    reporte = await LinajeService(db_session).reporte(sesion_opu_id=sesion.id)
+
+    [fila] = reporte["donadoras"]
+    assert fila["nombre"] == "Dona"
+    assert (fila["ovocitos"], fila["fecundaciones"], fila["transferencias"]) == (15, 1, 4)
+    assert (fila["chequeadas"], fila["prenadas"]) == (3, 2)
+    assert fila["ovocitos_fecundados"] == 10
+    assert fila["tasas"] == {
+        "tasa_fecundacion": 66.67,
+        "transferencias_por_ovocito_fecundado": 40.0,
+        "transferencias_por_ovocito": 26.67,
+        "tasa_chequeo": 75.0,
+        "tasa_prenez": 66.67,
+        "prenadas_por_ovocito": 13.33,
+    }
+    assert reporte["totales"]["prenadas"] == 2
+
+    # Un rango sin actividad no tiene base para las tasas
+    vacio = await LinajeService(db_session).reporte(hasta=datetime.date(2025, 3, 1))
+    assert vacio["donadoras"] == []
+    assert vacio["totales"]["tasas"]["tasa_prenez"] is None
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI, Response
+from httpx import AsyncClient
+
+from app.core import metrics
+from app.core.metrics import Registro
+from app.presentation.middleware.metrics import MetricsMiddleware
+
+
+def test_histograma_formato_prometheus():
+    registro = Registro()
+    latencia = registro.histogram("latencia_seconds", "Latencia", ("ruta",), buckets=(0.1, 1.0))
+    latencia.observe("/a", valor=0.05)
+    latencia.observe("/a", valor=0.5)
+    latencia.observe("/a", valor=3)
+
+    texto = registro.exponer()
+    assert "# TYPE latencia_seconds histogram" in texto
+    assert 'latencia_seconds_bucket{ruta="/a",le="0.1"} 1' in texto
+    assert 'latencia_seconds_bucket{ruta="/a",le="1"} 2' in texto
+    assert 'latencia_seconds_bucket{ruta="/a",le="+Inf"} 3' in texto
+    assert 'latencia_seconds_count{ruta="/a"} 3' in texto
+
+
+@pytest.mark.asyncio
+async def test_middleware_agrupa_por_plantilla_de_ruta():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    async def metrics_endpoint():
+        return Response(content=metrics.registro.exponer(), media_type=metrics.CONTENT_TYPE)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+        await client.get("/no-existe")
+        resp = await client.get("/metrics")
+
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{metodo="GET",ruta="/items/{item_id}",status="200"} 2' in resp.text
+    assert 'http_requests_total{metodo="GET",ruta="sin_ruta",status="404"} 1' in resp.text
+    assert "http_requests_in_flight 1" in resp.text
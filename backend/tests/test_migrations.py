@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.database import models  # noqa: F401
+from app.infrastructure.database.connection import Base
+from app.infrastructure.database.migrations import (
+    descubrir_migraciones,
+    dividir_sentencias,
+    migrar,
+    versiones_aplicadas,
+)
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", future=True)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    directorio = tmp_path / "migrations"
+    directorio.mkdir()
+    (directorio / "001_legacy.sql").write_text("ALTER TABLE no_existe ADD COLUMN x INTEGER;")
+    (directorio / "002_indice.sql").write_text(
+        "-- Migracion de prueba\nCREATE INDEX IF NOT EXISTS ix_prueba ON donadoras (propietario_nombre);"
+    )
+    (directorio / "002_indice.postgresql.sql").write_text(
+        "-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY IF NOT EXISTS ix_prueba ON donadoras (propietario_nombre);"
+    )
+    (directorio / "003_solo_pg.postgresql.sql").write_text("SELECT pg_sleep(0);")
+    return directorio
+
+
+def test_dividir_sentencias_respeta_literales_y_comentarios():
+    sql = """
+    -- comentario; con punto y coma
+    INSERT INTO t (a) VALUES ('x;y'), ('it''s');
+    /* bloque; */ UPDATE t SET "col;umna" = 1;
+    CREATE FUNCTION f() RETURNS void AS $body$ BEGIN PERFORM 1; END; $body$ LANGUAGE plpgsql
+    """
+    assert dividir_sentencias(sql) == [
+        "INSERT INTO t (a) VALUES ('x;y'), ('it''s')",
+        'UPDATE t SET "col;umna" = 1',
+        "CREATE FUNCTION f() RETURNS void AS $body$ BEGIN PERFORM 1; END; $body$ LANGUAGE plpgsql",
+    ]
+
+
+def test_descubrir_resuelve_variantes_por_dialecto(directorio):
+    sqlite = {m.version: m for m in descubrir_migraciones("sqlite", directorio)}
+    postgres = {m.version: m for m in descubrir_migraciones("postgresql", directorio)}
+
+    assert sqlite["002"].ruta.name == "002_indice.sql"
+    assert not sqlite["002"].sin_transaccion
+    assert postgres["002"].ruta.name == "002_indice.postgresql.sql"
+    assert postgres["002"].sin_transaccion
+    assert sqlite["003"].ruta is None
+
+
+@pytest.mark.asyncio
+async def test_bd_nueva_crea_esquema_y_marca_versiones(engine, directorio):
+    ejecutadas = await migrar(engine, Base.metadata, directorio)
+
+    assert ejecutadas == []
+    assert await versiones_aplicadas(engine) == ["001", "002", "003"]
+    async with engine.connect() as conn:
+        tablas = await conn.run_sync(lambda c: inspect(c).get_table_names())
+    assert "donadoras" in tablas
+
+    # Segundo arranque: nada pendiente
+    assert await migrar(engine, Base.metadata, directorio) == []
+
+
+@pytest.mark.asyncio
+async def test_bd_existente_marca_base_y_aplica_siguientes(engine, directorio):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    ejecutadas = await migrar(engine, Base.metadata, directorio, version_base="001")
+
+    assert ejecutadas == ["002", "003"]
+    async with engine.connect() as conn:
+        indices = await conn.run_sync(lambda c: inspect(c).get_indexes("donadoras"))
+        assert "ix_prueba" in {i["name"] for i in indices}
+        total = await conn.execute(text("SELECT count(*) FROM schema_migrations"))
+        assert total.scalar() == 3
@@ -1,29 +1,11 @@
 import datetime
 import pytest
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
 
-from app.infrastructure.database.connection import Base
 from app.infrastructure.database.models import SesionOPU, Donadora
 from app.infrastructure.repositories.opu_repository import OPURepository
 
 
-@pytest.fixture
-async def db_session():
-    """
-    Crea una BD SQLite en memoria para cada test y entrega una AsyncSession.
-    """
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
-    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with async_session() as session:
-        yield session
-
-    await engine.dispose()
-
-
 def _extr_base(numero):
     """Datos base para una extracción con secuencial dado."""
     return {
@@ -123,3 +105,127 @@ async def test_update_syncs_extracciones_without_recreate(db_session):
     assert updated2.cliente == "Cliente 3"
     assert len(updated2.extracciones_donadoras) == 1
     assert updated2.extracciones_donadoras[0].id == original_id
+
+
+@pytest.mark.asyncio
+# El id de una extracción eliminada se reutiliza en el mismo update
+@pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+async def test_update_reporta_cambios_por_extraccion(db_session):
+    donadora = Donadora(
+        nombre="Dona",
+        numero_registro="R-2",
+        raza="Brahman",
+        tipo_ganado="carne",
+        propietario_nombre="Owner",
+        activo=True,
+    )
+    db_session.add(donadora)
+    await db_session.commit()
+
+    repo = OPURepository(db_session)
+    created = await repo.create_with_extracciones(
+        SesionOPU(
+            fecha=datetime.date.today(),
+            tecnico_opu="Tec OPU",
+            tecnico_busqueda="Tec Bus",
+            cliente="Cliente 1",
+            finalidad="fresco",
+        ),
+        [
+            {**_extr_base(1), "donadora_id": donadora.id},
+            {**_extr_base(2), "donadora_id": donadora.id},
+            {**_extr_base(3), "donadora_id": donadora.id},
+        ],
+    )
+    ids = {e.numero_secuencial: e.id for e in created.extracciones_donadoras}
+
+    # 1 sin cambios, 2 modificada, 3 eliminada, 4 nueva
+    updated = await repo.update(
+        created,
+        {},
+        [
+            {"id": ids[1], **_extr_base(1), "donadora_id": donadora.id},
+            {"id": ids[2], **_extr_base(2), "grado_1": 7, "donadora_id": donadora.id},
+            {**_extr_base(4), "donadora_id": donadora.id},
+        ],
+    )
+
+    cambios = {c["numero_secuencial"]: c for c in updated.cambios}
+    assert cambios[1]["accion"] == "sin_cambios"
+    assert cambios[2] == {"id": ids[2], "numero_secuencial": 2, "accion": "actualizada", "campos": ["grado_1"]}
+    assert cambios[3]["accion"] == "eliminada"
+    assert cambios[4]["accion"] == "creada" and cambios[4]["id"] is not None
+
+    por_numero = {e.numero_secuencial: e for e in updated.extracciones_donadoras}
+    assert sorted(por_numero) == [1, 2, 4]
+    assert por_numero[2].grado_1 == 7
+    assert por_numero[4].id == cambios[4]["id"]
+
+
+def test_changeset_postgres_usa_update_from_values():
+    from sqlalchemy.dialects import postgresql
+    from app.infrastructure.repositories.extraccion_changeset import (
+        sentencia_delete,
+        sentencias_update,
+    )
+
+    sentencias = sentencias_update(
+        {1: {"grado_1": 3}, 2: {"grado_1": 5}, 3: {"toro_a": "X"}},
+        "postgresql",
+    )
+    assert len(sentencias) == 2  # agrupadas por columnas cambiadas
+
+    sql = str(sentencias[0][0].compile(dialect=postgresql.dialect()))
+    assert "FROM (VALUES" in sql
+    assert "SET grado_1=CAST(v.grado_1 AS INTEGER)" in sql
+
+    sql_delete = str(sentencia_delete([1, 2]).compile(dialect=postgresql.dialect()))
+    assert "DELETE FROM extraccion_donadoras WHERE extraccion_donadoras.id IN" in sql_delete
+
+
+@pytest.mark.asyncio
+async def test_get_resumenes_agrega_totales_en_sql(db_session, engine):
+    donadoras = [
+        Donadora(
+            nombre=f"Dona {i}",
+            numero_registro=f"RS-{i}",
+            raza="Brahman",
+            tipo_ganado="carne",
+            propietario_nombre="Owner",
+            activo=True,
+        )
+        for i in range(2)
+    ]
+    db_session.add_all(donadoras)
+    await db_session.commit()
+
+    repo = OPURepository(db_session)
+    base = dict(tecnico_opu="Tec", tecnico_busqueda="Bus", cliente="C", finalidad="fresco")
+    await repo.create_with_extracciones(
+        SesionOPU(fecha=datetime.date(2025, 1, 10), **base),
+        [
+            {**_extr_base(1), "donadora_id": donadoras[0].id},
+            {**_extr_base(2), "donadora_id": donadoras[1].id, "desnudos": 4},
+        ],
+    )
+    await repo.create_with_extracciones(SesionOPU(fecha=datetime.date(2025, 1, 5), **base), [])
+
+    resumenes = await repo.get_resumenes()
+
+    assert [r["fecha"] for r in resumenes] == [datetime.date(2025, 1, 10), datetime.date(2025, 1, 5)]
+    assert resumenes[0]["total_donadoras"] == 2
+    assert resumenes[0]["grado_3"] == 6
+    assert resumenes[0]["desnudos"] == 4
+    assert resumenes[0]["total_ovocitos"] == 16
+    assert resumenes[1]["total_donadoras"] == 0
+    assert resumenes[1]["total_ovocitos"] == 0
+
+    # Paginado: el GROUP BY solo agrega las sesiones de la página
+    sentencias = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, sql, *args: sentencias.append(sql))
+    [segunda] = await repo.get_resumenes(skip=1, limit=1)
+    [primera] = await repo.get_resumenes(skip=0, limit=1)
+
+    assert (segunda["fecha"], segunda["total_ovocitos"]) == (datetime.date(2025, 1, 5), 0)
+    assert (primera["fecha"], primera["total_ovocitos"]) == (datetime.date(2025, 1, 10), 16)
+    assert all("extraccion_donadoras.sesion_opu_id IN (SELECT pagina.id" in sql for sql in sentencias)
@@ -0,0 +1,117 @@
+import datetime
+import pytest
+from sqlalchemy import select
+
+from app.infrastructure.database.models import Donadora, ResumenProduccionOPU, SesionOPU
+from app.infrastructure.repositories.opu_repository import OPURepository
+from app.infrastructure.repositories.produccion_repository import ProduccionRepository
+
+
+def _extr(numero, donadora_id, toro_a="Toro A", toro_b=None, grado_1=1):
+    return {
+        "numero_secuencial": numero,
+        "donadora_id": donadora_id,
+        "toro_a": toro_a,
+        "toro_b": toro_b,
+        "grado_1": grado_1,
+        "grado_2": 1,
+        "grado_3": 0,
+        "desnudos": 0,
+        "irregular": 0,
+    }
+
+
+async def _donadora(db, registro):
+    donadora = Donadora(
+        nombre=f"Dona {registro}",
+        numero_registro=registro,
+        raza="Gyr",
+        tipo_ganado="leche",
+        propietario_nombre="Owner",
+        activo=True,
+    )
+    db.add(donadora)
+    await db.commit()
+    return donadora
+
+
+@pytest.mark.asyncio
+async def test_resumen_se_refresca_con_cambios_de_sesion(db_session):
+    d1 = await _donadora(db_session, "P-1")
+    d2 = await _donadora(db_session, "P-2")
+    repo = OPURepository(db_session)
+    produccion = ProduccionRepository(db_session)
+
+    sesion = await repo.create_with_extracciones(
+        SesionOPU(
+            fecha=datetime.date(2025, 3, 1),
+            tecnico_opu="Ana",
+            tecnico_busqueda="Luis",
+            cliente="Cliente 1",
+            hacienda="La Esperanza",
+            finalidad="fresco",
+        ),
+        [_extr(1, d1.id, grado_1=5), _extr(2, d2.id, toro_a="Toro A", toro_b="Toro B")],
+    )
+
+    por_donadora = {f["etiqueta"]: f for f in await produccion.rendimiento("donadora")}
+    assert por_donadora["Dona P-1"]["total_ovocitos"] == 6
+    assert por_donadora["Dona P-2"]["total_ovocitos"] == 2
+
+    por_toro = {f["clave"]: f for f in await produccion.rendimiento("toro")}
+    assert por_toro["Toro A"]["extracciones"] == 2
+    assert por_toro["Toro B"]["total_ovocitos"] == 2
+
+    # Cambiar el cliente mueve la partición; el resumen viejo desaparece
+    ext_ids = {e.numero_secuencial: e.id for e in sesion.extracciones_donadoras}
+    await repo.update(
+        sesion,
+        {"cliente": "Cliente 2"},
+        [{"id": ext_ids[1], **_extr(1, d1.id, grado_1=9)}],
+    )
+
+    assert await produccion.rendimiento("donadora", cliente="Cliente 1") == []
+    filas = await produccion.rendimiento("mes", cliente="Cliente 2")
+    assert filas[0]["clave"] == "2025-03"
+    assert filas[0]["total_ovocitos"] == 10
+
+    await repo.delete(sesion)
+    result = await db_session.execute(select(ResumenProduccionOPU))
+    assert result.scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_rendimiento_filtra_por_rango_de_fechas(db_session):
+    d1 = await _donadora(db_session, "P-3")
+    repo = OPURepository(db_session)
+    for dia in (1, 15, 28):
+        await repo.create_with_extracciones(
+            SesionOPU(
+                fecha=datetime.date(2025, 2, dia),
+                tecnico_opu="Ana",
+                tecnico_busqueda="Luis",
+                cliente="C",
+                finalidad="fresco",
+            ),
+            [_extr(1, d1.id)],
+        )
+
+    produccion = ProduccionRepository(db_session)
+    filas = await produccion.rendimiento(
+        "tecnico", desde=datetime.date(2025, 2, 10), hasta=datetime.date(2025, 2, 28)
+    )
+    assert filas == [{
+        "clave": "Ana",
+        "etiqueta": "Ana",
+        "extracciones": 2,
+        "grado_1": 2,
+        "grado_2": 2,
+        "grado_3": 0,
+        "desnudos": 0,
+        "irregular": 0,
+        "total_ovocitos": 4,
+        "promedio_ovocitos": 2.0,
+    }]
+
+    # La reconstrucción completa produce el mismo resumen
+    assert await produccion.reconstruir() == 3
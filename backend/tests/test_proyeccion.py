@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.application.schemas.opu_schema import SesionOPUResponse
+from app.core.proyeccion import esquema_parcial, resolver_proyeccion
+from app.infrastructure.database.models import Donadora, ExtraccionDonadora, SesionOPU
+from app.presentation.api.v1.endpoints import opu
+
+
+def test_resolver_proyeccion():
+    completa = resolver_proyeccion(SesionOPUResponse, ["extracciones"])
+    assert completa.completa and completa.esquema is SesionOPUResponse
+
+    cabecera = resolver_proyeccion(SesionOPUResponse, ["extracciones"], fields="fecha,cliente")
+    assert cabecera.campos == {"id", "fecha", "cliente"}
+    assert cabecera.colecciones == frozenset()
+    assert cabecera.esquema is esquema_parcial(SesionOPUResponse, cabecera.campos)
+
+    con_extracciones = resolver_proyeccion(SesionOPUResponse, ["extracciones"], fields="fecha", include="extracciones")
+    assert con_extracciones.campos == {"id", "fecha", "extracciones"}
+
+    sin_colecciones = resolver_proyeccion(SesionOPUResponse, ["extracciones"], include="")
+    assert "extracciones" not in sin_colecciones.campos and "cliente" in sin_colecciones.campos
+
+    with pytest.raises(HTTPException) as error:
+        resolver_proyeccion(SesionOPUResponse, ["extracciones"], fields="fecha,clave", include="otra")
+    assert error.value.status_code == 400
+    assert "clave, otra" in error.value.detail["mensaje"]
+
+
+@pytest.fixture
+async def client(api_app, engine, session_factory):
+    sentencias = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, sql, *args: sentencias.append(sql))
+    async with session_factory() as db:
+        donadora = Donadora(nombre="D", numero_registro="R", raza="Gyr", tipo_ganado="leche", propietario_nombre="P")
+        db.add(donadora)
+        await db.flush()
+        for i in range(2):
+            sesion = SesionOPU(
+                fecha=datetime.date(2024, 1, 1 + i), tecnico_opu="T", tecnico_busqueda="B",
+                cliente=f"C{i}", finalidad="fresco",
+            )
+            db.add(sesion)
+            await db.flush()
+            db.add(ExtraccionDonadora(sesion_opu_id=sesion.id, donadora_id=donadora.id, numero_secuencial=1))
+        await db.commit()
+
+    api_app.include_router(opu.router, prefix="/opu")
+
+    async with AsyncClient(app=api_app, base_url="http://test") as ac:
+        ac.sentencias = sentencias
+        yield ac
+
+
+async def _get(client, ruta, **params):
+    client.sentencias.clear()
+    resp = await client.get(ruta, params=params)
+    return resp, [sql for sql in client.sentencias if "versiones_entidad" not in sql]
+
+
+@pytest.mark.asyncio
+async def test_listado_opu_con_fields_no_carga_extracciones(client):
+    completa, sentencias_completa = await _get(client, "/opu/")
+    assert completa.status_code == 200
+    assert len(completa.json()[0]["extracciones"]) == 1
+
+    cabecera, sentencias_cabecera = await _get(client, "/opu/", fields="fecha,cliente")
+    assert cabecera.json() == [
+        {"id": 2, "fecha": "2024-01-02", "cliente": "C1"},
+        {"id": 1, "fecha": "2024-01-01", "cliente": "C0"},
+    ]
+    # Sin selectinload de extracciones y solo las columnas pedidas
+    assert any("extraccion_donadoras" in sql for sql in sentencias_completa)
+    assert len(sentencias_cabecera) == 1
+    assert "observaciones" not in sentencias_cabecera[0] and "cliente" in sentencias_cabecera[0]
+    assert cabecera.headers["etag"] != completa.headers["etag"]
+
+    con_extracciones = (await client.get("/opu/1", params={"fields": "cliente", "include": "extracciones"})).json()
+    assert set(con_extracciones) == {"id", "cliente", "extracciones"}
+    assert con_extracciones["extracciones"][0]["numero_secuencial"] == 1
+
+    assert (await client.get("/opu/", params={"fields": "nada"})).status_code == 400
@@ -0,0 +1,111 @@
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import Settings
+from app.core.dependencies import get_db, get_read_db
+from app.infrastructure.database import connection
+from app.infrastructure.database.connection import Base, crear_engines
+from app.infrastructure.database.models import Donadora
+from app.infrastructure.database.replica import EnrutadorLecturas
+
+
+@pytest.fixture
+async def test_app(tmp_path, monkeypatch):
+    # Dos archivos SQLite sin replicación: lo escrito en el primario no aparece en la "réplica"
+    urls = [f"sqlite+aiosqlite:///{tmp_path / nombre}" for nombre in ("primario.db", "replica.db")]
+    for url in urls:
+        esquema = create_async_engine(url)
+        async with esquema.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await esquema.dispose()
+
+    primario, replica = crear_engines(urls[0], Settings(ENVIRONMENT="test"), replica_url=urls[1])
+
+    enrutador = EnrutadorLecturas(
+        async_sessionmaker(primario, class_=AsyncSession, expire_on_commit=False),
+        async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False),
+        ventana_segundos=60,
+        con_replica=True,
+    )
+    monkeypatch.setattr(connection, "enrutador_lecturas", enrutador)
+
+    app = FastAPI()
+
+    @app.post("/donadoras")
+    async def crear(db: AsyncSession = Depends(get_db)):
+        db.add(Donadora(nombre="Lola", numero_registro="R1", raza="Gyr", tipo_ganado="leche", propietario_nombre="P"))
+        await db.commit()
+        return {"ok": True}
+
+    @app.get("/donadoras/total")
+    async def total(db: AsyncSession = Depends(get_read_db)):
+        return {"total": await db.scalar(select(func.count(Donadora.id)))}
+
+    app.state.enrutador = enrutador
+    try:
+        yield app
+    finally:
+        await replica.dispose()
+        await primario.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lecturas_van_a_la_replica_salvo_tras_escribir(test_app):
+    autor = {"Authorization": "Bearer autor"}
+    otro = {"Authorization": "Bearer otro"}
+
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        assert (await client.post("/donadoras", headers=autor)).status_code == 200
+
+        # El autor lee su propia escritura desde el primario
+        assert (await client.get("/donadoras/total", headers=autor)).json() == {"total": 1}
+        # Otro cliente lee de la réplica (con retraso)
+        assert (await client.get("/donadoras/total", headers=otro)).json() == {"total": 0}
+
+        # Vencida la ventana, el autor vuelve a la réplica
+        test_app.state.enrutador.ventana = 0
+        test_app.state.enrutador._escrituras.clear()
+        assert (await client.get("/donadoras/total", headers=autor)).json() == {"total": 0}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_sin_replica_no_desvia_lecturas_al_escritor(tmp_path, monkeypatch):
+    # Como en el arranque por defecto: SQLite en archivo, escritor único y lectores query_only
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+    config = Settings(ENVIRONMENT="test", SQLITE_TUNING=True, SQLITE_WRITE_TIMEOUT=1)
+    escritor, lector = crear_engines(url, config)
+    async with escritor.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    enrutador = EnrutadorLecturas(
+        async_sessionmaker(escritor, class_=AsyncSession, expire_on_commit=False),
+        async_sessionmaker(lector, class_=AsyncSession, expire_on_commit=False),
+        ventana_segundos=60,
+    )
+    monkeypatch.setattr(connection, "enrutador_lecturas", enrutador)
+    assert connection.enrutador_lecturas.con_replica is False
+
+    async def usuario(db: AsyncSession = Depends(get_read_db)):
+        # Como get_current_user: una lectura abierta durante todo el request
+        await db.scalar(select(func.count(Donadora.id)))
+
+    app = FastAPI()
+
+    @app.post("/donadoras", status_code=201, dependencies=[Depends(usuario)])
+    async def crear(numero: str, db: AsyncSession = Depends(get_db)):
+        db.add(Donadora(nombre="L", numero_registro=numero, raza="Gyr", tipo_ganado="leche", propietario_nombre="P"))
+        await db.commit()
+        return {"ok": True}
+
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            autor = {"Authorization": "Bearer autor"}
+            for numero in ("R1", "R2"):
+                respuesta = await client.post("/donadoras", params={"numero": numero}, headers=autor)
+                assert respuesta.status_code == 201
+    finally:
+        await lector.dispose()
+        await escritor.dispose()
@@ -0,0 +1,37 @@
+"""
+Auditoría de índices del esquema
+
+Falla si la columna FK de una relación declarada no encabeza ningún índice
+(ni PK ni UNIQUE): los selectinload y joins por esa relación harían un
+scan completo de la tabla.
+"""
+from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint
+from sqlalchemy.orm import configure_mappers
+
+from app.infrastructure.database import models  # noqa: F401 - registra los mappers
+from app.infrastructure.database.connection import Base
+
+
+def _columnas_indexadas(tabla):
+    """Primera columna de cada índice, PK o restricción UNIQUE de la tabla"""
+    primeras = set()
+    for index in tabla.indexes:
+        primeras.add(list(index.columns)[0].name)
+    for constraint in tabla.constraints:
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint)) and constraint.columns:
+            primeras.add(list(constraint.columns)[0].name)
+    return primeras
+
+
+def test_fk_de_relaciones_indexadas():
+    configure_mappers()
+    faltantes = set()
+
+    for mapper in Base.registry.mappers:
+        for relacion in mapper.relationships:
+            for local, remota in relacion.local_remote_pairs:
+                for columna in (local, remota):
+                    if columna.foreign_keys and columna.name not in _columnas_indexadas(columna.table):
+                        faltantes.add(f"{columna.table.name}.{columna.name}")
+
+    assert not faltantes, f"FK de relaciones sin índice: {sorted(faltantes)}"
@@ -0,0 +1,63 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+
+from app.application.schemas.donadora_schema import DonadoraResponse
+from app.core.serializacion import adaptador_lista, lista_json, serializar_json
+from app.infrastructure.database.models import Donadora
+from app.presentation.api.v1.endpoints import donadoras
+
+
+def _donadora(i):
+    return Donadora(
+        id=i, nombre=f"D{i}", numero_registro=f"R{i}", raza="Gyr", tipo_ganado="leche",
+        propietario_nombre="P", peso_kg=450.5, activo=True, fecha_creacion=datetime(2024, 1, i),
+    )
+
+
+def test_lista_json_equivale_al_camino_clasico():
+    filas = [_donadora(i) for i in range(1, 4)]
+    clasico = jsonable_encoder([DonadoraResponse.model_validate(f) for f in filas])
+
+    assert json.loads(lista_json(DonadoraResponse, filas)) == clasico
+    assert adaptador_lista(DonadoraResponse) is adaptador_lista(DonadoraResponse)
+
+
+def test_serializar_json_valores_sueltos():
+    assert serializar_json(b"[1]") == b"[1]"
+    assert json.loads(serializar_json({"total": Decimal("2.5"), 3: "x"})) == {"total": 2.5, "3": "x"}
+    modelo = DonadoraResponse.model_validate(_donadora(1))
+    assert json.loads(serializar_json(modelo)) == jsonable_encoder(modelo)
+
+
+@pytest.fixture
+async def client(api_app, session_factory):
+    async with session_factory() as db:
+        db.add_all([_donadora(i) for i in range(1, 6)])
+        await db.commit()
+    api_app.include_router(donadoras.router, prefix="/donadoras")
+
+    async with AsyncClient(app=api_app, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_listado_donadoras_serializado_conserva_forma_y_etag(client):
+    resp = await client.get("/donadoras/", params={"limit": 2})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert "etag" in resp.headers
+
+    cuerpo = resp.json()
+    assert {k: cuerpo[k] for k in ("total", "page", "limit", "total_pages")} == {
+        "total": 5, "page": 1, "limit": 2, "total_pages": 3,
+    }
+    assert len(cuerpo["donadoras"]) == 2
+    assert set(cuerpo["donadoras"][0]) == set(DonadoraResponse.model_fields)
+
+    # Acierto de caché: mismos bytes
+    assert (await client.get("/donadoras/", params={"limit": 2})).content == resp.content
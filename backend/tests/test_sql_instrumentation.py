@@ -0,0 +1,137 @@
+import json
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.database.instrumentation import (
+    ConsultasRepetidasError,
+    ConsultasRepetidasWarning,
+    capturar_plan,
+    instrumentar_engine,
+)
+from app.infrastructure.database.models import Donadora
+from app.presentation.middleware.sql_metrics import SQLMetricsMiddleware
+
+
+@pytest.fixture
+def test_app(engine, session_factory):
+    instrumentar_engine(engine)
+
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.add_middleware(SQLMetricsMiddleware)
+
+    @app.get("/consultas/{n}")
+    async def consultas(n: int, db: AsyncSession = Depends(get_session)):
+        for i in range(n):
+            await db.execute(select(Donadora.id).where(Donadora.id == i))
+        return {"ok": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_server_timing_cuenta_sentencias(test_app):
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        resp = await client.get("/consultas/3")
+
+    assert resp.status_code == 200
+    timing = resp.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="3 queries"' in timing
+
+
+@pytest.mark.asyncio
+async def test_detecta_n_mas_1(test_app, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "test")
+    monkeypatch.setattr(settings, "SQL_NPLUS1_UMBRAL", 5)
+
+    async with AsyncClient(app=test_app, base_url="http://test") as client:
+        with pytest.warns(ConsultasRepetidasWarning):
+            resp = await client.get("/consultas/5")
+        assert resp.status_code == 200
+
+        monkeypatch.setattr(settings, "SQL_NPLUS1_ERROR", True)
+        with pytest.raises(ConsultasRepetidasError):
+            await client.get("/consultas/5")
+
+
+@pytest.mark.asyncio
+async def test_log_de_sentencias_lentas_con_plan(engine, monkeypatch, caplog):
+    from app.infrastructure.repositories.donadora_repository import DonadoraRepository
+
+    instrumentar_engine(engine)
+    monkeypatch.setattr(settings, "SQL_SLOW_MS", 0.000001)
+    monkeypatch.setattr(settings, "SQL_SLOW_EXPLAIN", True)
+    async with AsyncSession(engine) as db:
+        with caplog.at_level("WARNING", logger="app.sql.lentas"):
+            await DonadoraRepository(db).search("lola")
+
+    registros = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.sql.lentas"]
+    assert registros
+    lenta = registros[-1]
+    assert lenta["origen"] == "donadora_repository.DonadoraRepository.search"
+    assert "lola" not in json.dumps(lenta["parametros"])
+    assert all(tipo == "str" for tipo in lenta["parametros"])
+    assert lenta["plan"]
+
+
+class _CursorPostgres:
+    def __init__(self, ejecutadas, falla):
+        self.ejecutadas = ejecutadas
+        self.falla = falla
+
+    def execute(self, sql, parametros=None):
+        self.ejecutadas.append(sql.split(" SELECT")[0])
+        if sql.startswith("EXPLAIN") and self.falla:
+            raise RuntimeError("permiso denegado")
+
+    def fetchall(self):
+        return [("Seq Scan on donadoras",)]
+
+    def close(self):
+        pass
+
+
+class _ConexionPostgres:
+    def __init__(self, falla=False):
+        self.ejecutadas = []
+        self.dialect = type("Dialecto", (), {"name": "postgresql"})()
+        self.connection = type("DBAPI", (), {"cursor": lambda _: _CursorPostgres(self.ejecutadas, falla)})()
+
+
+def test_plan_postgres_en_savepoint_revertido():
+    conn = _ConexionPostgres()
+    assert capturar_plan(conn, "SELECT * FROM donadoras", ()) == ["Seq Scan on donadoras"]
+    assert conn.ejecutadas == [
+        "SAVEPOINT plan_sql_lenta", "EXPLAIN",
+        "ROLLBACK TO SAVEPOINT plan_sql_lenta", "RELEASE SAVEPOINT plan_sql_lenta",
+    ]
+
+    # ANALYZE solo a pedido
+    conn = _ConexionPostgres()
+    capturar_plan(conn, "SELECT * FROM donadoras", (), analizar=True)
+    assert conn.ejecutadas[1] == "EXPLAIN (ANALYZE, BUFFERS)"
+
+    # Un EXPLAIN fallido no deja la transacción del request abortada
+    conn = _ConexionPostgres(falla=True)
+    with pytest.raises(RuntimeError):
+        capturar_plan(conn, "SELECT * FROM donadoras", ())
+    assert conn.ejecutadas[-2:] == ["ROLLBACK TO SAVEPOINT plan_sql_lenta", "RELEASE SAVEPOINT plan_sql_lenta"]
+
+
+@pytest.mark.asyncio
+async def test_sentencia_fallida_no_deja_inicio_pendiente(engine):
+    instrumentar_engine(engine)
+    async with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM no_existe"))
+        await conn.execute(text("SELECT 1"))
+        assert conn.sync_connection.info["inicio_sql"] == []
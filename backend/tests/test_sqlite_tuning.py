@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings
+from app.infrastructure.database.connection import Base, crear_engines
+from app.infrastructure.database.models import Donadora
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    config = Settings(ENVIRONMENT="test", SQLITE_READ_POOL_SIZE=2, SQLITE_WRITE_TIMEOUT=10)
+    escritor, lector = crear_engines(f"sqlite+aiosqlite:///{tmp_path / 'granja.db'}", config)
+    async with escritor.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield escritor, lector
+    finally:
+        await lector.dispose()
+        await escritor.dispose()
+
+
+def _donadora(numero):
+    return Donadora(
+        nombre=f"D{numero}",
+        numero_registro=f"R{numero}",
+        raza="Brahman",
+        tipo_ganado="carne",
+        propietario_nombre="P",
+    )
+
+
+@pytest.mark.asyncio
+async def test_pragmas_y_lector_solo_lectura(engines):
+    escritor, lector = engines
+
+    async with escritor.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+
+    async with lector.connect() as conn:
+        assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+        with pytest.raises(OperationalError):
+            await conn.execute(text("DELETE FROM donadoras"))
+
+
+@pytest.mark.asyncio
+async def test_escrituras_concurrentes_se_serializan_y_lectores_no_esperan(engines):
+    escritor, lector = engines
+
+    async def escribir(numero):
+        async with AsyncSession(escritor) as db:
+            db.add(_donadora(numero))
+            await db.flush()
+            await asyncio.sleep(0.01)
+            await db.commit()
+
+    # Transacción de escritura abierta: el lector la atraviesa sin bloquearse
+    async with AsyncSession(escritor) as db:
+        db.add(_donadora(0))
+        await db.flush()
+        async with AsyncSession(lector) as lectura:
+            primera = await asyncio.wait_for(
+                lectura.scalar(select(Donadora.id).limit(1)), timeout=1
+            )
+        assert primera is None
+        await db.commit()
+
+    await asyncio.gather(*(escribir(n) for n in range(1, 11)))
+
+    async with AsyncSession(lector) as lectura:
+        assert len((await lectura.scalars(select(Donadora.id))).all()) == 11
@@ -0,0 +1,72 @@
+"""
+Benchmark de arranque en frío
+
+Cada medición corre en un proceso nuevo (como un cold start en Render):
+tiempo de importar app.main y tiempo hasta la primera respuesta (lifespan
+completo + GET /health) contra una BD SQLite vacía.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# Presupuestos en segundos (holgados para CI; un regreso grande los rompe)
+PRESUPUESTO_IMPORT = 3.0
+PRESUPUESTO_PRIMERA_RESPUESTA = 5.0
+
+SCRIPT = """
+import asyncio, json, sys, time
+inicio = time.perf_counter()
+from app.main import app
+import_s = time.perf_counter() - inicio
+sdks_cargados = [m for m in ("cloudinary", "app.infrastructure.external.uploadthing") if m in sys.modules]
+
+from httpx import AsyncClient
+
+async def primera_respuesta():
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            resp = await client.get("/health")
+    return resp.status_code
+
+status = asyncio.run(primera_respuesta())
+print(json.dumps({
+    "import_s": import_s,
+    "primera_respuesta_s": time.perf_counter() - inicio,
+    "status": status,
+    "sdks_cargados": sdks_cargados,
+}))
+"""
+
+
+def _medir_arranque(tmp_path):
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND),
+        "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'arranque.db'}",
+        "ENVIRONMENT": "test",
+    }
+    salida = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def test_arranque_en_frio_dentro_del_presupuesto(tmp_path):
+    medicion = _medir_arranque(tmp_path)
+
+    assert medicion["status"] == 200
+    assert medicion["sdks_cargados"] == []
+    assert medicion["import_s"] < PRESUPUESTO_IMPORT, medicion
+    assert medicion["primera_respuesta_s"] < PRESUPUESTO_PRIMERA_RESPUESTA, medicion
+    # Los directorios de uploads se crean en el startup, no al importar
+    assert (tmp_path / "uploads" / "donadoras").is_dir()
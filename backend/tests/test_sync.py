@@ -0,0 +1,188 @@
+import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, select, update
+
+from app.infrastructure.database.models import (
+    Donadora,
+    ExtraccionDonadora,
+    MutacionSync,
+    RegistroCambio,
+    SesionOPU,
+)
+from app.infrastructure.repositories.sync_repository import SyncRepository
+from app.presentation.api.v1.endpoints import sync
+
+
+def _donadora(registro="R1"):
+    return Donadora(nombre="D", numero_registro=registro, raza="Gyr", tipo_ganado="leche", propietario_nombre="P")
+
+
+def _sesion(cliente="C"):
+    return SesionOPU(
+        fecha=datetime.date(2024, 1, 1), tecnico_opu="T", tecnico_busqueda="B", cliente=cliente, finalidad="fresco"
+    )
+
+
+@pytest.fixture
+async def client(api_app):
+    api_app.include_router(sync.router, prefix="/sync")
+    async with AsyncClient(app=api_app, base_url="http://test") as ac:
+        yield ac
+
+
+async def _registro(db):
+    result = await db.execute(select(RegistroCambio).order_by(RegistroCambio.id))
+    return [(c.tabla, c.fila_id, c.operacion) for c in result.scalars().all()]
+
+
+async def test_registro_cambios_orm(session_factory):
+    async with session_factory() as db:
+        donadora = _donadora()
+        sesion = _sesion()
+        db.add_all([donadora, sesion])
+        await db.flush()
+        extraccion = ExtraccionDonadora(sesion_opu_id=sesion.id, donadora_id=donadora.id, numero_secuencial=1)
+        db.add(extraccion)
+        await db.commit()
+        # La extracción no se sincroniza sola: marca su sesión
+        assert await _registro(db) == [("donadoras", donadora.id, "upsert"), ("sesiones_opu", sesion.id, "upsert")]
+
+        donadora.notas = "x"
+        await db.commit()
+        await db.delete(sesion)
+        await db.commit()
+        registro = await _registro(db)
+        assert registro[2:] == [("donadoras", donadora.id, "upsert"), ("sesiones_opu", sesion.id, "delete")]
+
+        # Una transacción sin cambios sincronizables no escribe en el registro
+        db.add(MutacionSync(usuario_id=1, mutacion_id="m", entidad="donadoras", operacion="crear", estado="aplicada"))
+        await db.commit()
+        assert len(await _registro(db)) == 4
+
+
+async def test_registro_cambios_dml(session_factory):
+    async with session_factory() as db:
+        donadoras = [_donadora(f"R{i}") for i in range(3)]
+        db.add_all(donadoras)
+        await db.commit()
+        ids = [d.id for d in donadoras]
+        inicial = len(await _registro(db))
+
+        await db.execute(update(Donadora).where(Donadora.id.in_(ids[:2])).values(notas="lote"))
+        await db.execute(delete(Donadora).where(Donadora.id == ids[2]))
+        await db.commit()
+        assert (await _registro(db))[inicial:] == [
+            ("donadoras", ids[0], "upsert"),
+            ("donadoras", ids[1], "upsert"),
+            ("donadoras", ids[2], "delete"),
+        ]
+
+        # Sin ids identificables: la tabla completa se marca para recargar
+        await db.execute(update(Donadora).where(Donadora.raza == "Gyr").values(notas="todas"))
+        await db.commit()
+        assert (await _registro(db))[-1] == ("donadoras", None, "reset")
+
+
+async def test_pull_delta_paginado_y_reset(client, session_factory):
+    respuesta = await client.get("/sync/")
+    assert respuesta.json() == {"cursor": 0, "mas": False, "reset": True, "cambios": {}}
+
+    async with session_factory() as db:
+        donadoras = [_donadora(f"R{i}") for i in range(3)]
+        db.add_all(donadoras)
+        await db.commit()
+        _, cursor = await SyncRepository(db).limites_cursor()
+
+        donadoras[0].notas = "editada"
+        await db.delete(donadoras[1])
+        sesion = _sesion()
+        db.add(sesion)
+        await db.commit()
+
+    pagina = (await client.get("/sync/", params={"since": cursor, "limit": 2})).json()
+    assert pagina["mas"] is True and pagina["reset"] is False
+    assert [f["notas"] for f in pagina["cambios"]["donadoras"]["upsert"]] == ["editada"]
+    assert pagina["cambios"]["donadoras"]["delete"] == [donadoras[1].id]
+
+    resto = (await client.get("/sync/", params={"since": pagina["cursor"]})).json()
+    assert resto["mas"] is False
+    assert [f["id"] for f in resto["cambios"]["sesiones_opu"]["upsert"]] == [sesion.id]
+    assert resto["cambios"]["sesiones_opu"]["upsert"][0]["extracciones"] == []
+
+    # Al día: sin cambios y mismo cursor
+    al_dia = (await client.get("/sync/", params={"since": resto["cursor"]})).json()
+    assert al_dia == {"cursor": resto["cursor"], "mas": False, "reset": False, "cambios": {}}
+
+    filtrado = (await client.get("/sync/", params={"since": cursor, "tablas": "sesiones_opu"})).json()
+    assert list(filtrado["cambios"]) == ["sesiones_opu"] and filtrado["cursor"] == resto["cursor"]
+    assert (await client.get("/sync/", params={"tablas": "usuarios"})).status_code == 400
+
+    # Cursor purgado: reset
+    async with session_factory() as db:
+        futuro = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=60)
+        assert await SyncRepository(db).purgar(30, ahora=futuro) > 0
+    vencido = (await client.get("/sync/", params={"since": cursor})).json()
+    assert vencido["reset"] is True and vencido["cursor"] == resto["cursor"]
+
+
+async def test_push_idempotente_y_ref(client, session_factory):
+    datos = {"nombre": "D", "numero_registro": "R9", "raza": "Gyr", "tipo_ganado": "leche", "propietario_nombre": "P"}
+    lote = {"mutaciones": [
+        {"id": "a", "entidad": "donadoras", "operacion": "crear", "datos": datos},
+        {"id": "b", "entidad": "donadoras", "operacion": "actualizar", "ref": "a", "datos": {"notas": "offline"}},
+        {"id": "c", "entidad": "donadoras", "operacion": "actualizar", "fila_id": 999, "datos": {"notas": "x"}},
+        {"id": "d", "entidad": "donadoras", "operacion": "crear", "datos": {"nombre": "sin datos"}},
+        {"id": "e", "entidad": "usuarios", "operacion": "crear", "datos": {}},
+    ]}
+    respuesta = await client.post("/sync/push", json=lote)
+    assert respuesta.status_code == 200
+    resultados = respuesta.json()["resultados"]
+    assert [r["estado"] for r in resultados] == ["aplicada", "aplicada", "rechazada", "rechazada", "rechazada"]
+    assert resultados[1]["fila_id"] == resultados[0]["fila_id"]
+    assert not any(r["repetida"] for r in resultados)
+
+    # Reenvío del mismo lote (p. ej. se perdió la respuesta): no se aplica de nuevo
+    repetido = (await client.post("/sync/push", json=lote)).json()
+    assert all(r["repetida"] for r in repetido["resultados"])
+    assert [r["estado"] for r in repetido["resultados"]] == [r["estado"] for r in resultados]
+
+    async with session_factory() as db:
+        donadoras = (await db.execute(select(Donadora))).scalars().all()
+        assert [(d.numero_registro, d.notas) for d in donadoras] == [("R9", "offline")]
+
+    cambios = (await client.get("/sync/", params={"since": 1})).json()
+    assert repetido["cursor"] == cambios["cursor"]
+
+    demasiadas = {"mutaciones": [dict(lote["mutaciones"][0], id=str(i)) for i in range(201)]}
+    assert (await client.post("/sync/push", json=demasiadas)).status_code == 413
+
+
+async def test_push_opu_y_eliminar(client, session_factory):
+    async with session_factory() as db:
+        donadora = _donadora()
+        db.add(donadora)
+        await db.commit()
+
+    datos = {
+        "fecha": "2024-02-01", "tecnico_opu": "T", "tecnico_busqueda": "B", "cliente": "C", "finalidad": "fresco",
+        "extracciones": [{"donadora_id": donadora.id, "numero_secuencial": 1}],
+    }
+    lote = {"mutaciones": [
+        {"id": "opu", "entidad": "sesiones_opu", "operacion": "crear", "datos": datos},
+        {"id": "opu-upd", "entidad": "sesiones_opu", "operacion": "actualizar", "ref": "opu", "datos": {"cliente": "C2"}},
+        {"id": "opu-del", "entidad": "sesiones_opu", "operacion": "eliminar", "ref": "opu"},
+        {"id": "don-del", "entidad": "donadoras", "operacion": "eliminar", "fila_id": donadora.id},
+    ]}
+    resultados = (await client.post("/sync/push", json=lote)).json()["resultados"]
+    assert [r["estado"] for r in resultados] == ["aplicada"] * 4
+
+    async with session_factory() as db:
+        assert (await db.execute(select(SesionOPU))).scalars().all() == []
+        assert (await db.execute(select(ExtraccionDonadora))).scalars().all() == []
+        # Donadora: eliminación lógica
+        assert (await db.get(Donadora, donadora.id)).activo is False
+        registro = await _registro(db)
+    sesion_id = resultados[0]["fila_id"]
+    assert ("sesiones_opu", sesion_id, "delete") in registro
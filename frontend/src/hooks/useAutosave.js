@@ -1,13 +1,25 @@
 /**
  * Hook personalizado para autosave de formularios
+ *
+ * El primer guardado envía el formulario completo; los siguientes solo
+ * las diferencias (JSON Patch) contra la última versión confirmada. Si el
+ * servidor rechaza el patch (409: el draft cambió) se vuelve a enviar el
+ * documento completo.
  */
 import { useEffect, useRef } from 'react'
 import draftService from '../services/draftService'
+import { createPatch, snapshot } from '../utils/jsonPatch'
 
 const AUTOSAVE_DELAY = 3000 // 3 segundos
 
 export const useAutosave = (modulo, tipoRegistro, formData, enabled = true) => {
   const timeoutRef = useRef(null)
+  // { id, version, documento } del último guardado confirmado
+  const draftRef = useRef(null)
+
+  useEffect(() => {
+    draftRef.current = null
+  }, [modulo, tipoRegistro])
 
   useEffect(() => {
     if (!enabled || !formData || Object.keys(formData).length === 0) {
@@ -19,10 +31,32 @@ export const useAutosave = (modulo, tipoRegistro, formData, enabled = true) => {
       clearTimeout(timeoutRef.current)
     }
 
+    const guardarCompleto = async (documento) => {
+      const draft = await draftService.save(modulo, tipoRegistro, documento)
+      draftRef.current = { id: draft.id, version: draft.version, documento }
+    }
+
     // Configurar nuevo autosave
     timeoutRef.current = setTimeout(async () => {
+      const documento = snapshot(formData)
+      const actual = draftRef.current
+
       try {
-        await draftService.save(modulo, tipoRegistro, formData)
+        if (!actual) {
+          await guardarCompleto(documento)
+        } else {
+          const operaciones = createPatch(actual.documento, documento)
+          if (operaciones.length === 0) return
+
+          try {
+            const { version } = await draftService.patch(actual.id, actual.version, operaciones)
+            draftRef.current = { ...actual, version, documento }
+          } catch (error) {
+            const status = error.response?.status
+            if (status !== 409 && status !== 404 && status !== 422) throw error
+            await guardarCompleto(documento)
+          }
+        }
         console.log('✅ Autosave exitoso')
       } catch (error) {
         console.error('❌ Error en autosave:', error)
@@ -4,9 +4,7 @@
 import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { useAuthStore } from '../store/authStore'
-import donadoraService from '../services/donadoraService'
-import opuService from '../services/opuService'
-import gfeService from '../services/gfeService'
+import dashboardService from '../services/dashboardService'
 
 export default function Dashboard() {
   const user = useAuthStore(state => state.user)
@@ -23,35 +21,14 @@ export default function Dashboard() {
 
   const loadStatistics = async () => {
     try {
-      // Cargar datos en paralelo
-      const [donadorasData, sesionesOpu, chequeos] = await Promise.all([
-        donadoraService.getStatistics().catch(() => ({ total_activas: 0 })),
-        opuService.getAll().catch(() => []),
-        gfeService.getAll().catch(() => [])
-      ])
-
-      // Total donadoras activas (usar las estadísticas del backend)
-      const totalDonadoras = donadorasData.total_activas || 0
-
-      // Sesiones OPU del mes actual
-      const now = new Date()
-      const currentMonth = now.getMonth()
-      const currentYear = now.getFullYear()
-      const sesionesOpuMes = (sesionesOpu || []).filter(sesion => {
-        if (!sesion.fecha) return false
-        const fecha = new Date(sesion.fecha)
-        return fecha.getMonth() === currentMonth && fecha.getFullYear() === currentYear
-      }).length
-
-      // Tasa de preñez (porcentaje de preñadas vs total de chequeos)
-      const totalChequeos = (chequeos || []).length
-      const prenadas = (chequeos || []).filter(c => c.estado === 'preñada').length
-      const tasaPrenez = totalChequeos > 0 ? Math.round((prenadas / totalChequeos) * 100) : 0
+      // Un solo request con contadores calculados en el backend
+      const summary = await dashboardService.getSummary()
+      const contadores = summary.contadores || {}
 
       setStats({
-        totalDonadoras,
-        sesionesOpuMes,
-        tasaPrenez,
+        totalDonadoras: contadores.total_donadoras || 0,
+        sesionesOpuMes: contadores.sesiones_opu_mes || 0,
+        tasaPrenez: contadores.tasa_prenez || 0,
         loading: false
       })
     } catch (error) {
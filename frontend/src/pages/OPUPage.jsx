@@ -6,8 +6,16 @@ import { useOPUStore } from '../store/opuStore'
 import opuService from '../services/opuService'
 import donadoraService from '../services/donadoraService'
 import fotoService from '../services/fotoService'
+import syncService from '../services/syncService'
 import PhotoCapture from '../components/PhotoCapture'
 
+// Tablas que sigue esta página con /sync (cursor propio)
+const TABLAS_SYNC = ['sesiones_opu']
+
+// Mismo orden que el listado del servidor: fecha desc, id desc
+const ordenarSesiones = (sesiones) =>
+  [...sesiones].sort((a, b) => (b.fecha || '').localeCompare(a.fecha || '') || b.id - a.id)
+
 const emptyExtraccion = {
   numero_secuencial: 1,
   hora_inicio: '',
@@ -99,6 +107,16 @@ export default function OPUPage() {
 
   const loadSesiones = async () => {
     try {
+      // Con la lista ya cargada (volver a la página) solo se piden los cambios
+      const actuales = useOPUStore.getState().sesiones
+      if (actuales.length) {
+        const { reset, tablasReset, cache } = await syncService.pull({ sesiones_opu: actuales }, TABLAS_SYNC)
+        if (!reset && !tablasReset.length) {
+          setSesiones(ordenarSesiones(cache.sesiones_opu))
+          return
+        }
+      }
+      await syncService.reiniciar(TABLAS_SYNC)
       const data = await opuService.getAll()
       setSesiones(data || [])
     } catch (error) {
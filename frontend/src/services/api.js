@@ -10,23 +10,56 @@ const api = axios.create({
   baseURL: API_BASE_URL,
 })
 
-// Interceptor para añadir token JWT
+const METODOS_ESCRITURA = ['post', 'put', 'patch', 'delete']
+// Login/registro: sus respuestas traen credenciales y no deben guardarse en el servidor
+const RUTAS_SIN_IDEMPOTENCIA = ['/auth/']
+const MAX_REINTENTOS = 2
+
+const nuevaClave = () =>
+  (typeof crypto !== 'undefined' && crypto.randomUUID)
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+
+// Interceptor para añadir token JWT e Idempotency-Key en escrituras
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('token')
   if (token) {
     config.headers.Authorization = `Bearer ${token}`
   }
+  // Una clave por operación: los reintentos reusan la misma config (y la
+  // misma clave), así el servidor devuelve la respuesta original en vez de
+  // repetir la escritura
+  const sinIdempotencia = RUTAS_SIN_IDEMPOTENCIA.some((ruta) => config.url?.startsWith(ruta))
+  if (METODOS_ESCRITURA.includes(config.method) && !sinIdempotencia && !config.headers['Idempotency-Key']) {
+    config.headers['Idempotency-Key'] = nuevaClave()
+  }
   return config
 })
 
+// Sin respuesta (conexión caída) o gateway caído: se puede reintentar
+const reintentable = (error) =>
+  !error.response || [502, 503, 504].includes(error.response.status) ||
+  // La original sigue en curso en el servidor
+  (error.response.status === 409 && error.response.headers?.['retry-after'])
+
 // Interceptor para manejar errores
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
     if (error.response?.status === 401) {
       // Token inválido o expirado
       useAuthStore.getState().logout()
       window.location.href = '/login'
+      return Promise.reject(error)
+    }
+
+    const config = error.config
+    // Solo se reintentan lecturas y escrituras con Idempotency-Key
+    const seguro = config && (!METODOS_ESCRITURA.includes(config.method) || config.headers?.['Idempotency-Key'])
+    if (seguro && reintentable(error) && (config.__reintentos || 0) < MAX_REINTENTOS) {
+      config.__reintentos = (config.__reintentos || 0) + 1
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** config.__reintentos))
+      return api(config)
     }
     return Promise.reject(error)
   }
@@ -0,0 +1,16 @@
+/**
+ * Servicio para el resumen del Dashboard
+ */
+import api from './api'
+
+const dashboardService = {
+  /**
+   * Obtener contadores, sesiones recientes y GFE pendientes
+   */
+  async getSummary() {
+    const response = await api.get('/dashboard/summary')
+    return response.data
+  }
+}
+
+export default dashboardService
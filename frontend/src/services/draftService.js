@@ -17,6 +17,19 @@ const draftService = {
     return response.data
   },
 
+  /**
+   * Enviar solo los cambios (JSON Patch) calculados sobre versionBase
+   *
+   * Responde 409 si el draft cambió desde esa versión
+   */
+  async patch(draftId, versionBase, operaciones) {
+    const response = await api.patch(`/drafts/${draftId}`, {
+      version_base: versionBase,
+      operaciones
+    })
+    return response.data
+  },
+
   /**
    * Obtener drafts del usuario actual
    */
@@ -9,6 +9,11 @@ const gfeService = {
     return response.data
   },
 
+  async getTasas(params = {}) {
+    const response = await api.get('/gfe/tasas', { params })
+    return response.data
+  },
+
   async getById(id) {
     const response = await api.get(`/gfe/${id}`)
     return response.data
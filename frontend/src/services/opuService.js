@@ -6,17 +6,27 @@ import api from './api'
 const opuService = {
   /**
    * Obtener todas las sesiones OPU
+   * params.fields / params.include limitan campos y colecciones,
+   * p. ej. { fields: 'id,fecha,cliente' } para selectores (sin extracciones)
    */
-  async getAll() {
-    const response = await api.get('/opu/')
+  async getAll(params = {}) {
+    const response = await api.get('/opu/', { params })
+    return response.data
+  },
+
+  /**
+   * Obtener sesiones OPU con totales agregados (sin extracciones)
+   */
+  async getResumen(params = {}) {
+    const response = await api.get('/opu/resumen', { params })
     return response.data
   },
 
   /**
    * Obtener una sesión OPU por ID
    */
-  async getById(id) {
-    const response = await api.get(`/opu/${id}`)
+  async getById(id, params = {}) {
+    const response = await api.get(`/opu/${id}`, { params })
     return response.data
   },
 
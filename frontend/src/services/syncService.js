@@ -0,0 +1,134 @@
+/**
+ * Servicio de sincronización para trabajo sin conexión (/sync)
+ *
+ * - pull(cache, tablas): trae solo lo que cambió desde el último cursor y lo
+ *   aplica sobre las colecciones locales ({ tabla: [filas] }). Si el servidor
+ *   pide reset (cursor inicial o vencido) devuelve reset=true y el llamador
+ *   recarga con los listados normales.
+ * - El cursor que devuelve el servidor vale solo para las tablas pedidas:
+ *   se guarda uno por conjunto de tablas (y otro para "todas").
+ * - encolar()/push(): las escrituras hechas sin conexión se guardan en
+ *   localStorage con un id único y se envían en orden; reenviar un lote
+ *   es seguro (el servidor responde el resultado guardado).
+ */
+import api from './api'
+
+const CLAVE_CURSOR = 'sync_cursor'
+
+const claveCursor = (tablas) =>
+  tablas?.length ? `${CLAVE_CURSOR}:${[...tablas].sort().join(',')}` : CLAVE_CURSOR
+const CLAVE_COLA = 'sync_cola'
+
+const leerCola = () => {
+  try {
+    return JSON.parse(localStorage.getItem(CLAVE_COLA)) || []
+  } catch {
+    return []
+  }
+}
+
+const guardarCola = (cola) => localStorage.setItem(CLAVE_COLA, JSON.stringify(cola))
+
+const nuevoId = () =>
+  (typeof crypto !== 'undefined' && crypto.randomUUID)
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+
+/**
+ * Aplicar los cambios de una tabla sobre su lista local (upsert por id + lápidas)
+ */
+const aplicarCambios = (filas = [], { upsert = [], delete: eliminadas = [] }) => {
+  const porId = new Map(filas.map((fila) => [fila.id, fila]))
+  upsert.forEach((fila) => porId.set(fila.id, fila))
+  eliminadas.forEach((id) => porId.delete(id))
+  return Array.from(porId.values())
+}
+
+const syncService = {
+  getCursor(tablas = null) {
+    return Number(localStorage.getItem(claveCursor(tablas))) || 0
+  },
+
+  setCursor(cursor, tablas = null) {
+    localStorage.setItem(claveCursor(tablas), String(cursor))
+  },
+
+  /**
+   * Dejar el cursor de `tablas` en el último cambio, antes de una carga completa
+   * (lo que cambie durante la carga llega en el siguiente pull)
+   */
+  async reiniciar(tablas = null) {
+    const params = { since: 0 }
+    if (tablas) params.tablas = tablas.join(',')
+    const { data } = await api.get('/sync/', { params })
+    this.setCursor(data.cursor, tablas)
+  },
+
+  /**
+   * Traer cambios desde el cursor guardado y aplicarlos sobre `cache`
+   * Retorna { reset, tablasReset, cache }; con reset=true el cursor ya quedó
+   * actualizado y el llamador debe recargar las colecciones completas.
+   */
+  async pull(cache = {}, tablas = null) {
+    const resultado = { ...cache }
+    const tablasReset = []
+    let since = this.getCursor(tablas)
+
+    // Se pagina hasta quedar al día
+    for (;;) {
+      const params = { since }
+      if (tablas) params.tablas = tablas.join(',')
+      const { data } = await api.get('/sync/', { params })
+      this.setCursor(data.cursor, tablas)
+      if (data.reset) {
+        return { reset: true, tablasReset: [], cache: resultado }
+      }
+      Object.entries(data.cambios).forEach(([tabla, cambios]) => {
+        if (cambios.reset) {
+          tablasReset.push(tabla)
+        } else {
+          resultado[tabla] = aplicarCambios(resultado[tabla], cambios)
+        }
+      })
+      if (!data.mas) break
+      since = data.cursor
+    }
+    return { reset: false, tablasReset, cache: resultado }
+  },
+
+  /**
+   * Encolar una escritura hecha sin conexión
+   * operacion: 'crear' | 'actualizar' | 'eliminar'
+   * Para actualizar/eliminar una fila creada offline se pasa `ref` con el id
+   * de la mutación que la creó en vez de `filaId`.
+   * Retorna el id de la mutación.
+   */
+  encolar(entidad, operacion, { filaId = null, ref = null, datos = {} } = {}) {
+    const mutacion = { id: nuevoId(), entidad, operacion, fila_id: filaId, ref, datos }
+    guardarCola([...leerCola(), mutacion])
+    return mutacion.id
+  },
+
+  pendientes() {
+    return leerCola()
+  },
+
+  /**
+   * Enviar la cola pendiente; quita las mutaciones aplicadas o rechazadas
+   * (las que fallaron con error interno quedan para el próximo intento)
+   */
+  async push() {
+    const cola = leerCola()
+    if (!cola.length) return []
+
+    const { data } = await api.post('/sync/push', { mutaciones: cola })
+    const terminadas = new Set(
+      data.resultados.filter((r) => r.estado !== 'error').map((r) => r.id)
+    )
+    // Releer por si se encolaron mutaciones durante el envío
+    guardarCola(leerCola().filter((m) => !terminadas.has(m.id)))
+    return data.resultados
+  },
+}
+
+export default syncService
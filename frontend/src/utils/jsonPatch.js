@@ -0,0 +1,67 @@
+/**
+ * Diferencias entre documentos como JSON Patch (RFC 6902)
+ *
+ * Genera operaciones add/remove/replace para enviar al servidor solo lo
+ * que cambió en el formulario desde el último guardado.
+ */
+
+const esObjeto = (valor) =>
+  valor !== null && typeof valor === 'object' && !Array.isArray(valor)
+
+// RFC 6901: '~' -> '~0', '/' -> '~1'
+const escaparToken = (token) => String(token).replace(/~/g, '~0').replace(/\//g, '~1')
+
+const diffEn = (anterior, actual, ruta, operaciones) => {
+  if (anterior === actual) return
+
+  if (esObjeto(anterior) && esObjeto(actual)) {
+    for (const clave of Object.keys(anterior)) {
+      if (!(clave in actual) || actual[clave] === undefined) {
+        operaciones.push({ op: 'remove', path: `${ruta}/${escaparToken(clave)}` })
+      }
+    }
+    for (const [clave, valor] of Object.entries(actual)) {
+      if (valor === undefined) continue
+      const hijo = `${ruta}/${escaparToken(clave)}`
+      if (!(clave in anterior) || anterior[clave] === undefined) {
+        operaciones.push({ op: 'add', path: hijo, value: valor })
+      } else {
+        diffEn(anterior[clave], valor, hijo, operaciones)
+      }
+    }
+    return
+  }
+
+  if (Array.isArray(anterior) && Array.isArray(actual)) {
+    const comunes = Math.min(anterior.length, actual.length)
+    for (let i = 0; i < comunes; i++) {
+      diffEn(anterior[i], actual[i], `${ruta}/${i}`, operaciones)
+    }
+    // Quitar desde el final para no desplazar los índices pendientes
+    for (let i = anterior.length - 1; i >= comunes; i--) {
+      operaciones.push({ op: 'remove', path: `${ruta}/${i}` })
+    }
+    for (let i = comunes; i < actual.length; i++) {
+      operaciones.push({ op: 'add', path: `${ruta}/-`, value: actual[i] })
+    }
+    return
+  }
+
+  if (JSON.stringify(anterior) !== JSON.stringify(actual)) {
+    operaciones.push({ op: 'replace', path: ruta, value: actual })
+  }
+}
+
+/**
+ * Operaciones que transforman `anterior` en `actual`
+ */
+export const createPatch = (anterior, actual) => {
+  const operaciones = []
+  diffEn(anterior, actual, '', operaciones)
+  return operaciones
+}
+
+/**
+ * Copia serializable del documento (lo que el servidor guardó)
+ */
+export const snapshot = (documento) => JSON.parse(JSON.stringify(documento))